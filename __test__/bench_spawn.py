@@ -0,0 +1,102 @@
+import argparse
+import os
+import shutil
+import subprocess
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from evaluator.launcher import prepare_launcher
+from evaluator.runner import Runner
+
+# Measures the per-test cost of starting a program under each launcher.
+# The test program exits immediately, so the mean time per test is almost
+# entirely spawn + limit setup + reaping overhead.
+
+WORK_DIR = "bench_spawn_tmp"
+
+NOOP_C = """
+#include <stdio.h>
+int main() {
+    int a, b;
+    if (scanf("%d %d", &a, &b) != 2) return 1;
+    printf("%d\\n", a + b);
+    return 0;
+}
+"""
+
+class BenchConfig:
+    def __init__(self, launcher):
+        self.time_limit_seconds = 2
+        self.memory_limit_mb = 64
+        self.limit_mode = "wall"
+        self.io_mode = "stdin"
+        self.exec_dir = WORK_DIR
+        self.launcher = launcher
+
+def make_runner(launcher):
+    config = BenchConfig(launcher)
+    prepare_launcher(config)
+    if config.launcher != launcher:
+        return None # Not available on this machine
+    return Runner(config)
+
+def bench_runner(runner, program, runs):
+    input_file = os.path.join(WORK_DIR, "input.txt")
+    output_file = os.path.join(WORK_DIR, "output.txt")
+    start = time.perf_counter()
+    for _ in range(runs):
+        result = runner.run_code(program, input_file, output_file, "c", "noop")[0]
+        assert result == "Correct", result
+    return (time.perf_counter() - start) / runs
+
+def bench_bare(program, runs):
+    """Baseline: plain Popen + communicate, no limits and no accounting."""
+    input_file = os.path.join(WORK_DIR, "input.txt")
+    start = time.perf_counter()
+    for _ in range(runs):
+        with open(input_file) as infile:
+            subprocess.run([program], stdin=infile, capture_output=True)
+    return (time.perf_counter() - start) / runs
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark per-test launch overhead of the Runner launchers.")
+    parser.add_argument('--runs', '-n', type=int, default=300, help="Test runs per launcher and round")
+    parser.add_argument('--rounds', '-r', type=int, default=3, help="Rounds; the best round of each launcher is reported")
+    args = parser.parse_args()
+
+    shutil.rmtree(WORK_DIR, ignore_errors=True)
+    os.makedirs(WORK_DIR)
+    try:
+        with open(os.path.join(WORK_DIR, "noop.c"), "w") as f:
+            f.write(NOOP_C)
+        with open(os.path.join(WORK_DIR, "input.txt"), "w") as f:
+            f.write("3 4\n")
+        with open(os.path.join(WORK_DIR, "output.txt"), "w") as f:
+            f.write("7\n")
+        program = os.path.join(WORK_DIR, "noop")
+        subprocess.run(["gcc", "-O2", os.path.join(WORK_DIR, "noop.c"), "-o", program], check=True)
+
+        runners = {launcher: make_runner(launcher) for launcher in ["preexec", "prlimit", "shim"]}
+        # Interleave the launchers over several rounds and keep each one's best
+        # round, so a noisy neighbour doesn't favour whichever ran last.
+        best = {}
+        for _ in range(args.rounds):
+            best["bare"] = min(best.get("bare", float("inf")), bench_bare(program, args.runs))
+            for launcher, runner in runners.items():
+                if runner:
+                    per_test = bench_runner(runner, program, args.runs)
+                    best[launcher] = min(best.get(launcher, float("inf")), per_test)
+
+        print(f"{'launcher':<10} {'per test (ms)':>14} {'overhead (ms)':>14}")
+        for launcher in ["bare"] + list(runners):
+            if launcher not in best:
+                print(f"{launcher:<10} {'unavailable':>14}")
+                continue
+            print(f"{launcher:<10} {best[launcher] * 1000:>14.3f} {(best[launcher] - best['bare']) * 1000:>14.3f}")
+    finally:
+        shutil.rmtree(WORK_DIR, ignore_errors=True)
+
+if __name__ == "__main__":
+    main()
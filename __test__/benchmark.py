@@ -0,0 +1,371 @@
+import argparse
+import csv
+import json
+import os
+import platform
+import random
+import shutil
+import subprocess
+import sys
+import time
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+MAIN_PY = os.path.join(REPO_DIR, "main.py")
+
+# Generates a synthetic batch (N submissions in C, C++ and Python, M test cases
+# of a configurable size), grades it with the full main.py pipeline and reports
+# throughput, per-test evaluator overhead and the evaluator's peak memory.
+# --json writes the metrics for comparing runs; --compare prints the change
+# against an earlier --json file.
+
+WORK_DIR = "benchmark_tmp"
+
+# Every test case: a count, then that many integers; the answer is their sum.
+# Each kind ends with the verdict the evaluator is expected to give.
+PROGRAMS = {
+    'c': {
+        'correct': """
+#include <stdio.h>
+int main() {
+    int n; long long x, sum = 0;
+    if (scanf("%d", &n) != 1) return 1;
+    for (int i = 0; i < n; i++) { scanf("%lld", &x); sum += x; }
+    printf("%lld\\n", sum);
+    return 0;
+}
+""",
+        'wa': """
+#include <stdio.h>
+int main() {
+    int n; long long x, sum = 0;
+    if (scanf("%d", &n) != 1) return 1;
+    for (int i = 0; i < n; i++) { scanf("%lld", &x); sum += x; }
+    printf("%lld\\n", sum + 1);
+    return 0;
+}
+""",
+        'tle': """
+#include <stdio.h>
+int main() {
+    volatile unsigned long spin = 0;
+    for (;;) spin++;
+    return 0;
+}
+""",
+        're': """
+#include <stdio.h>
+int main() {
+    volatile int *nowhere = NULL;
+    *nowhere = 1;
+    return 0;
+}
+""",
+        'mle': """
+#include <stdlib.h>
+#include <string.h>
+int main() {
+    size_t size = (size_t)256 << 20;
+    char *block = malloc(size);
+    if (!block) abort();
+    memset(block, 1, size);
+    return block[size - 1] == 0;
+}
+""",
+    },
+    'cpp': {
+        'correct': """
+#include <iostream>
+int main() {
+    std::ios::sync_with_stdio(false);
+    int n; long long x, sum = 0;
+    std::cin >> n;
+    for (int i = 0; i < n; i++) { std::cin >> x; sum += x; }
+    std::cout << sum << "\\n";
+    return 0;
+}
+""",
+        'wa': """
+#include <iostream>
+int main() {
+    int n; long long x, sum = 0;
+    std::cin >> n;
+    for (int i = 0; i < n; i++) { std::cin >> x; sum -= x; }
+    std::cout << sum << "\\n";
+    return 0;
+}
+""",
+        'tle': """
+int main() {
+    volatile unsigned long spin = 0;
+    for (;;) spin++;
+}
+""",
+        're': """
+#include <cstdlib>
+int main() {
+    std::abort();
+}
+""",
+        'mle': """
+#include <cstring>
+#include <iostream>
+char *volatile keep; // Escapes, so the allocation can't be optimised away
+int main() {
+    const unsigned long size = 256UL << 20;
+    keep = new char[size];
+    std::memset(keep, 1, size);
+    std::cout << static_cast<int>(keep[size / 2]) << "\\n";
+    return 0;
+}
+""",
+    },
+    'python': {
+        'correct': """
+import sys
+data = sys.stdin.read().split()
+print(sum(map(int, data[1:1 + int(data[0])])))
+""",
+        'wa': """
+import sys
+data = sys.stdin.read().split()
+print(max(map(int, data[1:1 + int(data[0])])))
+""",
+        'tle': """
+while True:
+    pass
+""",
+        're': """
+import sys
+data = sys.stdin.read().split()
+print(int(data[0]) // 0)
+""",
+        'mle': """
+block = bytearray(256 << 20)
+print(len(block))
+""",
+    },
+}
+EXTENSIONS = {'c': 'c', 'cpp': 'cpp', 'python': 'py'}
+EXPECTED = {'correct': "Correct", 'wa': "Wrong Answer", 'tle': "Time Limit Exceeded",
+            're': "Runtime Error", 'mle': "Runtime Error"} # The memory limit is RLIMIT_AS: allocating fails
+# Share of each kind in a batch
+MIX = ['correct'] * 5 + ['wa'] * 2 + ['re', 'tle', 'mle']
+
+def generate(args):
+    """Writes the test cases and submissions; returns {source file: expected verdict}."""
+    rng = random.Random(args.seed)
+    testcase_dir = os.path.join(WORK_DIR, "testcases")
+    source_dir = os.path.join(WORK_DIR, "submissions")
+    os.makedirs(testcase_dir)
+    os.makedirs(source_dir)
+
+    for index in range(1, args.cases + 1):
+        numbers = [rng.randint(-10**6, 10**6) for _ in range(args.case_size)]
+        with open(os.path.join(testcase_dir, f"input{index}.txt"), "w") as f:
+            f.write(f"{len(numbers)}\n{' '.join(map(str, numbers))}\n")
+        with open(os.path.join(testcase_dir, f"output{index}.txt"), "w") as f:
+            f.write(f"{sum(numbers)}\n")
+
+    languages = args.languages.split(',')
+    expected = {}
+    for i in range(args.submissions):
+        kind = MIX[i % len(MIX)]
+        language = languages[(i // len(MIX)) % len(languages)] if len(languages) > 1 else languages[0]
+        source_file = f"s{i:04d}_{kind}.{EXTENSIONS[language]}"
+        with open(os.path.join(source_dir, source_file), "w") as f:
+            f.write(PROGRAMS[language][kind].lstrip())
+        expected[os.path.splitext(source_file)[0]] = (EXPECTED[kind], source_file)
+    return expected
+
+def write_config(args):
+    config = {
+        "language": "auto",
+        "time_limit_seconds": args.time_limit,
+        "memory_limit_mb": 64,
+        "testcase_dir": "testcases",
+        "source_dir": "submissions",
+        "exec_dir": "executables",
+        "result_log": "results/eval_log.txt",
+        "csv_file": "results/eval_results.csv",
+        "io_mode": "stdin",
+        "workers": args.workers,
+        "engine": args.engine,
+        "compile_cache_dir": None,
+    }
+    for setting in args.set:
+        key, _, value = setting.partition('=')
+        config[key] = json.loads(value)
+    with open(os.path.join(WORK_DIR, "config.json"), "w") as f:
+        json.dump(config, f, indent=2)
+    return config
+
+def _evaluator_processes(root_pid):
+    """pids of main.py and its Python helpers (pool workers, forkserver, zygote servers), not the tests."""
+    parents = {}
+    commands = {}
+    for name in os.listdir('/proc'):
+        if not name.isdigit():
+            continue
+        try:
+            with open(f'/proc/{name}/stat') as f:
+                parents[int(name)] = int(f.read().rsplit(')', 1)[1].split()[1])
+            with open(f'/proc/{name}/cmdline', 'rb') as f:
+                commands[int(name)] = f.read()
+        except (OSError, IndexError, ValueError):
+            continue
+    tree = {root_pid}
+    changed = True
+    while changed:
+        changed = False
+        for pid, parent in parents.items():
+            if parent in tree and pid not in tree:
+                tree.add(pid)
+                changed = True
+    helpers = {pid for pid in tree if b'multiprocessing' in commands.get(pid, b'')
+               or (b'zygote.py' in commands.get(pid, b'') and b'zygote.py' not in commands.get(parents[pid], b''))}
+    return {root_pid} | helpers
+
+def _status_kb(pid, field):
+    try:
+        with open(f'/proc/{pid}/status') as f:
+            for line in f:
+                if line.startswith(field + ':'):
+                    return int(line.split()[1])
+    except OSError:
+        pass
+    return 0
+
+def run_pipeline(sample_interval=0.05):
+    """Runs main.py on the batch.
+
+    Returns (wall seconds, exit code, CPU seconds of main.py and everything it
+    ran, main.py's peak RSS KB, peak summed RSS KB of all evaluator processes).
+    """
+    with open(os.path.join(WORK_DIR, "main_output.txt"), "w") as out:
+        start = time.perf_counter()
+        process = subprocess.Popen([sys.executable, MAIN_PY, "--config", "config.json"],
+                                   cwd=WORK_DIR, stdout=out, stderr=subprocess.STDOUT)
+        main_peak = total_peak = 0
+        while True:
+            # Reaped here rather than by Popen to get the rusage, which includes every reaped descendant
+            pid, status, usage = os.wait4(process.pid, os.WNOHANG)
+            if pid:
+                break
+            pids = _evaluator_processes(process.pid)
+            main_peak = max(main_peak, _status_kb(process.pid, 'VmHWM'))
+            total_peak = max(total_peak, sum(_status_kb(pid, 'VmRSS') for pid in pids))
+            time.sleep(sample_interval)
+        wall = time.perf_counter() - start
+    process.returncode = os.waitstatus_to_exitcode(status)
+    return wall, process.returncode, usage.ru_utime + usage.ru_stime, main_peak, total_peak
+
+def analyse(expected, wall, workers, cpu):
+    with open(os.path.join(WORK_DIR, "results", "eval_results.csv"), newline='') as f:
+        rows = list(csv.DictReader(f))
+    test_rows = [row for row in rows if row['TestCase Input'].startswith('input') and row['Result'] != "Skipped"]
+    verdicts = {}
+    judged = {} # Program -> verdicts of the tests it ran
+    for row in rows:
+        verdicts[row['Result']] = verdicts.get(row['Result'], 0) + 1
+    for row in test_rows:
+        judged.setdefault(row['Program'], set()).add(row['Result'])
+    # As expected: every test the submission ran got the verdict of its kind
+    mismatched = sorted(program for program, (verdict, _) in expected.items() if judged.get(program) != {verdict})
+    program_time = sum(float(row['Time (s)']) for row in test_rows)
+    program_cpu = sum(float(row['CPU User (s)']) + float(row['CPU System (s)']) for row in test_rows)
+    # Worker wall-clock time that wasn't the programs' own (spawning, limits,
+    # comparing, logging, compiling), spread over the tests that ran
+    overhead = (wall * workers - program_time) / len(test_rows) if test_rows else 0.0
+    # CPU time of the evaluator and the compilers, i.e. everything but the test programs
+    evaluator_cpu = (cpu - program_cpu) / len(test_rows) if test_rows else 0.0
+    return {
+        'tests_run': len(test_rows),
+        'program_time_s': round(program_time, 4),
+        'program_cpu_s': round(program_cpu, 4),
+        'overhead_ms_per_test': round(overhead * 1000, 3),
+        'evaluator_cpu_ms_per_test': round(evaluator_cpu * 1000, 3),
+        'verdicts': verdicts,
+        'mismatched_submissions': mismatched,
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the whole evaluation pipeline on a synthetic batch.")
+    parser.add_argument('--submissions', '-n', type=int, default=30, help="Number of submissions")
+    parser.add_argument('--cases', '-m', type=int, default=5, help="Number of test cases")
+    parser.add_argument('--case-size', type=int, default=10000, help="Integers per test case input")
+    parser.add_argument('--languages', default="c,cpp,python", help="Comma-separated languages to generate")
+    # Compiling is also bounded by time_limit_seconds, so C++ needs about a second
+    parser.add_argument('--time-limit', type=float, default=1.0, help="time_limit_seconds for the batch")
+    parser.add_argument('--workers', '-w', type=int, default=1, help="'workers' for the batch")
+    parser.add_argument('--engine', choices=['process', 'async'], default='process', help="'engine' for the batch")
+    parser.add_argument('--set', action='append', default=[], metavar='KEY=JSON',
+                        help='Extra config key, e.g. --set python_zygote=true (repeatable)')
+    parser.add_argument('--seed', type=int, default=1, help="Seed for the test case contents")
+    parser.add_argument('--json', help="Write the metrics as JSON to this file ('-' for stdout)")
+    parser.add_argument('--compare', help="Earlier --json file to compare with")
+    parser.add_argument('--keep', action='store_true', help=f"Keep {WORK_DIR}/ for inspection")
+    args = parser.parse_args()
+    for language in args.languages.split(','):
+        if language not in PROGRAMS:
+            parser.error(f"unknown language '{language}'")
+
+    shutil.rmtree(WORK_DIR, ignore_errors=True)
+    os.makedirs(WORK_DIR)
+    try:
+        expected = generate(args)
+        config = write_config(args)
+        wall, returncode, cpu, main_peak, total_peak = run_pipeline()
+        if returncode != 0:
+            sys.exit(f"main.py exited with {returncode}, see {WORK_DIR}/main_output.txt")
+        workers = config['workers'] or os.cpu_count() or 1
+        metrics = {
+            'submissions': args.submissions,
+            'cases': args.cases,
+            'case_size': args.case_size,
+            'config': config,
+            'wall_s': round(wall, 3),
+            'submissions_per_s': round(args.submissions / wall, 3),
+            **analyse(expected, wall, workers, cpu),
+            'evaluator_peak_rss_kb': main_peak,
+            'evaluator_total_peak_rss_kb': total_peak,
+            'python': platform.python_version(),
+            'cpus': os.cpu_count(),
+        }
+        metrics['tests_per_s'] = round(metrics['tests_run'] / wall, 3)
+    finally:
+        if not args.keep:
+            shutil.rmtree(WORK_DIR, ignore_errors=True)
+
+    report(metrics, args.compare)
+    if args.json == '-':
+        json.dump(metrics, sys.stdout, indent=2)
+        print()
+    elif args.json:
+        with open(args.json, 'w') as f:
+            json.dump(metrics, f, indent=2)
+    if metrics['mismatched_submissions']:
+        sys.exit(1)
+
+COMPARED = ['wall_s', 'submissions_per_s', 'tests_per_s', 'overhead_ms_per_test', 'evaluator_cpu_ms_per_test',
+            'evaluator_peak_rss_kb', 'evaluator_total_peak_rss_kb']
+
+def report(metrics, compare_path):
+    baseline = {}
+    if compare_path:
+        with open(compare_path) as f:
+            baseline = json.load(f)
+    print(f"{metrics['submissions']} submissions x {metrics['cases']} test cases of {metrics['case_size']} integers, "
+          f"{metrics['tests_run']} tests run")
+    print(f"{'metric':<28} {'value':>12}" + (f" {'baseline':>12} {'change':>8}" if baseline else ""))
+    for key in COMPARED:
+        line = f"{key:<28} {metrics[key]:>12}"
+        if key in baseline:
+            change = (metrics[key] - baseline[key]) / baseline[key] * 100 if baseline[key] else 0.0
+            line += f" {baseline[key]:>12} {change:>+7.1f}%"
+        print(line)
+    print("verdicts: " + ", ".join(f"{result}: {count}" for result, count in sorted(metrics['verdicts'].items())))
+    if metrics['mismatched_submissions']:
+        print(f"Unexpected verdicts for: {', '.join(metrics['mismatched_submissions'])}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,46 @@
+# __test__/conftest.py
+# Lets the tests import the evaluator package however pytest is started, and
+# provides a throwaway testcase directory and Config to build evaluators on.
+import json
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from evaluator.config import Config # noqa: E402
+from evaluator.testcase import TestCaseFinder # noqa: E402
+
+@pytest.fixture
+def make_test_cases(tmp_path):
+    """make_test_cases(count, groups=None) -> test case pairs in tmp_path/testcases;
+    groups (the manifest's "groups" list) are added to its manifest."""
+    def make(count, groups=None):
+        testcase_dir = tmp_path / "testcases"
+        testcase_dir.mkdir(exist_ok=True)
+        for index in range(1, count + 1):
+            (testcase_dir / f"input{index}.txt").write_text(f"{index} {index}\n")
+            (testcase_dir / f"output{index}.txt").write_text(f"{2 * index}\n")
+        finder = TestCaseFinder(str(testcase_dir))
+        test_cases = finder.find_test_cases()
+        if groups is not None:
+            finder.manifest.data['groups'] = groups
+            finder.manifest.write()
+        return test_cases
+    return make
+
+@pytest.fixture
+def make_config(tmp_path):
+    """make_config(**settings) -> a Config whose directories are all below tmp_path."""
+    def make(**settings):
+        (tmp_path / "sources").mkdir(exist_ok=True)
+        (tmp_path / "testcases").mkdir(exist_ok=True)
+        data = {'source_dir': str(tmp_path / "sources"), 'testcase_dir': str(tmp_path / "testcases"),
+                'exec_dir': str(tmp_path / "executables"), 'result_log': str(tmp_path / "results" / "eval_log.txt"),
+                'csv_file': str(tmp_path / "results" / "eval_results.csv"), 'compile_cache_dir': None}
+        data.update(settings)
+        with open(tmp_path / "config.json", 'w') as f:
+            json.dump(data, f)
+        return Config(str(tmp_path / "config.json"))
+    return make
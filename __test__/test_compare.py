@@ -0,0 +1,71 @@
+# __test__/test_compare.py
+import pytest
+
+from evaluator.compare import WINDOW_BYTES, ExpectedOutput, StreamComparator, compare_files
+
+def stream(tmp_path, expected, *chunks):
+    """The comparator's verdict for output written in these chunks: None when it matches."""
+    path = tmp_path / "expected.txt"
+    path.write_bytes(expected)
+    comparator = StreamComparator(ExpectedOutput.load(str(path)))
+    for chunk in chunks:
+        comparator.feed(chunk)
+    return comparator.finish()
+
+@pytest.mark.parametrize("expected, chunks", [
+    (b"1\r\n2\r\n", [b"1\n2\n"]),
+    (b"1\n2\n", [b"1\r\n2\r\n"]),
+    (b"1\n2\n", [b"1\r", b"\n2\r", b"\n"]), # CRLF split over two chunks
+    (b"1\n2", [b"1\r2"]), # Lone CR, as in text mode
+    (b"1\r\n2\r\n", [b"1\r", b"\n", b"2\r", b"\n"]),
+    (b"\n \n", [b"", b"  ", b"\r\n"]),
+])
+def test_newlines_are_universal(tmp_path, expected, chunks):
+    assert stream(tmp_path, expected, *chunks) is None
+
+def test_split_crlf_is_one_newline(tmp_path):
+    assert stream(tmp_path, b"1\n\n2", b"1\r", b"\n2") is not None
+
+@pytest.mark.parametrize("expected, chunks", [
+    (b"1 2 3\n", [b"  \n", b"1 2", b" 3", b"\n\n  "]),
+    (b"  1 2\n\n", [b"1", b" ", b"2"]),
+    (b"", []),
+    (b"\n \n", [b"", b"  ", b"\n"]),
+    (b"", [b" \t\n"]),
+])
+def test_leading_and_trailing_whitespace_across_chunks(tmp_path, expected, chunks):
+    assert stream(tmp_path, expected, *chunks) is None
+
+@pytest.mark.parametrize("expected, chunks", [
+    (b"1 2", [b"1  2"]), # Inner whitespace counts
+    (b"12", [b"1", b"2", b"3"]),
+    (b"123", [b"12"]),
+    (b"", [b"x"]),
+    (b"x", []),
+    (b"1\n2", [b"1\n", b"2 x"]),
+])
+def test_mismatches(tmp_path, expected, chunks):
+    assert stream(tmp_path, expected, *chunks) is not None
+
+def test_mismatch_shows_where_outputs_differ(tmp_path):
+    mismatch = stream(tmp_path, b"1\n2\n3\n", b"1\n2\n", b"4\n")
+    assert mismatch.expected == "1\n2\n3" and mismatch.actual == "1\n2\n4"
+
+def test_mismatch_window_of_long_outputs(tmp_path):
+    prefix = b"7 " * (2 * WINDOW_BYTES)
+    mismatch = stream(tmp_path, prefix + b"1" * (4 * WINDOW_BYTES), prefix, b"2" * (4 * WINDOW_BYTES))
+    assert mismatch.offset == len(prefix)
+    assert mismatch.expected.startswith("...") and mismatch.expected.endswith("1...")
+    assert len(mismatch.actual) < 3 * WINDOW_BYTES
+
+def test_compare_files_is_exact(tmp_path):
+    path = tmp_path / "expected.txt"
+    path.write_bytes(b"1\n2\n")
+    expected = ExpectedOutput.load(str(path))
+    actual = tmp_path / "actual.txt"
+    actual.write_bytes(b"1\n2\n")
+    assert compare_files(str(actual), expected) is None
+    actual.write_bytes(b"1\n2\n ")
+    assert compare_files(str(actual), expected).offset == 4
+    actual.write_bytes(b"1\r\n2\r\n") # File mode stays byte for byte
+    assert compare_files(str(actual), expected) is not None
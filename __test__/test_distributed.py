@@ -0,0 +1,219 @@
+# __test__/test_distributed.py
+# The coordinator driven by fake worker nodes that speak the protocol
+# directly, and a real WorkerNode talking to a hostile coordinator.
+import os
+import socket
+import subprocess
+import sys
+import threading
+
+import pytest
+
+from evaluator import distributed
+from evaluator.distributed import Coordinator, WorkerNode, parse_address, recv_message, send_message
+
+SOURCES = ["a.cpp", "b.cpp", "c.cpp"]
+
+@pytest.fixture
+def coordinator(tmp_path, make_config, make_test_cases):
+    test_cases = make_test_cases(2)
+    config = make_config(engine='distributed', coordinator_address=f"unix:{tmp_path / 'c.sock'}")
+    for source_file in SOURCES:
+        (tmp_path / "sources" / source_file).write_text("int main() {}\n")
+    coordinator = Coordinator(config, SOURCES, test_cases)
+    coordinator.start()
+    yield coordinator
+    coordinator.close()
+
+def connect(coordinator, name, token=None, slots=None):
+    """A fake node: says hello, returns (socket, welcome) and, with slots, says it's ready."""
+    family, address = parse_address(coordinator.address)
+    sock = socket.socket(family, socket.SOCK_STREAM)
+    sock.settimeout(10)
+    sock.connect(address)
+    send_message(sock, {'type': 'hello', 'name': name, 'token': token})
+    welcome, _ = recv_message(sock)
+    if slots:
+        send_message(sock, {'type': 'ready', 'slots': slots})
+    return sock, welcome
+
+def answer(sock, job, source_file, node):
+    submission = {'program_name': os.path.splitext(source_file)[0], 'language': 'cpp', 'rows': [[node]],
+                  'cache_hit': False, 'score': None, 'reused': 0, 'compile_seconds': 0.0, 'busy_seconds': 0.0}
+    send_message(sock, {'type': 'result', 'job': job, 'submission': submission})
+
+def collect(coordinator):
+    """Consumes results_in_order() on a thread; returns (thread, list it appends to)."""
+    results = []
+    thread = threading.Thread(target=lambda: results.extend(coordinator.results_in_order()), daemon=True)
+    thread.start()
+    return thread, results
+
+def test_welcome_lists_the_test_cases(coordinator):
+    sock, welcome = connect(coordinator, "n1")
+    assert welcome['type'] == 'welcome'
+    assert [case['input']['name'] for case in welcome['cases']] == ["input1.txt", "input2.txt"]
+    send_message(sock, {'type': 'fetch', 'digests': [welcome['cases'][0]['input']['sha256'], "0" * 64]})
+    reply, blobs = recv_message(sock)
+    assert reply['digests'] == [welcome['cases'][0]['input']['sha256']] # Unknown digests aren't served
+    assert blobs == [b"1 1\n"]
+    sock.close()
+
+def test_results_come_in_submission_order(coordinator):
+    thread, results = collect(coordinator)
+    sock, _ = connect(coordinator, "n1", slots=3)
+    jobs = [recv_message(sock)[0] for _ in SOURCES]
+    assert [job['source_file'] for job in jobs] == SOURCES
+    for job in reversed(jobs):
+        answer(sock, job['job'], job['source_file'], "n1")
+    thread.join(10)
+    assert [result.source_file for result in results] == SOURCES
+    assert results[0].rows == [("n1",)]
+    sock.close()
+
+def test_jobs_of_a_lost_node_are_requeued(coordinator):
+    thread, results = collect(coordinator)
+    lost, _ = connect(coordinator, "lost", slots=2)
+    taken = [recv_message(lost)[0]['job'] for _ in range(2)]
+    assert taken == [0, 1]
+    lost.close()
+
+    sock, _ = connect(coordinator, "n2", slots=1)
+    for expected in [0, 1, 2]: # Re-queued jobs go first, in order
+        job, blobs = recv_message(sock)
+        assert job['job'] == expected and blobs == [b"int main() {}\n"]
+        answer(sock, job['job'], job['source_file'], "n2")
+    thread.join(10)
+    assert [result.rows for result in results] == [[("n2",)]] * 3
+    assert coordinator.attempts == [2, 2, 1]
+    sock.close()
+
+def test_job_lost_too_often_gets_a_runner_error(coordinator):
+    thread, results = collect(coordinator)
+    for attempt in range(Coordinator.MAX_ATTEMPTS):
+        sock, _ = connect(coordinator, f"lost{attempt}", slots=1)
+        assert recv_message(sock)[0]['job'] == 0
+        sock.close()
+    sock, _ = connect(coordinator, "n", slots=3)
+    for expected in [1, 2]:
+        job, _ = recv_message(sock)
+        assert job['job'] == expected
+        answer(sock, job['job'], job['source_file'], "n")
+    thread.join(10)
+    assert results[0].rows[0][2] == "Runner Error"
+    assert results[1].rows == [("n",)]
+    sock.close()
+
+def test_result_for_a_job_not_given_drops_the_node(coordinator):
+    thread, results = collect(coordinator)
+    sock, _ = connect(coordinator, "liar", slots=1)
+    assert recv_message(sock)[0]['job'] == 0
+    answer(sock, 2, "c.cpp", "liar")
+    assert recv_message(sock) == (None, []) # Hung up on
+    sock.close()
+    honest, _ = connect(coordinator, "n", slots=3)
+    for _ in SOURCES:
+        job, _ = recv_message(honest)
+        answer(honest, job['job'], job['source_file'], "n")
+    thread.join(10)
+    assert [result.rows for result in results] == [[("n",)]] * 3
+    honest.close()
+
+def test_dotfile_in_source_dir_is_not_sent(tmp_path, make_config, make_test_cases):
+    config = make_config(engine='distributed', coordinator_address=f"unix:{tmp_path / 'c.sock'}")
+    (tmp_path / "sources" / ".gitkeep").write_text("")
+    (tmp_path / "sources" / "a.cpp").write_text("int main() {}\n")
+    coordinator = Coordinator(config, [".gitkeep", "a.cpp"], make_test_cases(1))
+    coordinator.start()
+    try:
+        thread, results = collect(coordinator)
+        sock, _ = connect(coordinator, "n", slots=2)
+        job, _ = recv_message(sock)
+        assert job['source_file'] == "a.cpp"
+        answer(sock, job['job'], job['source_file'], "n")
+        thread.join(10)
+        assert results[0].rows[0][2] == "Runner Error" and "unsafe file name '.gitkeep'" in results[0].rows[0][5]
+        assert results[1].rows == [("n",)]
+        sock.close()
+    finally:
+        coordinator.close()
+
+def test_jobs_fail_once_every_local_node_exited(coordinator):
+    coordinator.local_workers = [subprocess.Popen([sys.executable, "-c", "pass"])] # A node that gave up
+    thread, results = collect(coordinator)
+    thread.join(10)
+    assert [result.rows[0][2] for result in results] == ["Runner Error"] * len(SOURCES)
+    assert results[0].rows[0][5] == "Error: no worker node left to evaluate it"
+
+def test_worker_node_answers_a_job_with_an_unsafe_name(tmp_path, make_config, make_test_cases):
+    config = make_config(engine='distributed', coordinator_address=f"unix:{tmp_path / 'c.sock'}", workers=1)
+    (tmp_path / "evil.c").write_text("int main() {}\n")
+    coordinator = Coordinator(config, ["a.c"], make_test_cases(1))
+    coordinator.source_files[0] = "../evil.c" # What a hostile coordinator could send
+    coordinator.start()
+    node = WorkerNode(coordinator.address, cache_dir=str(tmp_path / "cache"))
+    node_thread = threading.Thread(target=node.run, daemon=True)
+    node_thread.start()
+    try:
+        thread, results = collect(coordinator)
+        thread.join(60)
+        assert results[0].rows[0][2] == "Runner Error" and "unsafe file name" in results[0].rows[0][5]
+    finally:
+        coordinator.close()
+    node_thread.join(30)
+    assert not node_thread.is_alive() # Still served the coordinator until it was done
+
+def test_wrong_token_is_rejected(tmp_path, make_config, make_test_cases):
+    config = make_config(engine='distributed', coordinator_address=f"unix:{tmp_path / 'c.sock'}", coordinator_token="s3cret")
+    coordinator = Coordinator(config, SOURCES, make_test_cases(1))
+    coordinator.start()
+    try:
+        sock, reply = connect(coordinator, "n", token="guess")
+        assert reply == {'type': 'error', 'error': "wrong coordinator_token"}
+        sock.close()
+        sock, reply = connect(coordinator, "n", token="s3cret")
+        assert reply['type'] == 'welcome'
+        sock.close()
+    finally:
+        coordinator.close()
+
+def test_token_required_off_loopback(make_config):
+    with pytest.raises(ValueError, match="coordinator_token"):
+        make_config(engine='distributed', coordinator_address="0.0.0.0:7788")
+    make_config(engine='distributed', coordinator_address="0.0.0.0:7788", coordinator_token="s3cret")
+    make_config(engine='distributed', coordinator_address="localhost:7788")
+    make_config(engine='distributed', coordinator_address="127.0.0.2:7788")
+    config = make_config(coordinator_address="grader.example.org:7788")
+    with pytest.raises(ValueError, match="coordinator_token"):
+        config.set_engine('distributed')
+
+@pytest.mark.parametrize("name", ["../evil", "/tmp/evil", "sub/evil", ".bashrc", "..", "", "manifest.json", None])
+def test_unsafe_names_are_refused(name):
+    with pytest.raises(ValueError, match="unsafe file name"):
+        distributed._check_name(name)
+
+def test_worker_node_refuses_unsafe_test_case_names(tmp_path, make_config, make_test_cases):
+    test_cases = make_test_cases(1)
+    config = make_config(engine='distributed', coordinator_address=f"unix:{tmp_path / 'c.sock'}")
+    settings = Coordinator(config, SOURCES, test_cases).settings
+    listener = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    listener.bind(str(tmp_path / "evil.sock"))
+    listener.listen()
+
+    def hostile_coordinator():
+        sock, _ = listener.accept()
+        recv_message(sock)
+        entry = {'name': "../../escaped.txt", 'sha256': "0" * 64, 'size': 1, 'mtime_ns': 0}
+        send_message(sock, {'type': 'welcome', 'settings': settings, 'manifest': {},
+                            'cases': [{'index': 1, 'input': entry, 'output': entry}]})
+        recv_message(sock) # Until the node hangs up
+        sock.close()
+    thread = threading.Thread(target=hostile_coordinator, daemon=True)
+    thread.start()
+    node = WorkerNode(f"unix:{tmp_path / 'evil.sock'}", cache_dir=str(tmp_path / "cache"))
+    with pytest.raises(ValueError, match="unsafe file name"):
+        node.run()
+    thread.join(10)
+    listener.close()
+    assert not (tmp_path / "escaped.txt").exists()
+    assert not [name for name in os.listdir(tmp_path / "cache") if name.startswith("session-")] # Removed again
@@ -0,0 +1,57 @@
+# __test__/test_fail_fast.py
+# fail_fast and the reuse of earlier verdicts, with a runner that hands out
+# made-up verdicts instead of running anything.
+from evaluator.worker import SKIPPED, SubmissionEvaluator, SubmissionResult
+
+class FakeRunner:
+    def __init__(self, results):
+        self.results = results # Test case name -> result, "Correct" if missing
+        self.ran = []
+
+    def run_code(self, executable_path, input_file, output_file, language, program_name):
+        name = input_file.rsplit('/', 1)[-1]
+        self.ran.append(name)
+        return self.results.get(name, "Correct"), 0.5, 1000, 0.25, 0.0, ""
+
+def run_tests(config, test_cases, results=None, known=None):
+    """run_tests() of a submission "prog" with made-up verdicts. Returns (test cases run, submission)."""
+    evaluator = SubmissionEvaluator(config, test_cases)
+    evaluator.runner = FakeRunner(results or {})
+    submission = SubmissionResult("prog.c")
+    submission.program_name = "prog"
+    submission.language = "c"
+    submission.executable_path = "prog_c"
+    submission.known_verdicts = known or {}
+    evaluator.run_tests(submission)
+    return evaluator.runner.ran, submission
+
+def known_verdict(result):
+    return (result, 0.25, 500, "", 0.1, 0.0)
+
+def test_without_fail_fast_every_test_case_runs(make_config, make_test_cases):
+    ran, submission = run_tests(make_config(), make_test_cases(3), {"input2.txt": "Wrong Answer"})
+    assert ran == ["input1.txt", "input2.txt", "input3.txt"]
+    assert [row[2] for row in submission.rows] == ["Correct", "Wrong Answer", "Correct"]
+
+def test_fail_fast_skips_the_rest(make_config, make_test_cases):
+    ran, submission = run_tests(make_config(fail_fast=True), make_test_cases(4), {"input2.txt": "Runtime Error"})
+    assert ran == ["input1.txt", "input2.txt"]
+    assert [row[2] for row in submission.rows] == ["Correct", "Runtime Error", SKIPPED, SKIPPED]
+    assert submission.rows[3][5] == "Not run: input2.txt gave Runtime Error"
+
+def test_known_failure_triggers_fail_fast(make_config, make_test_cases):
+    known = {"input1.txt": known_verdict("Correct"), "input2.txt": known_verdict("Time Limit Exceeded")}
+    ran, submission = run_tests(make_config(fail_fast=True), make_test_cases(3), known=known)
+    assert ran == [] and submission.reused == 2
+    assert [row[2] for row in submission.rows] == ["Correct", "Time Limit Exceeded", SKIPPED]
+
+def test_settled_from_known_verdicts_without_running(make_config, make_test_cases):
+    evaluator = SubmissionEvaluator(make_config(fail_fast=True), make_test_cases(3))
+    submission = SubmissionResult("prog.c")
+    submission.program_name = "prog"
+    submission.known_verdicts = {"input2.txt": known_verdict("Wrong Answer")}
+    assert not evaluator._settle_from_known(submission) and not submission.rows # input1.txt has to run
+    submission.known_verdicts["input1.txt"] = known_verdict("Correct")
+    assert evaluator._settle_from_known(submission)
+    assert [row[2] for row in submission.rows] == ["Correct", "Wrong Answer", SKIPPED]
+    assert submission.reused == 2
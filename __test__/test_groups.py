@@ -0,0 +1,79 @@
+# __test__/test_groups.py
+# The rows SubmissionEvaluator._schedule decides for grouped test cases, fed
+# made-up verdicts through send().
+from evaluator.worker import SKIPPED, SubmissionEvaluator, SubmissionResult
+
+GROUPS = [{"name": "small", "weight": 40, "cases": [1, 2]},
+          {"name": "large", "weight": 60, "cases": [3, 4], "time_limit_seconds": 7, "depends_on": ["small"]}]
+
+def new_submission(known=None):
+    submission = SubmissionResult("prog.c")
+    submission.program_name = "prog"
+    submission.known_verdicts = known or {}
+    return submission
+
+def schedule(evaluator, results=None, known=None):
+    """Runs _schedule with made-up verdicts (test case name -> result, "Correct" by default).
+    Returns (what it asked to run, rows, reused, score)."""
+    steps = evaluator._schedule(new_submission(known))
+    requests = []
+    try:
+        request = next(steps)
+        while True:
+            requests.append(request)
+            name = request[0]
+            request = steps.send(("prog", name, (results or {}).get(name, "Correct"), 0.5, 1000, ""))
+    except StopIteration as done:
+        rows, reused, score = done.value
+    return requests, rows, reused, score
+
+def ran(requests):
+    return [request[0] for request in requests]
+
+def results_of(rows):
+    return {row[1]: row[2] for row in rows}
+
+def known_verdict(result):
+    return (result, 0.25, 500, "", 0.1, 0.0)
+
+def test_groups_score_all_or_nothing(make_config, make_test_cases):
+    evaluator = SubmissionEvaluator(make_config(), make_test_cases(4, GROUPS))
+    _, rows, _, score = schedule(evaluator, {"input4.txt": "Wrong Answer"})
+    assert score == 40
+    assert rows[-3:] == [("prog", "Group small", "Group Passed", 1.0, 1000, "Score: 40/40"),
+                         ("prog", "Group large", "Group Failed", 1.0, 1000, "Score: 0/60"),
+                         ("prog", "Total", "Score", 2.0, 1000, "Score: 40/100")]
+
+def test_group_failure_skips_its_rest_and_dependents(make_config, make_test_cases):
+    evaluator = SubmissionEvaluator(make_config(), make_test_cases(4, GROUPS))
+    requests, rows, _, score = schedule(evaluator, {"input1.txt": "Wrong Answer"})
+    assert ran(requests) == ["input1.txt"] and score == 0
+    assert rows[1][2] == SKIPPED and rows[1][5] == "Not run: input1.txt gave Wrong Answer"
+    assert rows[2][5] == rows[3][5] == "Not run: group small failed"
+    assert results_of(rows)["Group large"] == "Group Skipped"
+
+def test_independent_groups_still_run(make_config, make_test_cases):
+    groups = [dict(group, depends_on=[]) for group in GROUPS]
+    evaluator = SubmissionEvaluator(make_config(), make_test_cases(4, groups))
+    requests, _, _, score = schedule(evaluator, {"input1.txt": "Wrong Answer"})
+    assert ran(requests) == ["input1.txt", "input3.txt", "input4.txt"] and score == 60
+
+def test_ungrouped_cases_run_last_with_global_limits(make_config, make_test_cases):
+    groups = GROUPS[:1] + [{"name": "large", "weight": 60, "cases": [3], "time_limit_seconds": 7}]
+    evaluator = SubmissionEvaluator(make_config(time_limit_seconds=2), make_test_cases(4, groups))
+    requests, _, _, _ = schedule(evaluator)
+    assert ran(requests) == ["input1.txt", "input2.txt", "input3.txt", "input4.txt"]
+    limits = {request[0]: request[3].config.time_limit_seconds for request in requests}
+    assert limits == {"input1.txt": 2, "input2.txt": 2, "input3.txt": 7, "input4.txt": 2}
+
+def test_settled_from_known_verdicts_of_a_failed_group(make_config, make_test_cases):
+    evaluator = SubmissionEvaluator(make_config(), make_test_cases(4, GROUPS))
+    submission = new_submission({"input1.txt": known_verdict("Wrong Answer")})
+    assert evaluator._settle_from_known(submission) # Its failure decides every other test case
+    assert submission.score == 0 and submission.reused == 1
+
+    submission = new_submission({"input1.txt": known_verdict("Correct"), "input2.txt": known_verdict("Correct"),
+                                 "input3.txt": known_verdict("Runtime Error")})
+    assert evaluator._settle_from_known(submission)
+    assert submission.score == 40 and submission.reused == 3
+    assert results_of(submission.rows)["input4.txt"] == SKIPPED
@@ -0,0 +1,171 @@
+# __test__/test_results_store.py
+import csv
+
+from evaluator import testcase
+from evaluator.results_store import ResultsStore, VerdictCache
+from evaluator.worker import SubmissionResult
+
+def submission(source_file, rows, language="c", source_sha256=None):
+    result = SubmissionResult(source_file)
+    result.program_name = source_file.split('.')[0]
+    result.language = language
+    result.source_sha256 = source_sha256 or f"sha-{source_file}"
+    result.rows = rows
+    return result
+
+def start_run(store, config):
+    return store.start_run(config, testcase.TestCaseManifest.for_dir(config.testcase_dir))
+
+def store_verdicts(db_path, config, rows, language="c", source_sha256="sha-add"):
+    store = ResultsStore(db_path)
+    start_run(store, config)
+    store.add_submission(submission("add.c", rows, language, source_sha256), "")
+    store.finish_run()
+    store.close()
+
+def test_verdict_cache_reuses_only_matching_verdicts(tmp_path, make_config, make_test_cases):
+    test_cases = make_test_cases(2)
+    config = make_config(time_limit_seconds=2)
+    db_path = str(tmp_path / "results.db")
+    store_verdicts(db_path, config, [("add", "input1.txt", "Correct", 0.1, 100, "", 0.05, 0.0),
+                                     ("add", "input2.txt", "Runner Error", 0, 0, "boom", 0.0, 0.0)])
+    cache = VerdictCache(db_path, config, test_cases)
+    assert cache.lookup("sha-add", "c") == {"input1.txt": ("Correct", 0.1, 100, "", 0.05, 0.0)}
+    assert cache.lookup("sha-add", "cpp") == {} # Other language
+    assert cache.lookup("sha-other", "c") == {} # Other source
+    assert VerdictCache(db_path, make_config(time_limit_seconds=3), test_cases).lookup("sha-add", "c") == {}
+    assert VerdictCache(db_path, make_config(time_limit_seconds=2, io_mode='file'), test_cases).lookup("sha-add", "c") == {}
+
+def test_verdict_cache_follows_test_case_content(tmp_path, make_config, make_test_cases):
+    test_cases = make_test_cases(2)
+    config = make_config()
+    db_path = str(tmp_path / "results.db")
+    store_verdicts(db_path, config, [("add", "input1.txt", "Correct", 0.1, 100, "", 0.0, 0.0),
+                                     ("add", "input2.txt", "Correct", 0.1, 100, "", 0.0, 0.0)])
+    (tmp_path / "testcases" / "output2.txt").write_text("a different answer\n")
+    (tmp_path / "testcases" / "input3.txt").write_text("1 1\n") # A copy of the first pair
+    (tmp_path / "testcases" / "output3.txt").write_text("2\n")
+    test_cases = testcase.TestCaseFinder(config.testcase_dir).find_test_cases() # Reindexes the changed files
+    assert set(VerdictCache(db_path, config, test_cases).lookup("sha-add", "c")) == {"input1.txt", "input3.txt"}
+
+def test_verdict_cache_without_database(tmp_path, make_config, make_test_cases):
+    cache = VerdictCache(str(tmp_path / "missing.db"), make_config(), make_test_cases(1))
+    assert cache.lookup("sha-add", "c") == {}
+    assert not (tmp_path / "missing.db").exists()
+
+def test_skipped_rows_are_not_stored_as_verdicts(tmp_path, make_config, make_test_cases):
+    test_cases = make_test_cases(2)
+    config = make_config(fail_fast=True)
+    db_path = str(tmp_path / "results.db")
+    store_verdicts(db_path, config, [("add", "input1.txt", "Wrong Answer", 0.1, 100, "", 0.0, 0.0),
+                                     ("add", "input2.txt", "Skipped", 0, 0, "Not run: input1.txt gave Wrong Answer")])
+    assert set(VerdictCache(db_path, config, test_cases).lookup("sha-add", "c")) == {"input1.txt"}
+
+def test_adaptive_order_puts_likely_failures_first(tmp_path, make_config, make_test_cases):
+    test_cases = make_test_cases(3)
+    config = make_config()
+    db_path = str(tmp_path / "results.db")
+    assert VerdictCache(db_path, config, test_cases).order_test_cases() == test_cases # No history yet
+    for source, third in (("sha-1", "Wrong Answer"), ("sha-2", "Wrong Answer"), ("sha-3", "Correct")):
+        store_verdicts(db_path, config, [("add", "input1.txt", "Correct", 0.1, 100, "", 0.0, 0.0),
+                                         ("add", "input3.txt", third, 0.1, 100, "", 0.0, 0.0)], source_sha256=source)
+    order = VerdictCache(db_path, config, test_cases).order_test_cases()
+    # input3.txt failed 2 of 3 times, input2.txt has no history (counts as half), input1.txt never failed
+    assert [input_file.rsplit('/', 1)[-1] for input_file, _ in order] == ["input3.txt", "input2.txt", "input1.txt"]
+
+def test_verdict_cache_follows_group_limits(tmp_path, make_config, make_test_cases):
+    groups = [{"name": "small", "weight": 40, "cases": [1]}, {"name": "large", "weight": 60, "cases": [2]}]
+    test_cases = make_test_cases(2, groups)
+    config = make_config(time_limit_seconds=2)
+    db_path = str(tmp_path / "results.db")
+    store_verdicts(db_path, config, [("add", "input1.txt", "Correct", 0.1, 100, "", 0.0, 0.0),
+                                     ("add", "input2.txt", "Correct", 0.1, 100, "", 0.0, 0.0)])
+    manifest = testcase.TestCaseManifest.for_dir(config.testcase_dir)
+    manifest.data['groups'][1]['time_limit_seconds'] = 10 # The large group gets its own limit
+    manifest.write()
+    assert set(VerdictCache(db_path, config, test_cases).lookup("sha-add", "c")) == {"input1.txt"}
+
+GROUPS = [{"name": "small", "weight": 40, "cases": [1, 2]}, {"name": "large", "weight": 60, "cases": [3]}]
+
+def graded(program, results, times=(0.2, 0.3, 0.5)):
+    """Test rows plus the score rows SubmissionEvaluator adds for GROUPS."""
+    rows = [(program, f"input{i}.txt", result, time_s, 1000 * i, "", time_s / 2, 0.0)
+            for i, (result, time_s) in enumerate(zip(results, times), 1)]
+    small = all(result == "Correct" for result in results[:2])
+    large = results[2] == "Correct"
+    rows += [(program, "Group small", "Group Passed" if small else "Group Failed", sum(times[:2]), 2000,
+              f"Score: {40 if small else 0}/40"),
+             (program, "Group large", "Group Passed" if large else "Group Failed", times[2], 3000,
+              f"Score: {60 if large else 0}/60"),
+             (program, "Total", "Score", sum(times), 3000, f"Score: {40 * small + 60 * large}/100")]
+    return rows
+
+def test_score_rows_are_kept_out_of_the_results_table(tmp_path, make_config, make_test_cases):
+    make_test_cases(3, GROUPS)
+    store = ResultsStore(str(tmp_path / "results.db"))
+    start_run(store, make_config())
+    store.add_submission(submission("add.c", graded("add", ["Correct"] * 3)), "")
+    store.finish_run()
+    assert [row[0] for row in store.conn.execute("SELECT test_case_name FROM results ORDER BY id")] == \
+        ["input1.txt", "input2.txt", "input3.txt"]
+    assert [row[0] for row in store.conn.execute("SELECT name FROM group_scores ORDER BY id")] == \
+        ["Group small", "Group large", "Total"]
+    store.close()
+
+def test_totals_count_only_test_rows(tmp_path, make_config, make_test_cases):
+    make_test_cases(3, GROUPS)
+    store = ResultsStore(str(tmp_path / "results.db"))
+    run_id = start_run(store, make_config())
+    store.add_submission(submission("add.c", graded("add", ["Correct", "Wrong Answer", "Correct"])), "")
+    store.add_submission(submission("bad.c", [("bad", "N/A", "Compilation Error", 0, 0, "Error: x")]), "")
+    store.finish_run()
+    totals = {row[0]: row[1:] for row in store.program_totals(run_id)}
+    assert totals["add.c"][:3] == (3, 2, 1.0) and totals["add.c"][4] == 3000
+    assert totals["bad.c"][:2] == (0, 0)
+    store.close()
+
+def test_totals_ignore_score_rows_of_older_databases(tmp_path, make_config, make_test_cases):
+    make_test_cases(3, GROUPS)
+    store = ResultsStore(str(tmp_path / "results.db"))
+    run_id = start_run(store, make_config())
+    store.add_submission(submission("add.c", graded("add", ["Correct"] * 3)[:3]), "")
+    store.flush()
+    with store.conn: # What versions that kept score rows in results wrote
+        store.conn.execute("INSERT INTO results (run_id, submission_id, test_case_id, test_case_name, result, time_s)"
+                           " SELECT run_id, submission_id, NULL, 'Total', 'Score', 1.0 FROM results LIMIT 1")
+    assert store.program_totals(run_id)[0][1:4] == (3, 3, 1.0)
+    store.close()
+
+def test_export_keeps_score_rows_after_their_tests(tmp_path, make_config, make_test_cases):
+    make_test_cases(3, GROUPS)
+    store = ResultsStore(str(tmp_path / "results.db"))
+    run_id = start_run(store, make_config())
+    first, second = graded("add", ["Correct"] * 3), graded("mul", ["Correct", "Correct", "Runtime Error"])
+    store.add_submission(submission("add.c", first), "")
+    store.add_submission(submission("mul.c", second), "")
+    store.finish_run()
+    store.export_csv(run_id, str(tmp_path / "out.csv"))
+    with open(tmp_path / "out.csv", newline='') as f:
+        header, *exported = csv.reader(f)
+    # The columns of the original CSV keep their positions
+    assert header[:6] == ['Program', 'TestCase Input', 'Result', 'Time (s)', 'Memory (KB)', 'Error/Details']
+    assert [(row[0], row[1], row[2]) for row in exported] == [row[:3] for row in first + second]
+    assert exported[0][4:] == ["1000", "", "0.1000", "0.0000"]
+    assert exported[-1][5] == "Score: 40/100"
+    store.close()
+
+def test_diff_lists_changed_tests_and_scores(tmp_path, make_config, make_test_cases):
+    make_test_cases(3, GROUPS)
+    config = make_config()
+    store = ResultsStore(str(tmp_path / "results.db"))
+    old = start_run(store, config)
+    store.add_submission(submission("add.c", graded("add", ["Correct", "Correct", "Wrong Answer"])), "")
+    store.finish_run()
+    new = start_run(store, config)
+    store.add_submission(submission("add.c", graded("add", ["Correct"] * 3)), "")
+    store.finish_run()
+    assert store.diff_runs(old, new) == [
+        ("add.c", "Group large", "Group Failed (Score: 0/60)", "Group Passed (Score: 60/60)"),
+        ("add.c", "Total", "Score (Score: 40/100)", "Score (Score: 100/100)"),
+        ("add.c", "input3.txt", "Wrong Answer", "Correct")]
+    store.close()
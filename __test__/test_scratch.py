@@ -0,0 +1,38 @@
+# __test__/test_scratch.py
+import os
+
+import pytest
+
+from evaluator.scratch import cleanup_scratch, prepare_scratch
+
+def test_inputs_are_linked_on_the_same_file_system(tmp_path, make_config, make_test_cases):
+    test_cases = make_test_cases(2)
+    config = make_config(io_mode='file', scratch_dir=str(tmp_path / "scratch"))
+    prepare_scratch(config, test_cases)
+    try:
+        for input_file, _ in test_cases:
+            assert os.path.samefile(config.staged_inputs[input_file], input_file)
+    finally:
+        cleanup_scratch(config)
+    assert not os.path.exists(config.scratch_path)
+
+@pytest.mark.skipif(not os.path.isdir("/dev/shm"), reason="needs /dev/shm")
+def test_inputs_are_copied_to_another_file_system(tmp_path, make_config, make_test_cases, capsys):
+    test_cases = make_test_cases(2)
+    if os.stat(tmp_path).st_dev == os.stat("/dev/shm").st_dev:
+        pytest.skip("tmp_path is on /dev/shm")
+    config = make_config(io_mode='file', scratch_dir="/dev/shm")
+    prepare_scratch(config, test_cases)
+    try:
+        for input_file, _ in test_cases:
+            staged = config.staged_inputs[input_file]
+            assert not os.path.samefile(staged, input_file)
+            assert open(staged).read() == open(input_file).read()
+        assert "2 inputs copied for this run" in capsys.readouterr().out
+    finally:
+        cleanup_scratch(config)
+
+def test_stdin_mode_has_no_workspace(make_config, make_test_cases):
+    config = make_config(io_mode='stdin', scratch_dir="auto")
+    prepare_scratch(config, make_test_cases(1))
+    assert config.scratch_path is None and config.staged_inputs == {}
@@ -0,0 +1,61 @@
+# calibrate.py
+import argparse
+import sys
+
+from evaluator.calibration import Calibration, CalibrationError
+from evaluator.config import Config
+from evaluator.launcher import prepare_launcher
+from evaluator.scratch import cleanup_scratch, prepare_scratch
+from evaluator.testcase import TestCaseFinder
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Derive per-test-case time limits from a reference solution "
+                                                 "and store them in the testcase manifest.")
+    parser.add_argument('reference', nargs='?', help="Reference solution (C, C++ or Python source)")
+    parser.add_argument('--config', '-c', default='config.json', help="Path to the configuration file")
+    parser.add_argument('--runs', '-n', type=int, default=5, help="Runs per test case; the median time counts")
+    parser.add_argument('--factor', type=float, default=3.0, help="Limit = factor x reference time + floor")
+    parser.add_argument('--floor', type=float, default=0.1, help="Seconds added to every limit")
+    parser.add_argument('--clear', action='store_true', help="Remove the calibrated limits and use time_limit_seconds again")
+    args = parser.parse_args()
+    if not args.clear and not args.reference:
+        parser.error("a reference solution is required (or --clear)")
+    if args.runs < 1 or args.factor <= 0 or args.floor < 0:
+        parser.error("--runs and --factor must be positive, --floor non-negative")
+    return args
+
+def main():
+    args = parse_args()
+    try:
+        config = Config(args.config)
+    except Exception as e:
+        sys.exit(f"Error loading {args.config}: {e}")
+
+    finder = TestCaseFinder(config.testcase_dir)
+    if not finder.find_test_cases():
+        sys.exit(f"Error: No test cases found in '{config.testcase_dir}'.")
+    calibration = Calibration(config, finder.manifest, args.runs, args.factor, args.floor)
+
+    if args.clear:
+        calibration.clear()
+        print(f"Removed the calibrated time limits from {finder.manifest.path}")
+        return
+
+    uncalibrated = sum(limit for limit, _ in finder.manifest.limits(config, calibrated=False).values())
+    prepare_launcher(config)
+    prepare_scratch(config, finder.manifest.test_cases())
+    print(f"Calibrating with {args.reference}: {args.runs} runs per test case, "
+          f"limit = {args.factor} x median {config.limit_mode} time + {args.floor}s")
+    try:
+        results = calibration.calibrate(args.reference)
+    except CalibrationError as e:
+        sys.exit(f"Error: {e}\nNothing was changed.")
+    finally:
+        cleanup_scratch(config)
+    calibration.write(args.reference, results)
+    total = sum(limit for _, _, limit in results)
+    print(f"Stored {len(results)} time limits in {finder.manifest.path} "
+          f"(worst case {total:.2f}s per submission, was {uncalibrated:.2f}s)")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,115 @@
+# evaluator/async_runner.py
+import asyncio
+import os
+import time
+
+from evaluator.compare import CHUNK_SIZE
+from evaluator.process_tree import kill_tree
+from evaluator.runner import Runner, _Execution
+from evaluator.tracing import span
+
+class AsyncRunner(Runner):
+    """Runner whose test runs are coroutines supervised by a single event loop.
+
+    Verdicts come from the same Runner._build_command/_judge code as run_code,
+    only the waiting differs. Processes are started with the regular launcher
+    (no preexec_fn, so spawning never blocks the loop for long) and supervised
+    through a pidfd, then reaped with wait4() so memory and CPU accounting match
+    the synchronous Runner. asyncio.create_subprocess_exec is not used because
+    its child watcher reaps the process itself and discards the rusage.
+    """
+
+    def __init__(self, config, max_concurrency=None):
+        super().__init__(config)
+        self.max_concurrency = max_concurrency or getattr(config, 'async_concurrency', 0) or os.cpu_count() or 1
+        self._semaphore = asyncio.Semaphore(self.max_concurrency)
+
+    async def run_code(self, program_path, input_file, expected_output_file, language, program_name_for_py=None):
+        """Coroutine version of Runner.run_code, returning the same tuple."""
+        if language not in ['python', 'c', 'cpp']:
+            return "Unsupported Language", 0, 0, 0.0, 0.0, "Unknown language for execution."
+        if self.config.io_mode not in ['stdin', 'file']:
+            return "Config Error", 0, 0, 0.0, 0.0, "Invalid I/O mode in config."
+
+        async with self._semaphore:
+            cmd, temp_output_file = self._build_command(program_path, input_file, language, program_name_for_py)
+            self._start_zygote(language)
+            execution = None
+            with span("test", program=program_name_for_py, test_case=os.path.basename(input_file)) as test_span:
+                try:
+                    execution = self._new_execution(expected_output_file)
+                    await self._execute_async(execution, cmd, input_file)
+                    with span("judge"):
+                        outcome = self._judge(execution, expected_output_file, temp_output_file)
+                except Exception as e:
+                    execution = execution or _Execution()
+                    outcome = "Runtime Error", execution.elapsed(), *execution.usage, f"General Error during execution: {e}"
+                finally:
+                    self._remove_temp_output(temp_output_file)
+                    if execution and execution.process and execution.process.returncode is None:
+                        kill_tree(execution.process)
+                        await self._wait_exit(execution.process)
+                test_span.set(result=outcome[0])
+                return outcome
+
+    async def _execute_async(self, execution, cmd, input_file):
+        execution.start_time = time.time()
+        self._spawn(execution, cmd, input_file)
+        process = execution.process
+
+        with span("execute"):
+            stdout_task = asyncio.ensure_future(self._read_pipe(process.stdout, execution.feed_stdout))
+            stderr_task = asyncio.ensure_future(self._read_pipe(process.stderr, execution.feed_stderr))
+            loop = asyncio.get_running_loop()
+            deadline = loop.time() + self._wall_timeout()
+            try:
+                await asyncio.wait_for(self._wait_exit(process), timeout=self._wall_timeout())
+            except asyncio.TimeoutError:
+                kill_tree(process) # Also ends descendants holding the pipes open
+                await self._wait_exit(process)
+                execution.timed_out = True
+            # A descendant may keep the pipes open after the program exited; like the
+            # synchronous Runner, wait for them until the deadline, then kill the group
+            readers = asyncio.gather(stdout_task, stderr_task)
+            done, _ = await asyncio.wait({readers}, timeout=max(deadline - loop.time(), 0))
+            if not done:
+                kill_tree(process)
+                execution.timed_out = True
+            await readers
+        execution.finish(self._tree_usage(process))
+
+    async def _read_pipe(self, pipe, sink):
+        """Reads a Popen pipe to EOF without blocking the loop, passing each chunk to sink."""
+        loop = asyncio.get_running_loop()
+        reader = asyncio.StreamReader(loop=loop)
+        transport, _ = await loop.connect_read_pipe(lambda: asyncio.StreamReaderProtocol(reader, loop=loop), pipe)
+        try:
+            while chunk := await reader.read(CHUNK_SIZE):
+                sink(chunk)
+        finally:
+            transport.close()
+
+    async def _wait_exit(self, process):
+        """Waits for the process to exit, then reaps it (with wait4, via Popen.wait)."""
+        if process.returncode is not None:
+            return
+        loop = asyncio.get_running_loop()
+        try:
+            pidfd = os.pidfd_open(process.pid)
+        except (AttributeError, OSError):
+            # No pidfd (non-Linux or kernel < 5.3): fall back to a waiting thread
+            await loop.run_in_executor(None, process.wait)
+            return
+
+        exited = loop.create_future()
+        loop.add_reader(pidfd, lambda: exited.done() or exited.set_result(None))
+        try:
+            await exited
+        finally:
+            loop.remove_reader(pidfd)
+            os.close(pidfd)
+        process.wait() # Already exited, returns at once
+
+    async def run_many(self, jobs):
+        """Runs run_code(*job) for every job concurrently; results are in job order."""
+        return await asyncio.gather(*(self.run_code(*job) for job in jobs))
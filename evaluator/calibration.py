@@ -0,0 +1,92 @@
+# evaluator/calibration.py
+import datetime
+import math
+import os
+import shutil
+import statistics
+
+from evaluator.compare import file_digest
+from evaluator.compiler import Compiler
+from evaluator.runner import Runner
+
+class CalibrationError(Exception):
+    """The reference solution couldn't be compiled or wasn't Correct on every test case."""
+
+class Calibration:
+    """Derives per-test-case time limits from a reference solution.
+
+    Every test case is run `runs` times under its normal (uncalibrated)
+    limits. Its limit becomes factor * median reference time + floor, rounded
+    up to 10 ms, where the time is wall-clock time or, in cpu limit_mode,
+    user + system CPU time. write() stores the limits in the testcase manifest
+    together with the digests of the test case files they were measured on.
+    """
+
+    def __init__(self, config, manifest, runs=5, factor=3.0, floor=0.1):
+        self.config = config
+        self.manifest = manifest
+        self.runs = runs
+        self.factor = factor
+        self.floor = floor
+
+    def calibrate(self, reference_path):
+        """Returns [(test case name, reference times, limit)] in test case order. Raises CalibrationError."""
+        config = self.config
+        exec_dir = os.path.join(config.exec_dir, "calibrate")
+        os.makedirs(exec_dir, exist_ok=True)
+        original_exec_dir = config.exec_dir
+        config.exec_dir = exec_dir # Compiler and Runner put their files here
+        try:
+            language = config.language if config.language != "auto" else Compiler.detect_language(reference_path)
+            if language not in Compiler.COMPILERS:
+                raise CalibrationError(f"Unsupported language '{language}' for {reference_path}.")
+            build_name = os.path.basename(reference_path).replace('.', '_')
+            executable_path = Compiler(config).compile_code(reference_path, build_name, language)
+            if not executable_path:
+                raise CalibrationError(f"Could not compile the reference solution {reference_path}.")
+
+            runner = Runner(config)
+            limits = self.manifest.limits(config, calibrated=False)
+            results = []
+            for input_file, output_file in self.manifest.test_cases():
+                name = os.path.basename(input_file)
+                case_runner = runner.with_limits(*limits[name])
+                times = []
+                for _ in range(self.runs):
+                    result, wall, _, cpu_user, cpu_sys, details = case_runner.run_code(
+                        executable_path, input_file, output_file, language, build_name)
+                    if result != "Correct":
+                        raise CalibrationError(f"The reference solution got {result} on {name}: {details}")
+                    times.append(cpu_user + cpu_sys if config.limit_mode == 'cpu' else wall)
+                results.append((name, times, self.limit_for(times)))
+                print(f"  {name}: median {statistics.median(times):.4f}s -> limit {results[-1][2]:.2f}s")
+            return results
+        finally:
+            config.exec_dir = original_exec_dir
+            shutil.rmtree(exec_dir, ignore_errors=True)
+
+    def limit_for(self, times):
+        return math.ceil((self.factor * statistics.median(times) + self.floor) * 100) / 100
+
+    def write(self, reference_path, results):
+        """Stores the limits (replacing earlier ones) and how they were derived in the manifest."""
+        cases = {case['input']['name']: case for case in self.manifest.cases}
+        self.manifest.data['time_limits'] = {
+            name: {'seconds': limit,
+                   'reference_seconds': round(statistics.median(times), 4),
+                   'input_sha256': cases[name]['input']['sha256'],
+                   'output_sha256': cases[name]['output']['sha256']}
+            for name, times, limit in results}
+        self.manifest.data['calibration'] = {
+            'reference': reference_path,
+            'reference_sha256': file_digest(reference_path),
+            'runs': self.runs, 'factor': self.factor, 'floor': self.floor,
+            'limit_mode': self.config.limit_mode,
+            'calibrated_at': datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+        }
+        self.manifest.write()
+
+    def clear(self):
+        self.manifest.data.pop('time_limits', None)
+        self.manifest.data.pop('calibration', None)
+        self.manifest.write()
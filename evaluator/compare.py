@@ -0,0 +1,199 @@
+# evaluator/compare.py
+import hashlib
+import mmap
+import os
+import re
+
+CHUNK_SIZE = 64 * 1024
+# Bytes of context shown on each side of the first difference
+WINDOW_BYTES = 256
+
+_NON_BLANK = re.compile(rb'\S') # Same whitespace as bytes.strip()
+
+def file_digest(path):
+    """sha256 of a file, read in chunks."""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        while chunk := f.read(CHUNK_SIZE):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+def _common_prefix_len(a, b):
+    """Length of the common prefix of two byte strings (binary search on C-speed slice compares)."""
+    lo, hi = 0, min(len(a), len(b))
+    while lo < hi:
+        mid = (lo + hi + 1) // 2
+        if a[lo:mid] == b[lo:mid]:
+            lo = mid
+        else:
+            hi = mid - 1
+    return lo
+
+def _is_blank(data):
+    return not data.strip()
+
+def _universal_newlines(data):
+    """CRLF and lone CR as LF, like reading in text mode."""
+    return data.replace(b"\r\n", b"\n").replace(b"\r", b"\n")
+
+class ExpectedOutput:
+    """An expected output file: its size, content digest and a read-only mmap of it.
+
+    Loaded once per process and reused by every submission until the file
+    changes. The mmap shares the page cache, so every worker compares against
+    the same physical pages and no run reads the file again. The digest is only
+    computed when it is needed and not supplied (e.g. by the testcase manifest).
+    """
+    _cache = {}
+
+    def __init__(self, path, size, digest=None):
+        self.path = path
+        self.size = size
+        self._digest = digest
+        self._data = None
+        self._text_data = None
+
+    @classmethod
+    def load(cls, path, known_digest=None):
+        """known_digest(path, stat_result), if given, may return the sha256 of the file."""
+        st = os.stat(path)
+        key = (path, st.st_mtime_ns, st.st_size)
+        if key not in cls._cache:
+            cls._cache[key] = cls(path, st.st_size, known_digest(path, st) if known_digest else None)
+        return cls._cache[key]
+
+    @property
+    def digest(self):
+        if self._digest is None:
+            self._digest = file_digest(self.path)
+        return self._digest
+
+    @property
+    def data(self):
+        if self._data is None:
+            if self.size == 0:
+                self._data = b"" # mmap can't map an empty file
+            else:
+                with open(self.path, 'rb') as f:
+                    self._data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        return self._data
+
+    @property
+    def text_data(self):
+        """data with universal newlines; the mmap itself unless the file has a CR in it."""
+        if self._text_data is None:
+            data = self.data
+            self._text_data = data if data.find(b"\r") == -1 else _universal_newlines(data[:])
+        return self._text_data
+
+class Mismatch:
+    """Where two outputs first differ, with a short window of each around that point."""
+
+    def __init__(self, offset, before, expected_after, actual_after, before_truncated):
+        self.offset = offset
+        self.truncated = before_truncated or max(len(expected_after), len(actual_after)) > WINDOW_BYTES
+        lead = "..." if before_truncated else ""
+        self.expected = lead + self._window(before, expected_after)
+        self.actual = lead + self._window(before, actual_after)
+
+    @staticmethod
+    def _window(before, after):
+        text = (before + after[:WINDOW_BYTES]).decode(errors='replace').strip()
+        if len(after) > WINDOW_BYTES:
+            text += "..."
+        return text
+
+    def describe(self):
+        """Expected/Actual block for the error details (whole outputs when they are short)."""
+        header = f"First difference at byte {self.offset}:\n" if self.truncated else ""
+        return f"{header}Expected:\n{self.expected}\nActual:\n{self.actual}"
+
+class StreamComparator:
+    """Compares output fed chunk by chunk with an ExpectedOutput, as `actual.strip() == expected.strip()`.
+
+    Both sides are read with universal newlines (CRLF and CR count as LF), as
+    in text mode. Nothing of the output but a small window is kept in memory.
+    Comparing stops at the first difference: from there on the output is only
+    checked for being blank (trailing whitespace may still make the two equal)
+    and used to fill the mismatch window.
+    """
+
+    def __init__(self, expected):
+        self._data = expected.text_data
+        first = _NON_BLANK.search(self._data)
+        self._start = first.start() if first else len(self._data)
+        self._pos = self._start       # Compared up to here in the expected output
+        self._skipping = True         # Still inside the leading whitespace of the output
+        self._diverged = False
+        self._actual_after = b""
+        self._actual_rest_blank = True
+        self._pending_cr = False      # The last chunk ended in CR, an LF starting the next belongs to it
+
+    def feed(self, chunk):
+        if self._pending_cr and chunk.startswith(b"\n"):
+            chunk = chunk[1:]
+        self._pending_cr = chunk.endswith(b"\r")
+        chunk = _universal_newlines(chunk)
+        if self._diverged:
+            self._after_divergence(chunk)
+            return
+        if self._skipping:
+            chunk = chunk.lstrip()
+            if not chunk:
+                return
+            self._skipping = False
+
+        expected = self._data[self._pos:self._pos + len(chunk)]
+        if expected == chunk:
+            self._pos += len(chunk)
+            return
+
+        matched = _common_prefix_len(chunk, expected)
+        self._pos += matched
+        self._diverged = True
+        self._after_divergence(chunk[matched:])
+
+    def _after_divergence(self, chunk):
+        if len(self._actual_after) <= WINDOW_BYTES:
+            self._actual_after += chunk[:WINDOW_BYTES + 1 - len(self._actual_after)]
+        if self._actual_rest_blank and not _is_blank(chunk):
+            self._actual_rest_blank = False
+
+    def finish(self):
+        """Returns None when the outputs match, otherwise a Mismatch."""
+        expected_rest_blank = _NON_BLANK.search(self._data, self._pos) is None
+        if self._actual_rest_blank and expected_rest_blank:
+            return None
+        # Up to the difference both outputs are the same, take the context from the expected one
+        before_start = max(self._start, self._pos - WINDOW_BYTES)
+        return Mismatch(self._pos - self._start, self._data[before_start:self._pos],
+                        self._data[self._pos:self._pos + WINDOW_BYTES + 1], self._actual_after,
+                        before_start > self._start)
+
+def compare_files(actual_path, expected):
+    """Exact comparison of an output file with an ExpectedOutput (what filecmp did).
+
+    Equal size and digest is the fast "Correct" path, which doesn't touch the
+    expected output at all. Otherwise the output file is compared with it up
+    to the first differing byte. Returns None when equal, otherwise a Mismatch.
+    """
+    if os.path.getsize(actual_path) == expected.size and file_digest(actual_path) == expected.digest:
+        return None
+
+    data = expected.data
+    offset = 0
+    with open(actual_path, 'rb') as f_actual:
+        while True:
+            actual = f_actual.read(CHUNK_SIZE)
+            expected_chunk = data[offset:offset + CHUNK_SIZE]
+            if actual == expected_chunk:
+                if not actual:
+                    return None # Same content after all (digest collision aside)
+                offset += len(actual)
+                continue
+            matched = _common_prefix_len(actual, expected_chunk)
+            offset += matched
+            actual_after = actual[matched:] + f_actual.read(WINDOW_BYTES)
+            before_start = max(0, offset - WINDOW_BYTES)
+            return Mismatch(offset, data[before_start:offset], data[offset:offset + WINDOW_BYTES + 1],
+                            actual_after, before_start > 0)
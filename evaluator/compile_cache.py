@@ -0,0 +1,90 @@
+# evaluator/compile_cache.py
+import hashlib
+import os
+import shutil
+import subprocess
+import tempfile
+
+class CompileCache:
+    """Persistent cache of compiled binaries, keyed by everything that went into the build.
+
+    Entries are plain files named after their key inside cache_dir. A hit touches
+    the entry, so evicting the oldest modification times first gives an LRU policy
+    bounded by max_size_mb. Several worker processes may share one cache_dir:
+    entries are published with an atomic rename and eviction tolerates races.
+    """
+
+    def __init__(self, cache_dir, max_size_mb):
+        self.cache_dir = cache_dir
+        self.max_size_bytes = max_size_mb * 1024 * 1024
+        self._compiler_versions = {}
+        os.makedirs(self.cache_dir, exist_ok=True)
+
+    def compiler_version(self, compiler):
+        """Returns the first line of `<compiler> --version`, looked up once per process."""
+        if compiler not in self._compiler_versions:
+            try:
+                result = subprocess.run([compiler, '--version'], capture_output=True, text=True, timeout=10)
+                lines = result.stdout.splitlines()
+                self._compiler_versions[compiler] = lines[0] if lines else ""
+            except (OSError, subprocess.TimeoutExpired):
+                self._compiler_versions[compiler] = ""
+        return self._compiler_versions[compiler]
+
+    def make_key(self, source_path, language, compiler, flags):
+        digest = hashlib.sha256()
+        for part in (language, compiler, self.compiler_version(compiler), " ".join(flags)):
+            digest.update(part.encode())
+            digest.update(b"\0")
+        with open(source_path, 'rb') as f:
+            digest.update(f.read())
+        return digest.hexdigest()
+
+    def fetch(self, key, output_path):
+        """Places a copy of the cached binary for key at output_path. Returns False on a miss.
+
+        A copy rather than a hard link: a submission that writes to its own
+        executable must not be able to change the entry every later hit gets.
+        """
+        entry_path = os.path.join(self.cache_dir, key)
+        try:
+            os.utime(entry_path) # Mark as recently used
+            shutil.copy2(entry_path, output_path)
+        except FileNotFoundError:
+            return False
+        return True
+
+    def store(self, key, binary_path):
+        """Adds a freshly compiled binary to the cache and evicts old entries if needed."""
+        try:
+            fd, tmp_path = tempfile.mkstemp(dir=self.cache_dir, prefix=".tmp-")
+            os.close(fd)
+            shutil.copy2(binary_path, tmp_path)
+            os.replace(tmp_path, os.path.join(self.cache_dir, key))
+        except OSError as e:
+            print(f"Warning: Could not store {binary_path} in compile cache: {e}")
+            return
+        self._evict()
+
+    def _evict(self):
+        entries = []
+        total_size = 0
+        for name in os.listdir(self.cache_dir):
+            if name.startswith(".tmp-"):
+                continue
+            try:
+                st = os.stat(os.path.join(self.cache_dir, name))
+            except FileNotFoundError:
+                continue # Evicted by another worker meanwhile
+            entries.append((st.st_mtime, st.st_size, name))
+            total_size += st.st_size
+
+        entries.sort()
+        for _, size, name in entries:
+            if total_size <= self.max_size_bytes:
+                break
+            try:
+                os.remove(os.path.join(self.cache_dir, name))
+            except FileNotFoundError:
+                pass
+            total_size -= size
@@ -2,12 +2,38 @@
 import os
 import subprocess
 
+from evaluator.compile_cache import CompileCache
+from evaluator.tracing import span
+
 class Compiler:
+    COMPILERS = {'c': 'gcc', 'cpp': 'g++', 'python': 'python3'}
+    COMPILE_FLAGS = ['-Wall', '-O2']
+    # Compiler output kept for the row details (C++ template errors get long)
+    ERROR_DETAIL_CHARS = 4 * 1024
+    # Python is byte-compiled by the same python3 that runs the tests, so the
+    # .pyc matches its bytecode version. dfile keeps the source path in tracebacks.
+    PY_COMPILE_SCRIPT = (
+        "import py_compile, sys\n"
+        "try:\n"
+        "    py_compile.compile(sys.argv[1], cfile=sys.argv[2], dfile=sys.argv[1], doraise=True)\n"
+        "except py_compile.PyCompileError as e:\n"
+        "    sys.exit(e.msg)\n"
+    )
+
     def __init__(self, config):
         self.config = config
         self.exec_dir = config.exec_dir
+        self.cache = None
+        # True/False once compile_code consulted the cache, None when it didn't
+        self.last_cache_hit = None
+        # Why the last compile_code call failed, for the "Compilation Error" row
+        self.last_error = None
+        cache_dir = getattr(config, 'compile_cache_dir', None)
+        if cache_dir:
+            self.cache = CompileCache(cache_dir, config.compile_cache_mb)
 
-    def detect_language(self, filename):
+    @staticmethod
+    def detect_language(filename):
         ext = os.path.splitext(filename)[1].lower()
         if ext == '.c':
             return 'c'
@@ -21,41 +47,66 @@ class Compiler:
     def compile_code(self, source_path, program_name, language):
         output_path = os.path.join(self.exec_dir, program_name)
         compile_command = []
+        self.last_cache_hit = None
+        self.last_error = None
 
-        if language == 'c':
-            compile_command = ['gcc', source_path, '-o', output_path, '-Wall', '-O2']
-        elif language == 'cpp':
-            compile_command = ['g++', source_path, '-o', output_path, '-Wall', '-O2']
+        if language == 'python':
+            compiler = self.COMPILERS[language]
+            flags = []
+            output_path += '.pyc' # python3 only runs bytecode files with this extension
+            compile_command = [compiler, '-c', self.PY_COMPILE_SCRIPT, source_path, output_path]
+        elif language in self.COMPILERS:
+            compiler = self.COMPILERS[language]
+            flags = self.COMPILE_FLAGS
+            compile_command = [compiler, source_path, '-o', output_path] + flags
         else:
-            # Python files don't need compilation in this sense
             print(f"Warning: Attempted to compile unsupported language '{language}'. Skipping.")
             return None # Or raise an error if strict
 
+        cache_key = None
+        if self.cache:
+            with span("compile_cache"):
+                cache_key = self.cache.make_key(source_path, language, compiler, flags)
+                self.last_cache_hit = self.cache.fetch(cache_key, output_path)
+            if self.last_cache_hit:
+                print(f"  Using cached build of {source_path}: {output_path}")
+                return output_path
+
         print(f"  Compiling {source_path}...")
         try:
             # Using check_output to capture stderr for detailed error messages
-            result = subprocess.run(
-                compile_command,
-                capture_output=True,
-                text=True,
-                check=True, # Raise CalledProcessError if return code is non-zero
-                timeout=self.config.time_limit_seconds # Apply a time limit for compilation too
-            )
+            with span(compiler, source=os.path.basename(source_path)):
+                result = subprocess.run(
+                    compile_command,
+                    capture_output=True,
+                    text=True,
+                    check=True, # Raise CalledProcessError if return code is non-zero
+                    timeout=self.config.time_limit_seconds # Apply a time limit for compilation too
+                )
             print(f"  Compilation successful: {output_path}")
+            if cache_key:
+                with span("compile_cache"):
+                    self.cache.store(cache_key, output_path)
             return output_path
         except subprocess.CalledProcessError as e:
             print(f"  Compilation failed for {source_path}:")
             print(f"    STDOUT: {e.stdout}")
             print(f"    STDERR: {e.stderr}")
+            self.last_error = (e.stderr or e.stdout or "").strip() or f"{compiler} exited with code {e.returncode}"
+            if len(self.last_error) > self.ERROR_DETAIL_CHARS:
+                self.last_error = self.last_error[:self.ERROR_DETAIL_CHARS] + "..."
             return None
         except subprocess.TimeoutExpired:
             print(f"  Compilation timed out for {source_path}.")
+            self.last_error = f"Compilation timed out ({self.config.time_limit_seconds}s)"
             return None
         except FileNotFoundError:
             print(f"  Compiler ({compile_command[0]}) not found. Please ensure it's in your PATH.")
+            self.last_error = f"Compiler ({compile_command[0]}) not found"
             return None
         except Exception as e:
             print(f"  An unexpected error occurred during compilation of {source_path}: {e}")
+            self.last_error = str(e)
             return None
 
 if __name__ == '__main__':
@@ -104,9 +155,11 @@ if __name__ == '__main__':
         }
         """)
 
-    # Create a dummy Python file (no compilation needed, but for language detection)
+    # Create dummy Python files (byte-compiled, one with a syntax error)
     with open('submissions/test_compiler_files/test_py.py', 'w') as f:
         f.write("print('Hello from Python')")
+    with open('submissions/test_compiler_files/test_bad.py', 'w') as f:
+        f.write("print('Hello from Python'")
 
     print("\n--- Testing C compilation ---")
     c_exec = compiler.compile_code('submissions/test_compiler_files/test_add.c', 'test_add', 'c')
@@ -122,11 +175,14 @@ if __name__ == '__main__':
     else:
         print("C++ compilation failed.")
 
-    print("\n--- Testing Python language detection (no compilation) ---")
+    print("\n--- Testing Python byte-compilation ---")
     py_lang = compiler.detect_language('submissions/test_compiler_files/test_py.py')
     print(f"Detected language for test_py.py: {py_lang}")
     assert py_lang == 'python'
-    assert compiler.compile_code('submissions/test_compiler_files/test_py.py', 'test_py', 'python') == None # Should return None as it's not compiled here
+    py_exec = compiler.compile_code('submissions/test_compiler_files/test_py.py', 'test_py', 'python')
+    assert py_exec == os.path.join('test_executables', 'test_py.pyc') and os.path.exists(py_exec)
+    assert compiler.compile_code('submissions/test_compiler_files/test_bad.py', 'test_bad', 'python') == None # Syntax error
+    assert "SyntaxError" in compiler.last_error and "test_bad.py" in compiler.last_error, compiler.last_error
 
     # Cleanup
     os.remove('dummy_compiler_config.json')
@@ -134,8 +190,10 @@ if __name__ == '__main__':
         os.remove(c_exec)
     if cpp_exec and os.path.exists(cpp_exec):
         os.remove(cpp_exec)
+    os.remove(py_exec)
     os.remove('submissions/test_compiler_files/test_add.c')
     os.remove('submissions/test_compiler_files/test_mul.cpp')
     os.remove('submissions/test_compiler_files/test_py.py')
+    os.remove('submissions/test_compiler_files/test_bad.py')
     os.rmdir('submissions/test_compiler_files')
     os.rmdir('test_executables')
\ No newline at end of file
@@ -1,4 +1,5 @@
 # evaluator/config.py
+import ipaddress
 import json
 import os
 
@@ -7,22 +8,57 @@ class Config:
         self.config_path = config_path
         self._load_config()
 
+    @classmethod
+    def from_data(cls, config_data):
+        """A Config from settings that didn't come from a file (a distributed worker gets them from the coordinator)."""
+        config = cls.__new__(cls)
+        config.config_path = None
+        config._apply(config_data)
+        return config
+
     def _load_config(self):
         if not os.path.exists(self.config_path):
             raise FileNotFoundError(f"Configuration file not found at: {self.config_path}")
         
         with open(self.config_path, 'r') as f:
             config_data = json.load(f)
+        self._apply(config_data)
 
+    def _apply(self, config_data):
         self.language = config_data.get('language', 'auto').lower()
         self.time_limit_seconds = config_data.get('time_limit_seconds', 2)
         self.memory_limit_mb = config_data.get('memory_limit_mb', 64)
+        self.output_limit_mb = config_data.get('output_limit_mb', 64)
+        self.limit_mode = config_data.get('limit_mode', 'wall').lower()
+        self.launcher = config_data.get('launcher', 'auto').lower()
+        self.python_zygote = config_data.get('python_zygote', False)
         self.source_dir = config_data.get('source_dir', 'submissions/stdin')
         self.testcase_dir = config_data.get('testcase_dir', 'testcases')
         self.exec_dir = config_data.get('exec_dir', 'executables')
+        self.scratch_dir = config_data.get('scratch_dir', 'auto') # file io_mode output files; 'auto' = /dev/shm, null = exec_dir
         self.result_log = config_data.get('result_log', 'results/eval_log.txt')
         self.csv_file = config_data.get('csv_file', 'results/eval_results.csv')
+        self.results_db = config_data.get('results_db') # SQLite history of every run, null disables it
+        self.incremental = config_data.get('incremental', False) # Reuse verdicts of unchanged pairs from results_db
+        self.fail_fast = config_data.get('fail_fast', False) # Skip a submission's remaining tests after its first failure
+        self.test_order = config_data.get('test_order', 'index').lower() # 'adaptive' orders by results_db history
         self.io_mode = config_data.get('io_mode', 'stdin').lower()
+        self.workers = config_data.get('workers', 1)
+        self.pin_workers = config_data.get('pin_workers', True)
+        self.compile_workers = config_data.get('compile_workers', 0) # 0 compiles inline, no pipeline
+        self.run_queue_size = config_data.get('run_queue_size', 4)
+        self.engine = config_data.get('engine', 'process').lower()
+        self.async_concurrency = config_data.get('async_concurrency', 0) # 0 = one per CPU
+        self.coordinator_address = config_data.get('coordinator_address', '127.0.0.1:7788') # distributed engine: "host:port" or "unix:/path"
+        self.coordinator_token = config_data.get('coordinator_token') # Shared secret worker nodes must present, null for none
+        self.local_workers = config_data.get('local_workers', 0) # distributed engine: worker nodes started on this host
+        self.compile_cache_dir = config_data.get('compile_cache_dir', '.compile_cache') # null disables the cache
+        self.compile_cache_mb = config_data.get('compile_cache_mb', 256)
+        self.banned_headers = config_data.get('banned_headers') # null keeps the default STL list
+        self.trace_file = config_data.get('trace_file') # Chrome trace of the run's phases, null disables tracing
+        self.metrics_port = config_data.get('metrics_port') # Serve live metrics on localhost:<port>, null disables it
+        self.metrics_file = config_data.get('metrics_file') # Rewrite live metrics into this JSON file, null disables it
+        self.metrics_interval = config_data.get('metrics_interval', 5) # Seconds between metrics_file rewrites
 
         # Ensure source_dir is valid
         if not os.path.isdir(self.source_dir):
@@ -31,25 +67,128 @@ class Config:
             raise ValueError(f"Config error: testcase_dir '{self.testcase_dir}' does not exist or is not a directory.")
         if self.io_mode not in ['stdin', 'file']:
             raise ValueError(f"Config error: io_mode '{self.io_mode}' must be 'stdin' or 'file'.")
+        if not isinstance(self.output_limit_mb, (int, float)) or self.output_limit_mb <= 0:
+            raise ValueError(f"Config error: output_limit_mb '{self.output_limit_mb}' must be a positive number.")
+        if self.limit_mode not in ['wall', 'cpu']:
+            raise ValueError(f"Config error: limit_mode '{self.limit_mode}' must be 'wall' or 'cpu'.")
+        if self.test_order not in ['index', 'adaptive']:
+            raise ValueError(f"Config error: test_order '{self.test_order}' must be 'index' or 'adaptive'.")
+        if self.test_order == 'adaptive' and not self.results_db:
+            raise ValueError("Config error: test_order 'adaptive' needs 'results_db' to take earlier verdicts from.")
+        if not isinstance(self.coordinator_address, str) or not self.coordinator_address:
+            raise ValueError(f"Config error: coordinator_address '{self.coordinator_address}' must be \"host:port\" or \"unix:/path\".")
+        if self.coordinator_token is not None and not isinstance(self.coordinator_token, str):
+            raise ValueError(f"Config error: coordinator_token '{self.coordinator_token}' must be a string or null.")
+        if not isinstance(self.local_workers, int) or self.local_workers < 0:
+            raise ValueError(f"Config error: local_workers '{self.local_workers}' must be a non-negative integer.")
+        if not isinstance(self.async_concurrency, int) or self.async_concurrency < 0:
+            raise ValueError(f"Config error: async_concurrency '{self.async_concurrency}' must be a non-negative integer.")
+        if self.launcher not in ['auto', 'shim', 'prlimit', 'preexec']:
+            raise ValueError(f"Config error: launcher '{self.launcher}' must be 'auto', 'shim', 'prlimit' or 'preexec'.")
+        if self.banned_headers is not None and (not isinstance(self.banned_headers, list)
+                                                or not all(isinstance(h, str) for h in self.banned_headers)):
+            raise ValueError(f"Config error: banned_headers '{self.banned_headers}' must be a list of header names.")
+        if self.trace_file is not None and not isinstance(self.trace_file, str):
+            raise ValueError(f"Config error: trace_file '{self.trace_file}' must be a file path or null.")
+        if self.scratch_dir is not None and not isinstance(self.scratch_dir, str):
+            raise ValueError(f"Config error: scratch_dir '{self.scratch_dir}' must be 'auto', a directory or null.")
+        if self.metrics_port is not None and (not isinstance(self.metrics_port, int) or not 0 <= self.metrics_port <= 65535):
+            raise ValueError(f"Config error: metrics_port '{self.metrics_port}' must be a port number or null.")
+        if self.metrics_file is not None and not isinstance(self.metrics_file, str):
+            raise ValueError(f"Config error: metrics_file '{self.metrics_file}' must be a file path or null.")
+        if not isinstance(self.metrics_interval, (int, float)) or self.metrics_interval <= 0:
+            raise ValueError(f"Config error: metrics_interval '{self.metrics_interval}' must be a positive number.")
         if self.language not in ['auto', 'c', 'cpp', 'python']:
              raise ValueError(f"Config error: language '{self.language}' must be 'auto', 'c', 'cpp', or 'python'.")
+        self.set_incremental(self.incremental)
+        self.set_engine(self.engine)
+        self.set_workers(self.workers)
+        self.set_compile_workers(self.compile_workers)
+        if not isinstance(self.run_queue_size, int) or self.run_queue_size < 1:
+            raise ValueError(f"Config error: run_queue_size '{self.run_queue_size}' must be a positive integer.")
 
         # Create necessary directories if they don't exist
         os.makedirs(self.exec_dir, exist_ok=True)
         os.makedirs(os.path.dirname(self.result_log), exist_ok=True) # results/
         os.makedirs(os.path.dirname(self.csv_file), exist_ok=True) # results/
+        if self.results_db and os.path.dirname(self.results_db):
+            os.makedirs(os.path.dirname(self.results_db), exist_ok=True)
+
+    def set_incremental(self, incremental):
+        """Turns incremental re-grading on or off; it takes earlier verdicts from results_db."""
+        if incremental and not self.results_db:
+            raise ValueError("Config error: incremental needs 'results_db' to take earlier verdicts from.")
+        if incremental and self.engine == 'distributed':
+            raise ValueError("Config error: incremental isn't supported by the distributed engine.")
+        self.incremental = bool(incremental)
+
+    def set_engine(self, engine):
+        """Sets the execution engine. A distributed coordinator reachable from other hosts needs a coordinator_token,
+        since worker nodes run whatever it sends them."""
+        if engine not in ['process', 'async', 'distributed']:
+            raise ValueError(f"Config error: engine '{engine}' must be 'process', 'async' or 'distributed'.")
+        if engine == 'distributed':
+            if self.incremental:
+                raise ValueError("Config error: incremental isn't supported by the distributed engine.")
+            if not self.coordinator_token and not self._coordinator_is_local():
+                raise ValueError(f"Config error: coordinator_address '{self.coordinator_address}' is reachable from other hosts; "
+                                 "set a coordinator_token.")
+        self.engine = engine
+
+    def _coordinator_is_local(self):
+        """Whether coordinator_address is a Unix socket or a loopback address."""
+        if self.coordinator_address.startswith('unix:'):
+            return True
+        host = self.coordinator_address.rpartition(':')[0]
+        if host in ('', 'localhost'): # An empty host means 127.0.0.1, as in parse_address
+            return True
+        try:
+            return ipaddress.ip_address(host).is_loopback
+        except ValueError: # A host name, which may resolve anywhere
+            return False
+
+    def set_workers(self, workers):
+        """Sets the worker pool size; 0 means one worker per available CPU."""
+        if not isinstance(workers, int) or workers < 0:
+            raise ValueError(f"Config error: workers '{workers}' must be a non-negative integer.")
+        self.workers = workers or os.cpu_count() or 1
+
+    def set_compile_workers(self, compile_workers):
+        """Sets the compile stage size; 0 keeps compiling inline with the test runs."""
+        if not isinstance(compile_workers, int) or compile_workers < 0:
+            raise ValueError(f"Config error: compile_workers '{compile_workers}' must be a non-negative integer.")
+        self.compile_workers = compile_workers
+
+    def _metrics_description(self):
+        targets = []
+        if self.metrics_port is not None:
+            targets.append(f"http://127.0.0.1:{self.metrics_port}/metrics")
+        if self.metrics_file:
+            targets.append(f"{self.metrics_file} (every {self.metrics_interval}s)")
+        return ", ".join(targets) or "disabled"
 
     def __str__(self):
         return (f"Config loaded:\n"
                 f"  Language: {self.language}\n"
-                f"  Time Limit: {self.time_limit_seconds}s\n"
+                f"  Time Limit: {self.time_limit_seconds}s ({self.limit_mode})\n"
                 f"  Memory Limit: {self.memory_limit_mb}MB\n"
+                f"  Output Limit: {self.output_limit_mb}MB\n"
                 f"  Source Dir: {self.source_dir}\n"
                 f"  Testcase Dir: {self.testcase_dir}\n"
                 f"  Exec Dir: {self.exec_dir}\n"
+                f"  Scratch Dir: {self.scratch_dir or 'disabled (exec_dir)'}\n"
                 f"  Result Log: {self.result_log}\n"
                 f"  CSV File: {self.csv_file}\n"
-                f"  I/O Mode: {self.io_mode}")
+                f"  Results DB: {self.results_db or 'disabled'}{' (incremental)' if self.incremental else ''}\n"
+                f"  I/O Mode: {self.io_mode}\n"
+                f"  Test Order: {self.test_order}{' (fail-fast)' if self.fail_fast else ''}\n"
+                f"  Launcher: {self.launcher}{' (python: zygote)' if self.python_zygote else ''}\n"
+                f"  Engine: {self.engine}{f' (coordinator {self.coordinator_address}, {self.local_workers} local workers)' if self.engine == 'distributed' else ''}\n"
+                f"  Workers: {self.workers} (compile: {self.compile_workers})\n"
+                f"  Compile Cache: {self.compile_cache_dir or 'disabled'}\n"
+                f"  Trace File: {self.trace_file or 'disabled'}\n"
+                f"  Metrics: {self._metrics_description()}\n"
+                f"  Banned Headers: {'default STL list' if self.banned_headers is None else ', '.join(self.banned_headers) or 'none'}")
 
 if __name__ == '__main__':
     # Example usage and basic test
@@ -0,0 +1,530 @@
+# evaluator/distributed.py
+# Coordinator/worker mode. The coordinator (main.py with engine 'distributed')
+# listens on coordinator_address; worker nodes (grade_worker.py) connect, get
+# the grading settings and the test case manifest, fetch the test case files
+# they don't have cached yet, and then take submissions (sources, compiled on
+# the node) and send back the rows for the coordinator's Logger.
+#
+# Messages are a 4-byte length, a JSON header and the raw bytes of the blobs
+# the header lists the sizes of.
+import collections
+import hmac
+import json
+import os
+import re
+import shutil
+import socket
+import struct
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+from evaluator.compare import file_digest
+from evaluator.config import Config
+from evaluator.launcher import prepare_launcher
+from evaluator.scratch import cleanup_scratch, prepare_scratch
+from evaluator.testcase import TestCaseManifest
+from evaluator.worker import SubmissionResult, _evaluate_in_worker, _start_pool
+
+_LENGTH = struct.Struct('!I')
+# Settings a worker node grades with; paths, databases and engines stay its own
+SHIPPED_SETTINGS = ['language', 'time_limit_seconds', 'memory_limit_mb', 'output_limit_mb', 'limit_mode',
+                    'launcher', 'python_zygote', 'io_mode', 'fail_fast', 'banned_headers', 'pin_workers',
+                    'compile_cache_mb']
+# SubmissionResult attributes sent back with a result
+RESULT_FIELDS = ['program_name', 'language', 'rows', 'cache_hit', 'score', 'reused', 'compile_seconds', 'busy_seconds']
+TOKEN_ENV = 'DSA_EVAL_TOKEN' # Lets local worker nodes get the token without it showing in ps
+
+def send_message(sock, message, blobs=()):
+    header = json.dumps(dict(message, blobs=[len(blob) for blob in blobs])).encode()
+    sock.sendall(_LENGTH.pack(len(header)) + header)
+    for blob in blobs:
+        sock.sendall(blob)
+
+def recv_message(sock):
+    """Returns (message, blobs), or (None, []) when the peer closed the connection between messages."""
+    length = _recv_exact(sock, _LENGTH.size, eof_ok=True)
+    if length is None:
+        return None, []
+    message = json.loads(_recv_exact(sock, _LENGTH.unpack(length)[0]))
+    blobs = [_recv_exact(sock, size) for size in message.pop('blobs', [])]
+    return message, blobs
+
+def _recv_exact(sock, size, eof_ok=False):
+    data = bytearray()
+    while len(data) < size:
+        chunk = sock.recv(min(size - len(data), 1024 * 1024))
+        if not chunk:
+            if eof_ok and not data:
+                return None
+            raise ConnectionError("connection closed in the middle of a message")
+        data += chunk
+    return bytes(data)
+
+def parse_address(address):
+    """"host:port" or "unix:/path" -> (address family, socket address)."""
+    if address.startswith('unix:'):
+        return socket.AF_UNIX, address[len('unix:'):]
+    host, _, port = address.rpartition(':')
+    try:
+        return socket.AF_INET, (host or '127.0.0.1', int(port))
+    except ValueError:
+        raise ValueError(f"Config error: coordinator_address '{address}' must be \"host:port\" or \"unix:/path\".")
+
+def _keepalive(sock):
+    """Lets a TCP connection notice a node that vanished (power, network) within about half a minute."""
+    if sock.family != socket.AF_INET:
+        return
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1)
+    for option, value in (('TCP_KEEPIDLE', 10), ('TCP_KEEPINTVL', 5), ('TCP_KEEPCNT', 3)):
+        if hasattr(socket, option):
+            sock.setsockopt(socket.IPPROTO_TCP, getattr(socket, option), value)
+
+def _check_name(name):
+    """Returns a file name that goes over the wire if it names a plain file in the
+    directory it goes into; raises ValueError for anything that could escape it."""
+    if not isinstance(name, str) or not name or os.path.basename(name) != name \
+            or name.startswith('.') or name == TestCaseManifest.FILE_NAME:
+        raise ValueError(f"unsafe file name {name!r}")
+    return name
+
+def _check_digest(digest):
+    if not isinstance(digest, str) or not re.fullmatch(r'[0-9a-f]{64}', digest):
+        raise ValueError(f"the coordinator sent an invalid test case digest {digest!r}")
+    return digest
+
+def _runner_error(source_file, details):
+    """A SubmissionResult with a single "Runner Error" row, for a submission no node evaluated."""
+    submission = SubmissionResult(source_file)
+    submission.program_name = os.path.splitext(str(source_file))[0]
+    submission.rows.append((submission.program_name, "N/A", "Runner Error", 0, 0, details))
+    return submission
+
+def _peer_name(peer):
+    if isinstance(peer, tuple):
+        return f"{peer[0]}:{peer[1]}"
+    return peer or "unix socket"
+
+class _NodeConnection:
+    def __init__(self, sock, name):
+        self.sock = sock
+        self.name = name
+        self.free = 0 # Job slots the node has left
+        self.inflight = set() # Jobs (submission indices) sent and not answered yet
+        self._send_lock = threading.Lock()
+
+    def send(self, message, blobs=()):
+        with self._send_lock:
+            send_message(self.sock, message, blobs)
+
+class Coordinator:
+    """Hands the submissions out to the connected worker nodes and collects their results.
+
+    Every submission is a job. A node asks for as many as it has slots; when a
+    node disconnects (or its TCP keepalive gives up) its unanswered jobs are
+    re-queued at the front, up to MAX_ATTEMPTS times per job, after which the
+    job gets a "Runner Error" row. So do sources whose names can't be sent
+    (dotfiles such as .gitkeep), and the remaining jobs once every local node
+    has exited with no other node connected. Results are handed out in
+    submission order.
+    """
+    MAX_ATTEMPTS = 3
+
+    def __init__(self, config, source_files, test_cases):
+        self.config = config
+        self.source_files = source_files
+        manifest = TestCaseManifest.for_dir(config.testcase_dir)
+        cases = {case['input']['name']: case for case in manifest.cases}
+        self.cases = [cases[os.path.basename(input_file)] for input_file, _ in test_cases] # In run order
+        self.blob_paths = {} # sha256 -> test case file with that content
+        for (input_file, output_file), case in zip(test_cases, self.cases):
+            self.blob_paths[case['input']['sha256']] = input_file
+            self.blob_paths[case['output']['sha256']] = output_file
+        # The hand-written and calibrated parts of the manifest; nodes index the files themselves
+        self.manifest_data = {key: manifest.data[key] for key in ('groups', 'time_limits') if key in manifest.data}
+        self.settings = {key: getattr(config, key) for key in SHIPPED_SETTINGS}
+        self.pending = collections.deque()
+        self.attempts = [0] * len(source_files)
+        self.results = {} # Submission index -> SubmissionResult
+        for job, source_file in enumerate(source_files):
+            try:
+                _check_name(source_file)
+                self.pending.append(job)
+            except ValueError as e:
+                print(f"Warning: Not sending {source_file} to worker nodes: {e}")
+                self.results[job] = _runner_error(source_file, f"Error: not sent to worker nodes: {e}")
+        self.connections = []
+        self.condition = threading.Condition()
+        self.listener = None
+        self.address = None
+        self.local_workers = []
+
+    def start(self):
+        family, address = parse_address(self.config.coordinator_address)
+        self.listener = socket.socket(family, socket.SOCK_STREAM)
+        if family == socket.AF_UNIX:
+            if os.path.exists(address):
+                os.remove(address) # Left over from an earlier run
+            self.address = f"unix:{address}"
+        else:
+            self.listener.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        self.listener.bind(address)
+        self.listener.listen()
+        if family == socket.AF_INET:
+            host, port = self.listener.getsockname()
+            self.address = f"{host}:{port}"
+        threading.Thread(target=self._accept_loop, name="coordinator", daemon=True).start()
+        print(f"Coordinator listening on {self.address}; add worker nodes with: "
+              f"python3 grade_worker.py --connect {self.address}")
+        self._start_local_workers()
+
+    def _start_local_workers(self):
+        script = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'grade_worker.py')
+        env = dict(os.environ)
+        if self.config.coordinator_token:
+            env[TOKEN_ENV] = self.config.coordinator_token
+        log_dir = os.path.dirname(self.config.result_log) or '.'
+        for i in range(self.config.local_workers):
+            with open(os.path.join(log_dir, f"worker_node{i}.log"), 'w') as log:
+                self.local_workers.append(subprocess.Popen(
+                    [sys.executable, script, '--connect', self.address, '--name', f"local{i}"],
+                    stdin=subprocess.DEVNULL, stdout=log, stderr=subprocess.STDOUT, env=env))
+        if self.local_workers:
+            print(f"Started {len(self.local_workers)} local worker nodes (logs: {log_dir}/worker_node<N>.log)")
+
+    def results_in_order(self):
+        for index in range(len(self.source_files)):
+            with self.condition:
+                while index not in self.results:
+                    if self._nodes_gone():
+                        self._fail_remaining()
+                    else:
+                        self.condition.wait(1.0) # Also rechecks the local nodes
+                submission = self.results.pop(index)
+                self.results[index] = None # Done, the result itself is the caller's now
+            yield submission
+
+    def _nodes_gone(self):
+        """Whether every local node has exited and no node is connected, so nothing would ever answer."""
+        return (self.local_workers and not self.connections
+                and all(process.poll() is not None for process in self.local_workers))
+
+    def _fail_remaining(self):
+        """Gives every unanswered job a "Runner Error" row. Called with the condition held."""
+        log_dir = os.path.dirname(self.config.result_log) or '.'
+        print(f"Warning: All local worker nodes exited and none is connected; see {log_dir}/worker_node<N>.log")
+        for job in range(len(self.source_files)):
+            if job not in self.results:
+                self.results[job] = _runner_error(self.source_files[job], "Error: no worker node left to evaluate it")
+        self.pending.clear()
+        self.condition.notify_all()
+
+    def close(self):
+        if self.listener:
+            self.listener.close()
+            if self.address.startswith('unix:'):
+                try:
+                    os.remove(self.address[len('unix:'):])
+                except OSError:
+                    pass
+        with self.condition:
+            connections = list(self.connections)
+        for connection in connections:
+            try:
+                connection.send({'type': 'done'})
+            except OSError:
+                pass
+        for process in self.local_workers:
+            try:
+                process.wait(timeout=30)
+            except subprocess.TimeoutExpired:
+                process.kill()
+                process.wait()
+
+    def _accept_loop(self):
+        while True:
+            try:
+                sock, peer = self.listener.accept()
+            except OSError:
+                return # Closed
+            threading.Thread(target=self._serve, args=(sock, peer), daemon=True).start()
+
+    def _serve(self, sock, peer):
+        connection = None
+        try:
+            _keepalive(sock)
+            hello, _ = recv_message(sock)
+            if not hello or hello.get('type') != 'hello':
+                return
+            token = self.config.coordinator_token
+            if token and not hmac.compare_digest(str(hello.get('token') or ''), token):
+                send_message(sock, {'type': 'error', 'error': "wrong coordinator_token"})
+                print(f"Warning: Rejected worker node {hello.get('name')} at {_peer_name(peer)}: wrong token.")
+                return
+            connection = _NodeConnection(sock, f"{hello.get('name')} ({_peer_name(peer)})")
+            connection.send({'type': 'welcome', 'settings': self.settings, 'cases': self.cases,
+                             'manifest': self.manifest_data})
+            while True:
+                message, _ = recv_message(sock)
+                if message is None:
+                    break
+                if message['type'] == 'fetch':
+                    digests = [digest for digest in message['digests'] if digest in self.blob_paths]
+                    blobs = []
+                    for digest in digests:
+                        with open(self.blob_paths[digest], 'rb') as f:
+                            blobs.append(f.read())
+                    connection.send({'type': 'blobs', 'digests': digests}, blobs)
+                elif message['type'] == 'ready':
+                    print(f"Worker node {connection.name} ready with {message['slots']} slots.")
+                    with self.condition:
+                        connection.free = message['slots']
+                        self.connections.append(connection)
+                elif message['type'] == 'result':
+                    self._record(connection, message)
+                self._dispatch()
+        except (OSError, ValueError) as e:
+            print(f"Warning: Lost worker node {connection.name if connection else _peer_name(peer)}: {e}")
+        finally:
+            sock.close()
+            if connection:
+                self._drop(connection)
+
+    def _record(self, connection, message):
+        job = message['job']
+        if job not in connection.inflight:
+            raise ValueError(f"result for job {job!r}, which the node wasn't given")
+        submission = SubmissionResult(self.source_files[job])
+        for key in RESULT_FIELDS:
+            setattr(submission, key, message['submission'][key])
+        submission.rows = [tuple(row) for row in submission.rows]
+        with self.condition:
+            connection.inflight.discard(job)
+            connection.free += 1
+            if job not in self.results: # Not already answered by a node it was re-queued to
+                self.results[job] = submission
+                self.condition.notify_all()
+
+    def _drop(self, connection):
+        """Re-queues the jobs of a node that went away."""
+        with self.condition:
+            if connection in self.connections:
+                self.connections.remove(connection)
+            for job in sorted(connection.inflight, reverse=True):
+                if job in self.results:
+                    continue
+                if self.attempts[job] >= self.MAX_ATTEMPTS:
+                    self.results[job] = _runner_error(
+                        self.source_files[job], f"Error: worker nodes went away {self.MAX_ATTEMPTS} times while evaluating it")
+                else:
+                    print(f"Re-queueing {self.source_files[job]} (worker node {connection.name} went away).")
+                    self.pending.appendleft(job)
+            connection.inflight.clear()
+            self.condition.notify_all()
+        self._dispatch()
+
+    def _dispatch(self):
+        """Sends pending jobs to nodes with free slots."""
+        assigned = []
+        with self.condition:
+            for connection in self.connections:
+                while connection.free > 0 and self.pending:
+                    job = self.pending.popleft()
+                    if job in self.results:
+                        continue
+                    connection.free -= 1
+                    connection.inflight.add(job)
+                    self.attempts[job] += 1
+                    assigned.append((connection, job))
+        for connection, job in assigned:
+            source_file = self.source_files[job]
+            try:
+                with open(os.path.join(self.config.source_dir, source_file), 'rb') as f:
+                    connection.send({'type': 'job', 'job': job, 'source_file': source_file}, [f.read()])
+            except OSError:
+                # Wakes the node's _serve thread, whose _drop() re-queues the job
+                try:
+                    connection.sock.shutdown(socket.SHUT_RDWR)
+                except OSError:
+                    pass
+
+def evaluate_distributed(config, source_files, test_cases):
+    """The distributed engine: yields a SubmissionResult per submission, in source_files order,
+    evaluated by whichever worker nodes are connected."""
+    coordinator = Coordinator(config, source_files, test_cases)
+    coordinator.start()
+    try:
+        yield from coordinator.results_in_order()
+    finally:
+        coordinator.close()
+
+class WorkerNode:
+    """A grading host: connects to the coordinator and evaluates the jobs it hands out.
+
+    Test case files are cached in cache_dir/testcases by sha256, so a node only
+    fetches the files it hasn't seen before, and compiled binaries in
+    cache_dir/compile. Everything else lives in a session directory that is
+    removed when the coordinator is done.
+    """
+    CONNECT_TIMEOUT = 30
+
+    def __init__(self, address, workers=1, cache_dir='.worker_cache', token=None, name=None):
+        self.address = address
+        self.workers = workers or os.cpu_count() or 1
+        self.cache_dir = os.path.abspath(cache_dir)
+        self.token = token
+        self.name = name or socket.gethostname()
+        self._send_lock = threading.Lock()
+
+    def run(self):
+        sock = self._connect()
+        try:
+            send_message(sock, {'type': 'hello', 'name': self.name, 'token': self.token})
+            welcome, _ = recv_message(sock)
+            if welcome is None or welcome['type'] != 'welcome':
+                raise ConnectionError(welcome['error'] if welcome else "the coordinator closed the connection")
+            os.makedirs(self.cache_dir, exist_ok=True)
+            session = tempfile.mkdtemp(prefix='session-', dir=self.cache_dir)
+            config = None
+            try:
+                config = self._session_config(welcome['settings'], session)
+                test_cases = self._sync_test_cases(sock, welcome['cases'], welcome['manifest'], config.testcase_dir)
+                prepare_launcher(config)
+                prepare_scratch(config, test_cases)
+                self._work(sock, config, test_cases)
+            finally:
+                if config:
+                    cleanup_scratch(config)
+                shutil.rmtree(session, ignore_errors=True)
+        finally:
+            sock.close()
+
+    def _connect(self):
+        family, address = parse_address(self.address)
+        deadline = time.monotonic() + self.CONNECT_TIMEOUT
+        while True:
+            sock = socket.socket(family, socket.SOCK_STREAM)
+            try:
+                sock.connect(address)
+                _keepalive(sock)
+                return sock
+            except OSError:
+                sock.close()
+                if time.monotonic() > deadline:
+                    raise
+                time.sleep(0.5)
+
+    def _session_config(self, settings, session):
+        data = dict(settings,
+                    source_dir=os.path.join(session, 'sources'),
+                    testcase_dir=os.path.join(session, 'testcases'),
+                    exec_dir=os.path.join(session, 'executables'),
+                    result_log=os.path.join(session, 'results', 'eval_log.txt'),
+                    csv_file=os.path.join(session, 'results', 'eval_results.csv'),
+                    compile_cache_dir=os.path.join(self.cache_dir, 'compile'),
+                    workers=self.workers)
+        os.makedirs(data['source_dir'])
+        os.makedirs(data['testcase_dir'])
+        return Config.from_data(data)
+
+    def _sync_test_cases(self, sock, cases, manifest_data, testcase_dir):
+        """Links the test cases into testcase_dir from the cache, fetching missing files first,
+        and writes the manifest for them. Returns the (input, output) pairs in run order."""
+        blobs_dir = os.path.join(self.cache_dir, 'testcases')
+        os.makedirs(blobs_dir, exist_ok=True)
+        for case in cases:
+            for kind in ('input', 'output'):
+                _check_name(case[kind]['name'])
+                _check_digest(case[kind]['sha256'])
+        digests = sorted({case[kind]['sha256'] for case in cases for kind in ('input', 'output')})
+        missing = [digest for digest in digests if not os.path.exists(os.path.join(blobs_dir, digest))]
+        for digest in missing: # One at a time, so only one file is ever held in memory
+            send_message(sock, {'type': 'fetch', 'digests': [digest]})
+            reply, blobs = recv_message(sock)
+            if reply is None or reply['digests'] != [digest]:
+                raise ConnectionError(f"the coordinator didn't send test case file {digest}")
+            temp_path = os.path.join(blobs_dir, f".{digest}.{os.getpid()}.tmp")
+            with open(temp_path, 'wb') as f:
+                f.write(blobs[0])
+            if file_digest(temp_path) != digest:
+                os.remove(temp_path)
+                raise ValueError(f"test case file {digest} arrived corrupted")
+            os.replace(temp_path, os.path.join(blobs_dir, digest))
+        print(f"Test cases: {len(cases)} ({len(missing)} files fetched, {len(digests) - len(missing)} cached)")
+
+        manifest_cases = []
+        for case in cases:
+            local_case = dict(case)
+            for kind in ('input', 'output'):
+                entry = case[kind]
+                path = os.path.join(testcase_dir, entry['name'])
+                try:
+                    os.link(os.path.join(blobs_dir, entry['sha256']), path)
+                except OSError:
+                    shutil.copyfile(os.path.join(blobs_dir, entry['sha256']), path)
+                st = os.stat(path)
+                local_case[kind] = dict(entry, size=st.st_size, mtime_ns=st.st_mtime_ns)
+            manifest_cases.append(local_case)
+        # Indexed as TestCaseFinder would, so the digests are taken from it instead of rehashing
+        manifest = TestCaseManifest(testcase_dir)
+        manifest.data = dict(manifest_data, version=TestCaseManifest.VERSION,
+                             cases=sorted(manifest_cases, key=lambda case: case['index']),
+                             files=sorted(os.listdir(testcase_dir)))
+        manifest.write()
+        return [(os.path.join(testcase_dir, case['input']['name']), os.path.join(testcase_dir, case['output']['name']))
+                for case in cases]
+
+    def _work(self, sock, config, test_cases):
+        """Runs the jobs on a process pool of config.workers until the coordinator is done."""
+        with _start_pool(config, test_cases, {}) as pool:
+            self._send(sock, {'type': 'ready', 'slots': config.workers})
+            while True:
+                message, blobs = recv_message(sock)
+                if message is None or message['type'] == 'done':
+                    return
+                if message['type'] != 'job':
+                    continue
+                try:
+                    _check_name(message['source_file'])
+                except ValueError as e: # Answered, so the coordinator doesn't hand it to the next node
+                    print(f"Warning: Refusing job {message['job']}: {e}")
+                    self._send_result(sock, message['job'], _runner_error(message['source_file'], f"Error: {e}"))
+                    continue
+                with open(os.path.join(config.source_dir, message['source_file']), 'wb') as f:
+                    f.write(blobs[0])
+                future = pool.submit(_evaluate_in_worker, message['source_file'])
+                future.add_done_callback(lambda future, job=message['job']: self._finished(sock, job, future))
+
+    def _finished(self, sock, job, future):
+        try:
+            self._send_result(sock, job, future.result())
+        except Exception as e:
+            # A broken pool can't take more jobs: hang up, so the coordinator re-queues ours
+            print(f"Error: Could not evaluate job {job}: {e}")
+            try:
+                sock.shutdown(socket.SHUT_RDWR)
+            except OSError:
+                pass
+
+    def _send_result(self, sock, job, submission):
+        self._send(sock, {'type': 'result', 'job': job,
+                          'submission': {key: getattr(submission, key) for key in RESULT_FIELDS}})
+
+    def _send(self, sock, message):
+        with self._send_lock:
+            send_message(sock, message)
+
+if __name__ == '__main__':
+    left, right = socket.socketpair()
+    send_message(left, {'type': 'job', 'job': 3}, [b"int main() {}", b""])
+    send_message(left, {'type': 'done'})
+    assert recv_message(right) == ({'type': 'job', 'job': 3}, [b"int main() {}", b""])
+    assert recv_message(right) == ({'type': 'done'}, [])
+    left.close()
+    assert recv_message(right) == (None, [])
+    assert parse_address("10.0.0.5:7788") == (socket.AF_INET, ('10.0.0.5', 7788))
+    assert parse_address(":0") == (socket.AF_INET, ('127.0.0.1', 0))
+    assert parse_address("unix:/tmp/eval.sock") == (socket.AF_UNIX, '/tmp/eval.sock')
+    print("Distributed protocol test successful.")
@@ -1,19 +1,42 @@
 # evaluator/logger.py
+import atexit
 import csv
 import os
 import datetime
+import queue
+import threading
+import time
+
+from evaluator.tracing import span
+
+# The CPU columns came later than the rest, so they go last and the older column positions stay valid
+CSV_HEADER = ['Program', 'TestCase Input', 'Result', 'Time (s)', 'Memory (KB)', 'Error/Details', 'CPU User (s)', 'CPU System (s)']
 
 class Logger:
+    """Writes results to the plaintext log and the CSV file.
+
+    log_result() only queues the row; a single writer thread keeps both files
+    open, writes rows in batches and flushes at least every FLUSH_INTERVAL
+    seconds. close() (also run at exit) writes everything still queued.
+    With csv_file_path None only the plaintext log is written (the results
+    store exports the CSV instead).
+    """
+    FLUSH_INTERVAL = 1.0
+
     def __init__(self, log_file_path, csv_file_path):
         self.log_file_path = log_file_path
         self.csv_file_path = csv_file_path
+        self._queue = queue.Queue()
+        self._writer = None
+        self._timestamp_cache = (None, "") # (second, formatted)
         self._ensure_dirs_exist()
 
     def _ensure_dirs_exist(self):
         # Ensure the directory for the log file exists
         os.makedirs(os.path.dirname(self.log_file_path), exist_ok=True)
         # Ensure the directory for the CSV file exists
-        os.makedirs(os.path.dirname(self.csv_file_path), exist_ok=True)
+        if self.csv_file_path:
+            os.makedirs(os.path.dirname(self.csv_file_path), exist_ok=True)
 
     def log_header(self):
         # Delete the log file if it already exists to ensure a clean start
@@ -25,7 +48,7 @@ class Logger:
 
         # --- MODIFICATION START ---
         # Delete the CSV file if it already exists to ensure a clean start
-        if os.path.exists(self.csv_file_path):
+        if self.csv_file_path and os.path.exists(self.csv_file_path):
             try:
                 os.remove(self.csv_file_path)
             except OSError as e:
@@ -37,30 +60,75 @@ class Logger:
             f.write(f"DSA Test Code Evaluator Log - {datetime.datetime.now()}\n")
             f.write("-" * 50 + "\n\n")
 
+        if not self.csv_file_path:
+            return
+
         # Log to CSV file (will be created fresh due to previous deletion, then header written)
         # The 'a' mode is fine here because we've explicitly removed it if it existed.
         with open(self.csv_file_path, 'a', newline='') as f:
             writer = csv.writer(f)
             # Since we explicitly removed the file if it existed, it will always be "new" for the purpose of writing the header.
-            writer.writerow(['Program', 'TestCase Input', 'Result', 'Time (s)', 'Memory (KB)', 'Error/Details'])
-
-    def log_result(self, program_name, test_case_name, result, time_s, memory_kb, error_details=""):
-        timestamp = datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-
+            writer.writerow(CSV_HEADER)
+
+    def log_result(self, program_name, test_case_name, result, time_s, memory_kb, error_details="", cpu_user_s=0.0, cpu_sys_s=0.0):
+        # time_s is wall-clock time; cpu_user_s/cpu_sys_s and memory_kb (peak RSS)
+        # are the test process' own usage as reported by wait4()
+        if self._writer is None:
+            self._writer = threading.Thread(target=self._write_loop, name="log-writer", daemon=True)
+            self._writer.start()
+            atexit.register(self.close)
+        self._queue.put((time.time(), program_name, test_case_name, result, time_s, memory_kb, error_details, cpu_user_s, cpu_sys_s))
+
+    def close(self):
+        """Waits until every queued result is written and flushed. Safe to call more than once."""
+        if self._writer is None:
+            return
+        self._queue.put(None)
+        self._writer.join()
+        self._writer = None
+        atexit.unregister(self.close)
+
+    def _write_loop(self):
+        with open(self.log_file_path, 'a') as log_f, open(self.csv_file_path or os.devnull, 'a', newline='') as csv_f:
+            csv_writer = csv.writer(csv_f)
+            last_flush = time.monotonic()
+            while True:
+                batch = []
+                try:
+                    batch.append(self._queue.get(timeout=self.FLUSH_INTERVAL))
+                    while True: # Take everything else that is already queued
+                        batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    pass
+                with span("log_write", rows=len(batch)):
+                    for entry in batch:
+                        if entry is not None:
+                            self._write_entry(log_f, csv_writer, *entry)
+                    if None in batch or time.monotonic() - last_flush >= self.FLUSH_INTERVAL:
+                        log_f.flush()
+                        csv_f.flush()
+                        last_flush = time.monotonic()
+                if None in batch:
+                    return
+
+    def _timestamp(self, logged_at):
+        second = int(logged_at)
+        if self._timestamp_cache[0] != second:
+            self._timestamp_cache = (second, datetime.datetime.fromtimestamp(second).strftime("%Y-%m-%d %H:%M:%S"))
+        return self._timestamp_cache[1]
+
+    def _write_entry(self, log_f, csv_writer, logged_at, program_name, test_case_name, result, time_s, memory_kb, error_details, cpu_user_s, cpu_sys_s):
         # Log to plaintext file
-        with open(self.log_file_path, 'a') as f:
-            f.write(f"[{timestamp}] Program: {program_name}, Test Case: {test_case_name}\n")
-            f.write(f"  Result: {result}\n")
-            f.write(f"  Time: {time_s:.4f} s\n")
-            f.write(f"  Memory: {memory_kb} KB\n")
-            if error_details:
-                f.write(f"  Details: {error_details}\n")
-            f.write("\n")
+        details = f"  Details: {error_details}\n" if error_details else ""
+        log_f.write(f"[{self._timestamp(logged_at)}] Program: {program_name}, Test Case: {test_case_name}\n"
+                    f"  Result: {result}\n"
+                    f"  Time: {time_s:.4f} s\n"
+                    f"  CPU: {cpu_user_s:.4f} s user, {cpu_sys_s:.4f} s system\n"
+                    f"  Memory: {memory_kb} KB\n"
+                    f"{details}\n")
 
         # Log to CSV file
-        with open(self.csv_file_path, 'a', newline='') as f:
-            writer = csv.writer(f)
-            writer.writerow([program_name, test_case_name, result, f"{time_s:.4f}", memory_kb, error_details])
+        csv_writer.writerow([program_name, test_case_name, result, f"{time_s:.4f}", memory_kb, error_details, f"{cpu_user_s:.4f}", f"{cpu_sys_s:.4f}"])
 
 if __name__ == '__main__':
     # Basic test for Logger
@@ -76,10 +144,11 @@ if __name__ == '__main__':
     logger.log_header() # This will now delete both log_file and csv_file if they exist
 
     print("\n--- Logging Test ---")
-    logger.log_result("add.py", "input1.txt", "Correct", 0.0123, 1024)
+    logger.log_result("add.py", "input1.txt", "Correct", 0.0123, 1024, "", 0.0081, 0.0012)
     logger.log_result("add.py", "input2.txt", "Wrong Answer", 0.015, 1028, "Expected 10, got 12")
     logger.log_result("sort.cpp", "input_large.txt", "Time Limit Exceeded", 2.001, 50000, "Process killed due to timeout")
     logger.log_result("fibo.c", "input_small.txt", "Runtime Error", 0.005, 500, "Segmentation fault")
+    logger.close() # Rows are written by the writer thread
 
     print(f"Check '{log_file}' and '{csv_file}' for results.")
 
@@ -94,7 +163,8 @@ if __name__ == '__main__':
         reader = csv.reader(f)
         rows = list(reader)
         assert len(rows) == 5 # Header + 4 data rows
-        assert rows[0] == ['Program', 'TestCase Input', 'Result', 'Time (s)', 'Memory (KB)', 'Error/Details']
+        assert rows[0] == CSV_HEADER
+        assert rows[1][6] == '0.0081' # CPU User (s)
         assert rows[2][2] == 'Wrong Answer'
         assert rows[4][0] == 'fibo.c'
     print("Logging test successful.")
@@ -0,0 +1,286 @@
+# evaluator/metrics.py
+import json
+import os
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# Upper bounds (seconds) of the histogram buckets; a final +Inf bucket is implied
+COMPILE_BUCKETS = (0.1, 0.25, 0.5, 1, 2, 5, 10, 30)
+TEST_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2, 5, 10)
+# tests_per_second_recent covers the results delivered this many seconds back
+RECENT_WINDOW = 60
+
+class Histogram:
+    """Cumulative bucket counts, like a Prometheus histogram."""
+
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1) # Last one is +Inf
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value):
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                self.counts[i] += 1
+                break
+        else:
+            self.counts[-1] += 1
+        self.sum += value
+        self.count += 1
+
+    def snapshot(self):
+        cumulative = []
+        total = 0
+        for bound, count in zip(list(self.buckets) + ["+Inf"], self.counts):
+            total += count
+            cumulative.append((str(bound), total))
+        return {'buckets': cumulative, 'sum': round(self.sum, 6), 'count': self.count}
+
+class Metrics:
+    """Progress of the running batch, updated by main.py as each submission's result arrives.
+
+    snapshot() gives a consistent view for the metrics file and the HTTP
+    endpoint, which read from other threads. Results arrive per submission, so
+    the figures move in steps of one submission; seconds_since_last_result
+    growing far beyond the time one submission takes points at a stalled grader.
+    """
+
+    def __init__(self, config, total_submissions, test_cases):
+        self.total_submissions = total_submissions
+        self.test_case_names = {os.path.basename(input_file) for input_file, _ in test_cases}
+        # Processes (or, async engine, concurrent test runs) that can be busy at once
+        if config.engine == 'async':
+            self.slots = config.async_concurrency or os.cpu_count() or 1
+        else:
+            self.slots = config.workers
+        self.started = time.time()
+        self.last_result = None
+        self.submissions_done = 0
+        self.tests_run = 0
+        self.tests_reused = 0
+        self.verdicts = {}
+        self.busy_seconds = 0.0
+        self.run_queue_depth = None # Only the pipelined engine has a run queue
+        self.compile_seconds = Histogram(COMPILE_BUCKETS)
+        self.test_seconds = Histogram(TEST_BUCKETS)
+        self._recent = [] # (delivered at, tests run) within RECENT_WINDOW
+        self._lock = threading.Lock()
+
+    def add_submission(self, submission):
+        now = time.time()
+        with self._lock:
+            self.submissions_done += 1
+            self.last_result = now
+            self.busy_seconds += submission.busy_seconds
+            if submission.compile_seconds is not None:
+                self.compile_seconds.observe(submission.compile_seconds)
+            tests = 0
+            for row in submission.rows:
+                if row[1] not in self.test_case_names:
+                    continue # Compile/static analysis failures and group score rows
+                self.verdicts[row[2]] = self.verdicts.get(row[2], 0) + 1
+                if row[1] in submission.known_verdicts:
+                    self.tests_reused += 1
+                elif row[2] != "Skipped":
+                    tests += 1
+                    self.test_seconds.observe(row[3])
+            self.tests_run += tests
+            self._recent.append((now, tests))
+            self._recent = [entry for entry in self._recent if entry[0] >= now - RECENT_WINDOW]
+
+    def set_run_queue_depth(self, depth):
+        self.run_queue_depth = depth
+
+    def snapshot(self):
+        now = time.time()
+        with self._lock:
+            elapsed = now - self.started
+            pending = self.total_submissions - self.submissions_done
+            rate = self.submissions_done / elapsed if elapsed > 0 else 0.0
+            recent_window = min(RECENT_WINDOW, elapsed)
+            return {
+                'updated_at': round(now, 3),
+                'elapsed_seconds': round(elapsed, 3),
+                'submissions_total': self.total_submissions,
+                'submissions_done': self.submissions_done,
+                'submissions_pending': pending,
+                'eta_seconds': round(pending / rate, 1) if rate > 0 else None,
+                'seconds_since_last_result': round(now - (self.last_result or self.started), 3),
+                'tests_run': self.tests_run,
+                'tests_reused': self.tests_reused,
+                'tests_per_second': round(self.tests_run / elapsed, 3) if elapsed > 0 else 0.0,
+                'tests_per_second_recent': round(sum(tests for _, tests in self._recent) / recent_window, 3) if recent_window > 0 else 0.0,
+                'verdicts': dict(self.verdicts),
+                'run_queue_depth': self.run_queue_depth,
+                'worker_slots': self.slots,
+                'worker_utilization': round(min(self.busy_seconds / (elapsed * self.slots), 1.0), 4) if elapsed > 0 else 0.0,
+                'compile_seconds': self.compile_seconds.snapshot(),
+                'test_seconds': self.test_seconds.snapshot(),
+            }
+
+    def progress_line(self):
+        snapshot = self.snapshot()
+        eta = snapshot['eta_seconds']
+        eta_text = time.strftime("%H:%M:%S", time.gmtime(eta)) if eta is not None else "--:--:--"
+        return (f"[{snapshot['submissions_done']}/{snapshot['submissions_total']}] "
+                f"{snapshot['tests_per_second']:.1f} tests/s, "
+                f"utilization {snapshot['worker_utilization']:.0%}, ETA {eta_text}")
+
+def prometheus_text(snapshot):
+    """The snapshot in the Prometheus text exposition format."""
+    lines = []
+
+    def metric(name, kind, help_text, samples):
+        lines.append(f"# HELP evaluator_{name} {help_text}")
+        lines.append(f"# TYPE evaluator_{name} {kind}")
+        for labels, value in samples:
+            lines.append(f"evaluator_{name}{labels} {value}")
+
+    def histogram(name, help_text, data):
+        samples = [(f'_bucket{{le="{bound}"}}', count) for bound, count in data['buckets']]
+        samples += [("_sum", data['sum']), ("_count", data['count'])]
+        metric(name, "histogram", help_text, samples)
+
+    metric("submissions", "gauge", "Submissions in the batch", [("", snapshot['submissions_total'])])
+    metric("submissions_done_total", "counter", "Submissions evaluated so far", [("", snapshot['submissions_done'])])
+    metric("submissions_pending", "gauge", "Submissions not evaluated yet", [("", snapshot['submissions_pending'])])
+    metric("tests_run_total", "counter", "Test cases run", [("", snapshot['tests_run'])])
+    metric("tests_reused_total", "counter", "Verdicts reused from earlier runs", [("", snapshot['tests_reused'])])
+    metric("verdicts_total", "counter", "Test case verdicts",
+           [(f'{{verdict="{verdict}"}}', count) for verdict, count in sorted(snapshot['verdicts'].items())])
+    metric("tests_per_second", "gauge", "Tests run per second since the start", [("", snapshot['tests_per_second'])])
+    metric("tests_per_second_recent", "gauge", f"Tests run per second over the last {RECENT_WINDOW}s",
+           [("", snapshot['tests_per_second_recent'])])
+    metric("worker_utilization", "gauge", "Share of worker time spent on submissions", [("", snapshot['worker_utilization'])])
+    if snapshot['run_queue_depth'] is not None:
+        metric("run_queue_depth", "gauge", "Compiled submissions waiting for the run stage", [("", snapshot['run_queue_depth'])])
+    if snapshot['eta_seconds'] is not None:
+        metric("eta_seconds", "gauge", "Estimated seconds until the batch is done", [("", snapshot['eta_seconds'])])
+    metric("seconds_since_last_result", "gauge", "Seconds since a submission's result last arrived",
+           [("", snapshot['seconds_since_last_result'])])
+    histogram("compile_seconds", "Compile time per submission", snapshot['compile_seconds'])
+    histogram("test_seconds", "Wall-clock time per test run", snapshot['test_seconds'])
+    return "\n".join(lines) + "\n"
+
+class MetricsPublisher:
+    """Serves the metrics over HTTP and/or rewrites them into a JSON file every `interval` seconds.
+
+    GET /metrics answers in the Prometheus text format, GET /metrics.json (or /)
+    with the JSON snapshot. The server only listens on localhost. The file is
+    replaced atomically, so a reader never sees half of it.
+    """
+
+    def __init__(self, metrics, port=None, file_path=None, interval=5):
+        self.metrics = metrics
+        self.port = port
+        self.file_path = file_path
+        self.interval = interval
+        self._server = None
+        self._stop = threading.Event()
+        self._writer = None
+
+    def start(self):
+        if self.port is not None:
+            try:
+                self._server = ThreadingHTTPServer(('127.0.0.1', self.port), self._handler())
+            except OSError as e:
+                print(f"Warning: Could not serve metrics on port {self.port}: {e}")
+            else:
+                self._server.daemon_threads = True
+                threading.Thread(target=self._server.serve_forever, name="metrics-http", daemon=True).start()
+                print(f"Metrics: http://127.0.0.1:{self._server.server_address[1]}/metrics")
+        if self.file_path:
+            if os.path.dirname(self.file_path):
+                os.makedirs(os.path.dirname(self.file_path), exist_ok=True)
+            self._writer = threading.Thread(target=self._write_loop, name="metrics-file", daemon=True)
+            self._writer.start()
+
+    def stop(self):
+        """Writes the final figures and shuts the server down."""
+        self._stop.set()
+        if self._writer:
+            self._writer.join()
+        if self._server:
+            self._server.shutdown()
+            self._server.server_close()
+
+    def _write_loop(self):
+        while True:
+            stopping = self._stop.wait(self.interval)
+            self.write_file()
+            if stopping:
+                return
+
+    def write_file(self):
+        temp_path = f"{self.file_path}.tmp"
+        try:
+            with open(temp_path, 'w') as f:
+                json.dump(self.metrics.snapshot(), f, indent=2)
+            os.replace(temp_path, self.file_path)
+        except OSError as e:
+            print(f"Warning: Could not write metrics file {self.file_path}: {e}")
+
+    def _handler(self):
+        metrics = self.metrics
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                snapshot = metrics.snapshot()
+                if self.path == '/metrics':
+                    body, content_type = prometheus_text(snapshot), "text/plain; version=0.0.4"
+                elif self.path in ('/', '/metrics.json'):
+                    body, content_type = json.dumps(snapshot, indent=2), "application/json"
+                else:
+                    self.send_error(404)
+                    return
+                data = body.encode()
+                self.send_response(200)
+                self.send_header("Content-Type", content_type)
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def log_message(self, format, *args):
+                pass # Scrapes would flood the evaluator's output
+
+        return Handler
+
+if __name__ == '__main__':
+    import urllib.request
+
+    class DummyConfig:
+        engine = 'process'
+        workers = 2
+
+    class DummySubmission:
+        def __init__(self, rows, known=(), compile_seconds=0.3, busy_seconds=0.5):
+            self.rows = rows
+            self.known_verdicts = dict.fromkeys(known)
+            self.compile_seconds = compile_seconds
+            self.busy_seconds = busy_seconds
+
+    metrics = Metrics(DummyConfig(), 3, [("t/input1.txt", "t/output1.txt"), ("t/input2.txt", "t/output2.txt")])
+    metrics.add_submission(DummySubmission([("add", "input1.txt", "Correct", 0.02, 100), ("add", "input2.txt", "Wrong Answer", 3.0, 100)]))
+    metrics.add_submission(DummySubmission([("mul", "input1.txt", "Correct", 0.02, 100), ("mul", "input2.txt", "Skipped", 0, 0)], known=["input1.txt"]))
+    metrics.add_submission(DummySubmission([("div", "N/A", "Compilation Error", 0, 0)], compile_seconds=12))
+    snapshot = metrics.snapshot()
+    assert snapshot['submissions_pending'] == 0 and snapshot['tests_run'] == 2 and snapshot['tests_reused'] == 1
+    assert snapshot['verdicts'] == {"Correct": 2, "Wrong Answer": 1, "Skipped": 1}, snapshot['verdicts']
+    assert snapshot['test_seconds']['buckets'][2] == ("0.025", 1) and snapshot['test_seconds']['buckets'][-1] == ("+Inf", 2)
+    assert snapshot['compile_seconds']['count'] == 3 and snapshot['compile_seconds']['buckets'][-2] == ("30", 3)
+
+    publisher = MetricsPublisher(metrics, port=0, file_path="test_metrics/metrics.json", interval=0.1)
+    publisher.start()
+    url = f"http://127.0.0.1:{publisher._server.server_address[1]}"
+    text = urllib.request.urlopen(f"{url}/metrics").read().decode()
+    assert 'evaluator_verdicts_total{verdict="Wrong Answer"} 1' in text and 'evaluator_test_seconds_bucket{le="+Inf"} 2' in text
+    assert json.loads(urllib.request.urlopen(f"{url}/metrics.json").read())['tests_run'] == 2
+    publisher.stop()
+    with open("test_metrics/metrics.json") as f:
+        assert json.load(f)['submissions_done'] == 3
+    os.remove("test_metrics/metrics.json")
+    os.rmdir("test_metrics")
+    print(metrics.progress_line())
+    print("Metrics test successful.")
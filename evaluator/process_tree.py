@@ -0,0 +1,78 @@
+# evaluator/process_tree.py
+# Keeps everything a test program starts inside the test. Every test process
+# leads its own session (and so its own process group), the evaluator is a
+# child subreaper, and when the test ends the whole group is killed and reaped.
+# Without the subreaper, descendants that outlive the test are adopted by init
+# and keep burning CPU for the rest of the batch; with it they are adopted by
+# the evaluator, so their CPU time and memory count against the test.
+import ctypes
+import ctypes.util
+import os
+import signal
+
+PR_SET_CHILD_SUBREAPER = 36 # linux/prctl.h
+
+_subreaper = None # Whether this process is a child subreaper, once tried
+
+def become_subreaper():
+    """Makes orphaned descendants reparent to this process instead of init. Linux only; returns success."""
+    global _subreaper
+    if _subreaper is None:
+        _subreaper = False
+        try:
+            libc = ctypes.CDLL(ctypes.util.find_library('c'), use_errno=True)
+            _subreaper = libc.prctl(PR_SET_CHILD_SUBREAPER, 1, 0, 0, 0) == 0
+        except (OSError, AttributeError):
+            pass
+        if not _subreaper:
+            print("Warning: Could not become a child subreaper; processes a test leaves behind are killed but not accounted.")
+    return _subreaper
+
+def kill_tree(process):
+    """SIGKILLs the test process and every process left in its process group."""
+    try:
+        os.killpg(process.pid, signal.SIGKILL)
+    except (ProcessLookupError, PermissionError):
+        pass # The group is gone (or isn't there yet: a zygote child that hasn't called setsid)
+    if process.returncode is None:
+        process.kill()
+
+def reap_tree(process):
+    """Kills what is left of the test's process group and reaps the descendants this process adopted.
+
+    Call once the test process itself has been reaped, so its own wait4()
+    usage isn't taken here. Returns their (largest peak RSS KB, user CPU s,
+    system CPU s). Descendants that left the group (setsid) are out of reach.
+    """
+    kill_tree(process)
+    maxrss, utime, stime = 0, 0.0, 0.0
+    while True:
+        try:
+            # The group members we are the parent of: adopted orphans, all SIGKILLed above
+            _, _, usage = os.wait4(-process.pid, 0)
+        except ChildProcessError:
+            return maxrss, utime, stime
+        maxrss = max(maxrss, usage.ru_maxrss)
+        utime += usage.ru_utime
+        stime += usage.ru_stime
+
+if __name__ == '__main__':
+    import subprocess
+    import time
+    assert become_subreaper()
+    # The test spawns a CPU-burning grandchild and exits; the grandchild holds no pipe
+    script = ("import subprocess, sys\n"
+              "subprocess.Popen([sys.executable, '-c', 'while True: pass'],"
+              " stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)\n")
+    process = subprocess.Popen(['python3', '-c', script], start_new_session=True)
+    process.wait()
+    time.sleep(0.5) # Let the orphan burn some CPU
+    maxrss, utime, stime = reap_tree(process)
+    assert maxrss > 0 and utime + stime > 0.2, (maxrss, utime, stime)
+    try:
+        os.killpg(process.pid, 0)
+        raise AssertionError("process group still alive")
+    except ProcessLookupError:
+        pass
+    print(f"Orphan killed and reaped: {maxrss} KB, {utime + stime:.2f}s CPU")
+    print("Process tree test successful.")
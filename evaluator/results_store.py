@@ -0,0 +1,326 @@
+# evaluator/results_store.py
+import csv
+import datetime
+import json
+import os
+import sqlite3
+
+from evaluator.compare import file_digest
+from evaluator.logger import CSV_HEADER
+from evaluator.testcase import SCORE_RESULTS, TestCaseManifest
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    id INTEGER PRIMARY KEY,
+    started_at TEXT NOT NULL,
+    finished_at TEXT,
+    config_path TEXT,
+    source_dir TEXT,
+    testcase_dir TEXT,
+    io_mode TEXT,
+    time_limit_seconds REAL,
+    limit_mode TEXT,
+    memory_limit_mb REAL
+);
+CREATE TABLE IF NOT EXISTS submissions (
+    id INTEGER PRIMARY KEY,
+    run_id INTEGER NOT NULL REFERENCES runs(id),
+    source_file TEXT NOT NULL,
+    program_name TEXT NOT NULL,
+    language TEXT,
+    source_sha256 TEXT,
+    UNIQUE (run_id, source_file)
+);
+CREATE TABLE IF NOT EXISTS test_cases (
+    id INTEGER PRIMARY KEY,
+    name TEXT NOT NULL,
+    input_sha256 TEXT NOT NULL,
+    output_sha256 TEXT NOT NULL,
+    UNIQUE (name, input_sha256, output_sha256)
+);
+CREATE TABLE IF NOT EXISTS results (
+    id INTEGER PRIMARY KEY,
+    run_id INTEGER NOT NULL REFERENCES runs(id),
+    submission_id INTEGER NOT NULL REFERENCES submissions(id),
+    test_case_id INTEGER REFERENCES test_cases(id), -- NULL for rows that are not about a test case ("N/A")
+    test_case_name TEXT NOT NULL,
+    result TEXT NOT NULL,
+    time_s REAL,
+    cpu_user_s REAL,
+    cpu_sys_s REAL,
+    memory_kb INTEGER,
+    details TEXT
+);
+-- Score rows of runs with test groups: one per group ("Group <name>") and the "Total"
+CREATE TABLE IF NOT EXISTS group_scores (
+    id INTEGER PRIMARY KEY,
+    run_id INTEGER NOT NULL REFERENCES runs(id),
+    submission_id INTEGER NOT NULL REFERENCES submissions(id),
+    name TEXT NOT NULL,
+    result TEXT NOT NULL,
+    time_s REAL,
+    memory_kb INTEGER,
+    details TEXT
+);
+-- Latest verdict per (source, language, test case content, limits), reused by incremental runs
+CREATE TABLE IF NOT EXISTS verdicts (
+    source_sha256 TEXT NOT NULL,
+    language TEXT NOT NULL,
+    input_sha256 TEXT NOT NULL,
+    output_sha256 TEXT NOT NULL,
+    limits TEXT NOT NULL,
+    result TEXT NOT NULL,
+    time_s REAL,
+    cpu_user_s REAL,
+    cpu_sys_s REAL,
+    memory_kb INTEGER,
+    details TEXT,
+    PRIMARY KEY (source_sha256, language, input_sha256, output_sha256, limits)
+);
+CREATE INDEX IF NOT EXISTS results_run ON results (run_id, result);
+CREATE INDEX IF NOT EXISTS results_submission ON results (submission_id);
+CREATE INDEX IF NOT EXISTS results_test_case ON results (test_case_id);
+CREATE INDEX IF NOT EXISTS group_scores_submission ON group_scores (submission_id);
+CREATE INDEX IF NOT EXISTS submissions_program ON submissions (program_name);
+"""
+
+class ResultsStore:
+    """SQLite history of evaluation runs: runs, submissions, test cases and results.
+
+    Rows are buffered and written BATCH_SIZE submissions per transaction. Test
+    cases are identified by name plus the content digests from the testcase
+    manifest, so results stay comparable across runs only while a test case is
+    unchanged. Group and total score rows go to group_scores, so results only
+    holds rows about test cases (and "N/A" rows of submissions that never ran).
+    """
+    BATCH_SIZE = 50
+    # Verdicts that say something about the evaluator rather than the submission are not reused
+    NOT_REUSED = {"Runner Error", "Skipped"} # Skipped: not run because of fail_fast
+
+    def __init__(self, db_path):
+        self.db_path = db_path
+        if os.path.dirname(db_path):
+            os.makedirs(os.path.dirname(db_path), exist_ok=True)
+        self.conn = sqlite3.connect(db_path)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA foreign_keys=ON")
+        self.conn.executescript(SCHEMA)
+        self.run_id = None
+        self._limits = {} # test case (input file) name -> verdict_limits() of its group
+        self._test_case_ids = {} # test case (input file) name -> id, for the current run
+        self._test_case_digests = {} # test case (input file) name -> (input sha256, output sha256)
+        self._pending = []
+
+    def start_run(self, config, manifest):
+        """Records a new run and the test cases of the manifest; returns the run id."""
+        with self.conn:
+            cursor = self.conn.execute(
+                "INSERT INTO runs (started_at, config_path, source_dir, testcase_dir, io_mode, time_limit_seconds, limit_mode, memory_limit_mb)"
+                " VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (_now(), getattr(config, 'config_path', None), config.source_dir, config.testcase_dir, config.io_mode,
+                 config.time_limit_seconds, config.limit_mode, config.memory_limit_mb))
+            self.run_id = cursor.lastrowid
+            self._limits = case_limits(config, manifest)
+            for case in manifest.cases:
+                key = (case['input']['name'], case['input']['sha256'], case['output']['sha256'])
+                self._test_case_digests[key[0]] = key[1:]
+                self.conn.execute("INSERT OR IGNORE INTO test_cases (name, input_sha256, output_sha256) VALUES (?, ?, ?)", key)
+                self._test_case_ids[key[0]] = self.conn.execute(
+                    "SELECT id FROM test_cases WHERE name = ? AND input_sha256 = ? AND output_sha256 = ?", key).fetchone()[0]
+        return self.run_id
+
+    def add_submission(self, submission, source_path):
+        """Queues a SubmissionResult and its rows; written with the next batch."""
+        source_sha256 = submission.source_sha256
+        if source_sha256 is None and os.path.isfile(source_path):
+            source_sha256 = file_digest(source_path)
+        self._pending.append((submission, source_sha256))
+        if len(self._pending) >= self.BATCH_SIZE:
+            self.flush()
+
+    def flush(self):
+        if not self._pending:
+            return
+        with self.conn: # One transaction for the whole batch
+            for submission, source_sha256 in self._pending:
+                cursor = self.conn.execute(
+                    "INSERT INTO submissions (run_id, source_file, program_name, language, source_sha256) VALUES (?, ?, ?, ?, ?)",
+                    (self.run_id, submission.source_file, submission.program_name, submission.language, source_sha256))
+                submission_id = cursor.lastrowid
+                self.conn.executemany(
+                    "INSERT INTO results (run_id, submission_id, test_case_id, test_case_name, result, time_s, memory_kb, details, cpu_user_s, cpu_sys_s)"
+                    " VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                    [self._result_values(submission_id, *row) for row in submission.rows if row[2] not in SCORE_RESULTS])
+                self.conn.executemany(
+                    "INSERT INTO group_scores (run_id, submission_id, name, result, time_s, memory_kb, details)"
+                    " VALUES (?, ?, ?, ?, ?, ?, ?)",
+                    [(self.run_id, submission_id, *row[1:6]) for row in submission.rows if row[2] in SCORE_RESULTS])
+                if source_sha256 and submission.language:
+                    self.conn.executemany(
+                        "INSERT OR REPLACE INTO verdicts (source_sha256, language, input_sha256, output_sha256, limits,"
+                        " result, time_s, memory_kb, details, cpu_user_s, cpu_sys_s) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                        [(source_sha256, submission.language, *self._test_case_digests[row[1]], self._limits[row[1]], *row[2:])
+                         for row in submission.rows
+                         if row[1] in self._test_case_digests and row[2] not in self.NOT_REUSED])
+        self._pending = []
+
+    def _result_values(self, submission_id, program_name, test_case_name, result, time_s, memory_kb, details="", cpu_user_s=0.0, cpu_sys_s=0.0):
+        return (self.run_id, submission_id, self._test_case_ids.get(test_case_name), test_case_name, result,
+                time_s, memory_kb, details, cpu_user_s, cpu_sys_s)
+
+    def finish_run(self):
+        self.flush()
+        with self.conn:
+            self.conn.execute("UPDATE runs SET finished_at = ? WHERE id = ?", (_now(), self.run_id))
+
+    def close(self):
+        self.flush()
+        self.conn.close()
+
+    # --- queries ---
+
+    def runs(self, limit=20):
+        return self.conn.execute(
+            "SELECT r.id, r.started_at, r.finished_at, r.source_dir,"
+            " (SELECT COUNT(*) FROM submissions s WHERE s.run_id = r.id),"
+            " (SELECT COUNT(*) FROM results x WHERE x.run_id = r.id AND x.result = 'Correct')"
+            " FROM runs r ORDER BY r.id DESC LIMIT ?", (limit,)).fetchall()
+
+    def latest_run_ids(self, count=1):
+        return [row[0] for row in self.conn.execute("SELECT id FROM runs ORDER BY id DESC LIMIT ?", (count,))]
+
+    def previous_run_id(self, run_id):
+        return self.conn.execute("SELECT MAX(id) FROM runs WHERE id < ?", (run_id,)).fetchone()[0]
+
+    def program_totals(self, run_id):
+        """Per submission: tests, correct tests, total time, total CPU time and peak memory.
+
+        Only rows about a test case count; score rows stored in results by older
+        versions, and the "N/A" row of a submission that never ran, do not.
+        """
+        return self.conn.execute(
+            "SELECT s.source_file, COUNT(x.id), COALESCE(SUM(x.result = 'Correct'), 0), SUM(x.time_s),"
+            " SUM(x.cpu_user_s + x.cpu_sys_s), MAX(x.memory_kb)"
+            " FROM submissions s LEFT JOIN results x ON x.submission_id = s.id AND x.test_case_id IS NOT NULL"
+            " WHERE s.run_id = ? GROUP BY s.id ORDER BY s.source_file", (run_id,)).fetchall()
+
+    def slowest_tests(self, run_id, limit=10):
+        return self.conn.execute(
+            "SELECT s.source_file, x.test_case_name, x.result, x.time_s, x.cpu_user_s + x.cpu_sys_s, x.memory_kb"
+            " FROM results x JOIN submissions s ON s.id = x.submission_id"
+            " WHERE x.run_id = ? AND x.test_case_id IS NOT NULL ORDER BY x.time_s DESC LIMIT ?", (run_id, limit)).fetchall()
+
+    def diff_runs(self, old_run_id, new_run_id):
+        """(source file, test case, old result, new result) for every result that changed.
+
+        A submission or test case present in only one of the runs shows None on the other side.
+        Changed group and total scores are listed too, under the score row's name.
+        """
+        query = ("SELECT s.source_file, x.test_case_name, x.result FROM results x"
+                 " JOIN submissions s ON s.id = x.submission_id"
+                 " WHERE x.run_id = ? AND (x.test_case_id IS NOT NULL OR x.test_case_name = 'N/A')"
+                 " UNION ALL SELECT s.source_file, g.name, g.result || ' (' || g.details || ')' FROM group_scores g"
+                 " JOIN submissions s ON s.id = g.submission_id WHERE g.run_id = ?")
+        old = {(source, case): result for source, case, result in self.conn.execute(query, (old_run_id, old_run_id))}
+        new = {(source, case): result for source, case, result in self.conn.execute(query, (new_run_id, new_run_id))}
+        return [(source, case, old.get((source, case)), new.get((source, case)))
+                for source, case in sorted(old.keys() | new.keys())
+                if old.get((source, case)) != new.get((source, case))]
+
+    def export_csv(self, run_id, csv_path):
+        """Writes a run in the eval_results.csv format, rows in the order they were logged
+        (a submission's score rows follow its test rows)."""
+        rows = self.conn.execute(
+            "SELECT s.program_name, x.test_case_name, x.result, x.time_s, x.cpu_user_s, x.cpu_sys_s, x.memory_kb, x.details,"
+            " x.submission_id, 0, x.id FROM results x JOIN submissions s ON s.id = x.submission_id WHERE x.run_id = ?"
+            " UNION ALL SELECT s.program_name, g.name, g.result, g.time_s, 0.0, 0.0, g.memory_kb, g.details,"
+            " g.submission_id, 1, g.id FROM group_scores g JOIN submissions s ON s.id = g.submission_id WHERE g.run_id = ?"
+            " ORDER BY 9, 10, 11", (run_id, run_id))
+        with open(csv_path, 'w', newline='') as f:
+            writer = csv.writer(f)
+            writer.writerow(CSV_HEADER)
+            for program_name, test_case_name, result, time_s, cpu_user_s, cpu_sys_s, memory_kb, details, *_ in rows:
+                writer.writerow([program_name, test_case_name, result, f"{time_s:.4f}", memory_kb, details,
+                                 f"{cpu_user_s:.4f}", f"{cpu_sys_s:.4f}"])
+
+def verdict_limits(config, time_limit_seconds=None, memory_limit_mb=None):
+    """The settings a verdict depends on besides the source and the test case, as a key.
+    A test case's own limits (group or calibrated) take the place of the global ones."""
+    time_limit_seconds = time_limit_seconds or config.time_limit_seconds
+    memory_limit_mb = memory_limit_mb or config.memory_limit_mb
+    return json.dumps({'io_mode': config.io_mode, 'time_limit_seconds': time_limit_seconds,
+                       'limit_mode': config.limit_mode, 'memory_limit_mb': memory_limit_mb,
+                       'output_limit_mb': config.output_limit_mb}, sort_keys=True)
+
+def case_limits(config, manifest):
+    """Test case (input file) name -> verdict_limits() for every test case of a manifest."""
+    return {name: verdict_limits(config, *limits) for name, limits in manifest.limits(config).items()}
+
+class VerdictCache:
+    """Read side of the verdicts table for incremental runs and adaptive test case
+    ordering; usable from any worker process or thread.
+
+    Every query opens its own short-lived connection, so pool workers and compile
+    threads can read while the main process writes (the database is in WAL mode).
+    """
+
+    def __init__(self, db_path, config, test_cases):
+        self.db_path = db_path
+        self.test_cases = test_cases
+        self._test_cases = {} # (input sha256, output sha256) -> names of the test cases with that content
+        self._limits = {} # test case name -> verdict_limits() it is judged under
+        for input_file, output_file in test_cases:
+            manifest = TestCaseManifest.for_dir(os.path.dirname(input_file))
+            if not self._limits:
+                self._limits = case_limits(config, manifest)
+            input_entry = manifest.file_entry(os.path.basename(input_file))
+            output_entry = manifest.file_entry(os.path.basename(output_file))
+            if input_entry and output_entry:
+                self._test_cases.setdefault((input_entry['sha256'], output_entry['sha256']), []).append(os.path.basename(input_file))
+
+    def lookup(self, source_sha256, language):
+        """Test case name -> (result, time_s, memory_kb, details, cpu_user_s, cpu_sys_s) of earlier runs."""
+        rows = self._query(
+            "SELECT input_sha256, output_sha256, limits, result, time_s, memory_kb, details, cpu_user_s, cpu_sys_s"
+            " FROM verdicts WHERE source_sha256 = ? AND language = ?", (source_sha256, language))
+        return {name: row[3:] for row in rows for name in self._test_cases.get(row[:2], [])
+                if row[2] == self._limits.get(name)}
+
+    def order_test_cases(self):
+        """test_cases, the ones most likely to fail per second of running first.
+
+        A test case scores (failures + 1) / (verdicts + 2), the smoothed share of
+        submissions it failed, divided by its mean run time. Test cases without
+        history count as failing half the time at the mean run time of the rest.
+        Ties keep index order.
+        """
+        stats = {}
+        for input_sha256, output_sha256, limits, count, failures, mean_time in self._query(
+                "SELECT input_sha256, output_sha256, limits, COUNT(*), SUM(result != 'Correct'), AVG(time_s)"
+                " FROM verdicts GROUP BY input_sha256, output_sha256, limits", ()):
+            for name in self._test_cases.get((input_sha256, output_sha256), []):
+                if limits == self._limits.get(name):
+                    stats[name] = ((failures + 1) / (count + 2), mean_time or 0.0)
+        if not stats:
+            return list(self.test_cases)
+        default_time = sum(mean_time for _, mean_time in stats.values()) / len(stats)
+
+        def score(test_case):
+            fail_rate, mean_time = stats.get(os.path.basename(test_case[0]), (0.5, default_time))
+            return -fail_rate / max(mean_time, 0.001)
+        return sorted(self.test_cases, key=score)
+
+    def _query(self, sql, params):
+        if not os.path.exists(self.db_path):
+            return []
+        conn = sqlite3.connect(self.db_path)
+        try:
+            return conn.execute(sql, params).fetchall()
+        except sqlite3.Error as e:
+            print(f"Warning: Could not read earlier verdicts from {self.db_path}: {e}")
+            return []
+        finally:
+            conn.close()
+
+def _now():
+    return datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
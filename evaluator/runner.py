@@ -1,149 +1,408 @@
 # evaluator/runner.py
+import copy
 import subprocess
 import os
+import math
+import selectors
+import signal
 import time
-import resource # Linux specific for memory usage
-import filecmp # For file-based output comparison
+import resource # Linux specific for memory limits
+
+from evaluator.compare import CHUNK_SIZE, ExpectedOutput, StreamComparator, compare_files
+from evaluator.process_tree import become_subreaper, kill_tree, reap_tree
+from evaluator.testcase import manifest_digest
+from evaluator.tracing import span
+from evaluator.zygote import Zygote
+
+class _AccountedPopen(subprocess.Popen):
+    """Popen that reaps its child with os.wait4() and keeps the child's own rusage.
+
+    getrusage(RUSAGE_CHILDREN) aggregates every child the evaluator has ever
+    reaped, so it can't be attributed to a single test run. Both reaping paths
+    of Popen (wait() and poll()) are routed through _wait4pid().
+    """
+    rusage = None
+    # False for the limit_exec shim: its own peak RSS is the evaluator's, inherited at exec
+    measures_program = True
+
+    def _wait4pid(self, pid, wait_flags):
+        pid, sts, rusage = os.wait4(pid, wait_flags)
+        if pid == self.pid:
+            self.rusage = rusage
+        return (pid, sts)
+
+    def _try_wait(self, wait_flags):
+        try:
+            return self._wait4pid(self.pid, wait_flags)
+        except ChildProcessError:
+            # SIGCHLD ignored or the child was reaped elsewhere: no status, no usage
+            return (self.pid, 0)
+
+    def _internal_poll(self, _deadstate=None, _waitpid=None, **kwargs):
+        return super()._internal_poll(_deadstate, _waitpid=self._wait4pid, **kwargs)
+
+class _BoundedCapture:
+    """Keeps the first `limit` bytes written to a pipe and only counts the rest."""
+
+    def __init__(self, limit):
+        self.limit = limit
+        self.data = bytearray()
+        self.total = 0
+
+    def feed(self, chunk):
+        self.total += len(chunk)
+        room = self.limit - len(self.data)
+        if room > 0:
+            self.data += chunk[:room]
+
+    def text(self):
+        text = self.data.decode(errors='replace')
+        if self.total > len(self.data):
+            text += f"... [{self.total - len(self.data)} more bytes]"
+        return text
+
+class _Execution:
+    """What happened to one test process, before a verdict is derived from it.
+
+    Output is never held in full: stdout goes chunk by chunk to the comparator
+    (stdin io_mode) and only a bounded prefix of stdout and stderr is kept for
+    the error details.
+    """
+
+    def __init__(self, comparator=None, output_limit=None):
+        self.process = None
+        self.start_time = None
+        self.wall_time = 0.0
+        self.comparator = comparator
+        self._stdout = _BoundedCapture(Runner.STDOUT_CAPTURE_BYTES)
+        self._stderr = _BoundedCapture(Runner.STDERR_CAPTURE_BYTES)
+        self.output_limit = output_limit # bytes of stdout + stderr, None for no limit
+        self.output_limit_exceeded = False
+        self.timed_out = False
+        self.returncode = None
+        self.usage = (0, 0.0, 0.0) # peak RSS KB, user CPU s, system CPU s
+
+    @property
+    def stdout(self):
+        return self._stdout.text()
+
+    @property
+    def stderr(self):
+        return self._stderr.text()
+
+    def feed_stdout(self, chunk):
+        if self._within_output_limit(chunk):
+            self._stdout.feed(chunk)
+            if self.comparator:
+                self.comparator.feed(chunk)
+
+    def feed_stderr(self, chunk):
+        if self._within_output_limit(chunk):
+            self._stderr.feed(chunk)
+
+    def _within_output_limit(self, chunk):
+        """Counts chunk against the output limit; kills the process the moment it is exceeded."""
+        if self.output_limit_exceeded:
+            return False # Only draining the pipes until the killed process closes them
+        if self.output_limit is not None and self._stdout.total + self._stderr.total + len(chunk) > self.output_limit:
+            self.output_limit_exceeded = True
+            kill_tree(self.process)
+            return False
+        return True
+
+    def elapsed(self):
+        return time.time() - self.start_time if self.start_time else 0
+
+    def finish(self, usage):
+        """Records the reaped test process; usage is that of its whole process tree."""
+        self.wall_time = self.elapsed()
+        self.returncode = self.process.returncode
+        self.usage = usage
 
 class Runner:
+    # In cpu limit_mode the kernel enforces the CPU time limit (RLIMIT_CPU); the
+    # wall-clock timeout only catches programs that sleep or block forever.
+    CPU_MODE_WALL_FACTOR = 3
+    # Output kept for the error details; the comparison itself streams
+    STDOUT_CAPTURE_BYTES = 4 * 1024
+    STDERR_CAPTURE_BYTES = 64 * 1024
+
     def __init__(self, config):
         self.config = config
-
-    def _get_memory_usage_kb(self):
-        """Returns current process's max resident set size in KB. Linux specific."""
-        try:
-            # resource.RUSAGE_CHILDREN includes resources used by child processes
-            # resource.RUSAGE_SELF for current process only
-            # Using RUSAGE_CHILDREN to account for actual program execution
-            return resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss
-        except Exception:
-            # Fallback for non-Linux or if resource module fails
-            return 0 # Indicate no memory measurement
+        self.limit_mode = getattr(config, 'limit_mode', 'wall')
+        # Resolved by evaluator.launcher.prepare_launcher(); preexec_fn works everywhere
+        self.launcher = getattr(config, 'launcher', 'preexec')
+        self.launcher_path = getattr(config, 'launcher_path', None)
+        self.output_limit_mb = getattr(config, 'output_limit_mb', 64)
+        # Started on the first Python test run
+        self.zygote = Zygote() if getattr(config, 'python_zygote', False) else None
+        # Processes a test leaves behind are then adopted (and accounted) by this process
+        become_subreaper()
+
+    def with_limits(self, time_limit_seconds=None, memory_limit_mb=None):
+        """A runner with other limits that shares this one's launcher, zygote and
+        (for AsyncRunner) concurrency bound. Used for test groups' own limits."""
+        if time_limit_seconds is None and memory_limit_mb is None:
+            return self
+        runner = copy.copy(self)
+        runner.config = copy.copy(self.config)
+        if time_limit_seconds is not None:
+            runner.config.time_limit_seconds = time_limit_seconds
+        if memory_limit_mb is not None:
+            runner.config.memory_limit_mb = memory_limit_mb
+        return runner
+
+    def _get_usage(self, process):
+        """Returns (peak RSS in KB, user CPU s, system CPU s) of one reaped child. Linux specific."""
+        if process is None or process.rusage is None:
+            return 0, 0.0, 0.0 # Indicate no measurement
+        usage = process.rusage
+        return usage.ru_maxrss, usage.ru_utime, usage.ru_stime
+
+    def _tree_usage(self, process):
+        """Kills and reaps what the reaped test process left in its process group. Returns the
+        usage of the whole tree: CPU times summed, peak RSS of its largest process.
+
+        Behind the shim the program itself is one of those left behind (see
+        evaluator/launcher.py), and the shim's own peak RSS doesn't count.
+        """
+        maxrss, utime, stime = self._get_usage(process)
+        if not getattr(process, 'measures_program', True) and become_subreaper():
+            maxrss = 0
+        orphan_maxrss, orphan_utime, orphan_stime = reap_tree(process)
+        return max(maxrss, orphan_maxrss), utime + orphan_utime, stime + orphan_stime
 
     def run_code(self, program_path, input_file, expected_output_file, language, program_name_for_py=None):
-        cmd = []
-        process = None
-        start_time = time.time()
-        memory_usage_kb = 0
-        error_output = ""
-        actual_output = ""
-        temp_output_file = None
+        """Runs one test case.
+
+        Returns (result, wall time s, peak RSS KB, user CPU s, system CPU s, details).
+        """
+        if language not in ['python', 'c', 'cpp']:
+            return "Unsupported Language", 0, 0, 0.0, 0.0, "Unknown language for execution."
+        if self.config.io_mode not in ['stdin', 'file']:
+            return "Config Error", 0, 0, 0.0, 0.0, "Invalid I/O mode in config."
+
+        cmd, temp_output_file = self._build_command(program_path, input_file, language, program_name_for_py)
+        self._start_zygote(language)
+        execution = None
+        with span("test", program=program_name_for_py, test_case=os.path.basename(input_file)) as test_span:
+            try:
+                execution = self._new_execution(expected_output_file)
+                self._execute(execution, cmd, input_file)
+                with span("judge"):
+                    outcome = self._judge(execution, expected_output_file, temp_output_file)
+            except Exception as e:
+                execution = execution or _Execution()
+                outcome = "Runtime Error", execution.elapsed(), *execution.usage, f"General Error during execution: {e}"
+            finally:
+                self._remove_temp_output(temp_output_file)
+                if execution and execution.process and execution.process.poll() is None: # If process is still running
+                    kill_tree(execution.process)
+            test_span.set(result=outcome[0])
+            return outcome
+
+    def _build_command(self, program_path, input_file, language, program_name_for_py):
+        """Returns the command line and, in file io_mode, the temporary output file it writes."""
+        if language == 'python':
+            cmd = ['python3', program_path]
+        else:
+            cmd = [program_path]
 
-        try:
-            if language == 'python':
-                cmd = ['python3', program_path]
-            elif language in ['c', 'cpp']:
-                cmd = [program_path]
-            else:
-                return "Unsupported Language", 0, 0, "Unknown language for execution."
-
-            # Prepare commands based on I/O mode
+        temp_output_file = None
+        if self.config.io_mode == 'file':
+            # For file mode, program_name_for_py is the base name (e.g., 'add')
+            # We need a unique temporary output file for each run to prevent conflicts
+            temp_output_filename = f"{program_name_for_py}_{os.path.basename(input_file)}.tmp_out"
+            # In the memory-backed scratch workspace when there is one (evaluator/scratch.py)
+            output_dir = getattr(self.config, 'scratch_path', None) or self.config.exec_dir
+            temp_output_file = os.path.join(output_dir, temp_output_filename)
+            staged_input = getattr(self.config, 'staged_inputs', {}).get(input_file, input_file)
+            cmd = cmd + [staged_input, temp_output_file]
+        return cmd, temp_output_file
+
+    def _start_zygote(self, language):
+        """Starts (or restarts) the Python zygote before a Python run, outside the timed part."""
+        if self.zygote and language == 'python' and not self.zygote.start():
+            print("Warning: Falling back to starting python3 for every test.")
+            self.zygote = None
+
+    def _new_execution(self, expected_output_file):
+        """In stdin io_mode, stdout is compared with the expected output while it is read."""
+        output_limit = int(self.output_limit_mb * 1024 * 1024)
+        if self.config.io_mode == 'stdin':
+            return _Execution(StreamComparator(ExpectedOutput.load(expected_output_file, manifest_digest)), output_limit)
+        return _Execution(output_limit=output_limit)
+
+    def _execute(self, execution, cmd, input_file):
+        """Runs cmd to completion (or until the wall-clock timeout) and records it in execution."""
+        execution.start_time = time.time()
+        self._spawn(execution, cmd, input_file)
+
+        # The program's own run; in stdin io_mode this includes comparing its output as it arrives
+        with span("execute"):
+            deadline = time.monotonic() + self._wall_timeout()
+            self._collect_output(execution, deadline)
+            try:
+                execution.process.wait(timeout=max(deadline - time.monotonic(), 0))
+            except subprocess.TimeoutExpired:
+                # Closed its output but kept running
+                kill_tree(execution.process)
+                execution.process.wait()
+                execution.timed_out = True
+        execution.finish(self._tree_usage(execution.process))
+
+    def _spawn(self, execution, cmd, input_file):
+        # Popen for more control, especially for resource limits
+        with span("spawn"):
             if self.config.io_mode == 'stdin':
-                with open(input_file, 'r') as infile:
-                    try:
-                        # Popen for more control, especially for resource limits
-                        process = subprocess.Popen(
-                            cmd,
-                            stdin=infile,
-                            stdout=subprocess.PIPE,
-                            stderr=subprocess.PIPE,
-                            text=True,
-                            preexec_fn=self._set_memory_limit # Apply resource limit
-                        )
-                        # Communicate to get stdout/stderr and wait for process to finish
-                        stdout, stderr = process.communicate(timeout=self.config.time_limit_seconds)
-                        actual_output = stdout.strip()
-                        error_output = stderr.strip()
-
-                    except subprocess.TimeoutExpired:
-                        process.kill()
-                        stdout, stderr = process.communicate()
-                        error_output = f"Execution timed out ({self.config.time_limit_seconds}s). STDOUT: {stdout.strip()}\nSTDERR: {stderr.strip()}"
-                        return "Time Limit Exceeded", self.config.time_limit_seconds, self._get_memory_usage_kb(), error_output
-                    except Exception as e:
-                        return "Runtime Error", time.time() - start_time, self._get_memory_usage_kb(), f"General Error during execution: {e}"
-
-            elif self.config.io_mode == 'file':
-                # For file mode, program_name_for_py is the base name (e.g., 'add')
-                # We need a unique temporary output file for each run to prevent conflicts
-                temp_output_filename = f"{program_name_for_py}_{os.path.basename(input_file)}.tmp_out"
-                temp_output_file = os.path.join(self.config.exec_dir, temp_output_filename)
-
-                if language == 'python':
-                    cmd = ['python3', program_path, input_file, temp_output_file]
-                elif language in ['c', 'cpp']:
-                    cmd = [program_path, input_file, temp_output_file]
-
-                try:
-                    process = subprocess.Popen(
-                        cmd,
-                        stdout=subprocess.PIPE, # Capture stdout/stderr just in case for debugging
-                        stderr=subprocess.PIPE,
-                        text=True,
-                        preexec_fn=self._set_memory_limit
-                    )
-                    stdout, stderr = process.communicate(timeout=self.config.time_limit_seconds)
-                    error_output = stderr.strip()
-                    # After execution, read the content of the temporary output file
-                    if os.path.exists(temp_output_file):
-                        with open(temp_output_file, 'r') as f:
-                            actual_output = f.read().strip()
+                with open(input_file, 'rb') as infile:
+                    execution.process = self._popen(cmd, stdin=infile, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+            else:
+                # Capture stdout/stderr just in case for debugging
+                execution.process = self._popen(cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+
+    def _collect_output(self, execution, deadline):
+        """Streams stdout and stderr into execution until both are closed.
+
+        Replaces communicate(), which buffers everything the program writes.
+        The process is killed once the deadline passes.
+        """
+        process = execution.process
+        with selectors.DefaultSelector() as selector:
+            selector.register(process.stdout, selectors.EVENT_READ, execution.feed_stdout)
+            selector.register(process.stderr, selectors.EVENT_READ, execution.feed_stderr)
+            while selector.get_map():
+                timeout = None
+                if not execution.timed_out:
+                    timeout = deadline - time.monotonic()
+                    if timeout <= 0:
+                        # The whole group: a descendant may hold the pipes open
+                        kill_tree(process)
+                        execution.timed_out = True
+                        continue
+                for key, _ in selector.select(timeout):
+                    chunk = os.read(key.fd, CHUNK_SIZE)
+                    if chunk:
+                        key.data(chunk)
                     else:
-                        error_output += "\nProgram did not create expected output file."
-                        return "Runtime Error", time.time() - start_time, self._get_memory_usage_kb(), error_output
-
-                except subprocess.TimeoutExpired:
-                    process.kill()
-                    stdout, stderr = process.communicate()
-                    error_output = f"Execution timed out ({self.config.time_limit_seconds}s). STDOUT: {stdout.strip()}\nSTDERR: {stderr.strip()}"
-                    return "Time Limit Exceeded", self.config.time_limit_seconds, self._get_memory_usage_kb(), error_output
-                except Exception as e:
-                    return "Runtime Error", time.time() - start_time, self._get_memory_usage_kb(), f"General Error during execution: {e}"
+                        selector.unregister(key.fileobj)
+                        key.fileobj.close()
+
+    def _judge(self, execution, expected_output_file, temp_output_file):
+        """Derives the verdict tuple of run_code from a finished execution."""
+        time_taken = execution.wall_time
+        usage = execution.usage # peak RSS, user CPU, system CPU
+
+        if execution.output_limit_exceeded:
+            # Checked first: the evaluator killed it, so the return code means nothing
+            error_output = f"Output exceeded {self.output_limit_mb}MB. STDOUT: {execution.stdout.strip()}\nSTDERR: {execution.stderr.strip()}"
+            return "Output Limit Exceeded", time_taken, *usage, error_output
+
+        if execution.timed_out:
+            error_output = f"Execution timed out ({self._wall_timeout()}s). STDOUT: {execution.stdout.strip()}\nSTDERR: {execution.stderr.strip()}"
+            return "Time Limit Exceeded", self._wall_timeout(), *usage, error_output
+
+        error_output = execution.stderr.strip()
+        missing_output_file = False
+        if temp_output_file and not os.path.exists(temp_output_file):
+            # Reported below, once a CPU time limit kill has been ruled out
+            missing_output_file = True
+            error_output += "\nProgram did not create expected output file."
+
+        if self._cpu_limit_exceeded(execution.returncode, usage):
+            cpu_time = usage[1] + usage[2]
+            error_output = f"CPU time limit exceeded ({cpu_time:.4f}s used, limit {self.config.time_limit_seconds}s). STDERR: {error_output}"
+            return "Time Limit Exceeded", time_taken, *usage, error_output
+
+        if execution.returncode != 0 or missing_output_file:
+            # A non-zero return code usually indicates a runtime error
+            return "Runtime Error", time_taken, *usage, error_output
+
+        # Compare outputs
+        if self.config.io_mode == 'stdin':
+            # stdout was already fed to the comparator while it was read
+            mismatch = execution.comparator.finish()
+            if mismatch is None:
+                return "Correct", time_taken, *usage, error_output
             else:
-                return "Config Error", 0, 0, "Invalid I/O mode in config."
-
-            time_taken = time.time() - start_time
-            memory_usage_kb = self._get_memory_usage_kb()
-
-            if process.returncode != 0:
-                # A non-zero return code usually indicates a runtime error
-                return "Runtime Error", time_taken, memory_usage_kb, error_output
-
-            # Compare outputs
-            with open(expected_output_file, 'r') as expected_file:
-                expected_output = expected_file.read().strip()
-
-            if self.config.io_mode == 'stdin':
-                if actual_output == expected_output:
-                    return "Correct", time_taken, memory_usage_kb, error_output
-                else:
-                    error_output = f"Expected:\n{expected_output}\nActual:\n{actual_output}\nSTDERR:\n{error_output}"
-                    return "Wrong Answer", time_taken, memory_usage_kb, error_output
-            elif self.config.io_mode == 'file':
-                # Using filecmp.cmp for direct file comparison, ignores timestamp, etc.
-                if filecmp.cmp(temp_output_file, expected_output_file, shallow=False):
-                    return "Correct", time_taken, memory_usage_kb, error_output
-                else:
-                    error_output = f"Output file mismatch. STDERR:\n{error_output}"
-                    # Optionally, read differences for more detail
-                    try:
-                        with open(temp_output_file, 'r') as f_actual, \
-                             open(expected_output_file, 'r') as f_expected:
-                             actual_content = f_actual.read().strip()
-                             expected_content = f_expected.read().strip()
-                             error_output += f"\nExpected:\n{expected_content}\nActual:\n{actual_content}"
-                    except Exception as e:
-                        error_output += f"\nCould not read output files for detailed comparison: {e}"
-                    return "Wrong Answer", time_taken, memory_usage_kb, error_output
-
-        finally:
-            if temp_output_file and os.path.exists(temp_output_file):
-                try:
-                    os.remove(temp_output_file)
-                except OSError as e:
-                    print(f"Warning: Could not remove temporary output file {temp_output_file}: {e}")
-            if process and process.poll() is None: # If process is still running
-                process.kill()
+                error_output = f"{mismatch.describe()}\nSTDERR:\n{error_output}"
+                return "Wrong Answer", time_taken, *usage, error_output
+        else:
+            # Byte for byte, like filecmp; equal size and digest skip reading the expected file
+            mismatch = compare_files(temp_output_file, ExpectedOutput.load(expected_output_file, manifest_digest))
+            if mismatch is None:
+                return "Correct", time_taken, *usage, error_output
+            else:
+                error_output = f"Output file mismatch. STDERR:\n{error_output}"
+                error_output += f"\n{mismatch.describe()}"
+                return "Wrong Answer", time_taken, *usage, error_output
+
+    def _remove_temp_output(self, temp_output_file):
+        if temp_output_file and os.path.exists(temp_output_file):
+            try:
+                os.remove(temp_output_file)
+            except OSError as e:
+                print(f"Warning: Could not remove temporary output file {temp_output_file}: {e}")
+
+    def _popen(self, cmd, **kwargs):
+        """Starts cmd with the memory and CPU limits applied by the configured launcher."""
+        if self.zygote and cmd[0] == 'python3':
+            # Forked from the warm interpreter, which applies the limits and the process group to the child
+            return self.zygote.spawn(cmd[1:], *self._limit_values(), **kwargs)
+        # Its own session, so kill_tree() reaches everything the program starts
+        if self.launcher == 'preexec':
+            return _AccountedPopen(cmd, preexec_fn=self._set_limits, start_new_session=True, **kwargs)
+        process = _AccountedPopen(self._limit_prefix() + cmd, start_new_session=True, **kwargs)
+        process.measures_program = self.launcher != 'shim'
+        return process
+
+    def _limit_values(self):
+        """(address space bytes, CPU soft s, CPU hard s); 0 leaves a resource unlimited."""
+        memory_limit_bytes = self.config.memory_limit_mb * 1024 * 1024
+        cpu_soft = cpu_hard = 0
+        if self.limit_mode == 'cpu':
+            cpu_soft = math.ceil(self.config.time_limit_seconds)
+            cpu_hard = cpu_soft + 1
+        return memory_limit_bytes, cpu_soft, cpu_hard
+
+    def _limit_prefix(self):
+        """Command prefix that starts the program with the limits applied."""
+        memory_limit_bytes, cpu_soft, cpu_hard = self._limit_values()
+        if self.launcher == 'shim':
+            return [self.launcher_path, str(memory_limit_bytes), str(cpu_soft), str(cpu_hard)]
+        # prlimit from util-linux
+        prefix = ['prlimit', f'--as={memory_limit_bytes}']
+        if cpu_soft:
+            prefix.append(f'--cpu={cpu_soft}:{cpu_hard}')
+        return prefix + ['--']
+
+    def _wall_timeout(self):
+        """Wall-clock seconds a test may run before it is killed."""
+        if self.limit_mode == 'cpu':
+            return self.config.time_limit_seconds * self.CPU_MODE_WALL_FACTOR
+        return self.config.time_limit_seconds
+
+    def _cpu_limit_exceeded(self, returncode, usage):
+        """In cpu limit_mode, whether the run used more CPU time than allowed."""
+        if self.limit_mode != 'cpu':
+            return False
+        _, cpu_user, cpu_sys = usage
+        # SIGXCPU is sent at the RLIMIT_CPU soft limit, SIGKILL one second later
+        return cpu_user + cpu_sys > self.config.time_limit_seconds or returncode == -signal.SIGXCPU
+
+    def _set_limits(self):
+        """preexec launcher: runs in the forked child before exec and applies the limits."""
+        self._set_memory_limit()
+        if self.limit_mode == 'cpu':
+            self._set_cpu_limit()
+
+    def _set_cpu_limit(self):
+        """Set RLIMIT_CPU, so the kernel stops the program once it used its CPU time."""
+        try:
+            soft_limit = math.ceil(self.config.time_limit_seconds)
+            resource.setrlimit(resource.RLIMIT_CPU, (soft_limit, soft_limit + 1))
+        except Exception as e:
+            print(f"Warning: Could not set CPU time limit using resource module: {e}")
 
     def _set_memory_limit(self):
         """Set rlimit for virtual memory. This is a soft limit and Linux specific."""
@@ -203,24 +462,24 @@ if __name__ == '__main__':
     with open('test_runner_testcases/input_sum2.txt', 'w') as f: f.write('5 7')
     with open('test_runner_testcases/output_sum2.txt', 'w') as f: f.write('13') # Deliberate wrong answer
 
-    result, time_taken, memory_used, error_output = runner_stdin.run_code(
+    result, time_taken, memory_used, cpu_user, cpu_sys, error_output = runner_stdin.run_code(
         py_sum_path,
         'test_runner_testcases/input_sum1.txt',
         'test_runner_testcases/output_sum1.txt',
         'python',
         'py_sum'
     )
-    print(f"Test 1 (Correct): {result}, Time: {time_taken:.4f}s, Mem: {memory_used}KB, Err: {error_output}")
+    print(f"Test 1 (Correct): {result}, Time: {time_taken:.4f}s, Mem: {memory_used}KB, CPU: {cpu_user:.4f}+{cpu_sys:.4f}s, Err: {error_output}")
     assert result == "Correct"
 
-    result, time_taken, memory_used, error_output = runner_stdin.run_code(
+    result, time_taken, memory_used, cpu_user, cpu_sys, error_output = runner_stdin.run_code(
         py_sum_path,
         'test_runner_testcases/input_sum2.txt',
         'test_runner_testcases/output_sum2.txt',
         'python',
         'py_sum'
     )
-    print(f"Test 2 (Wrong): {result}, Time: {time_taken:.4f}s, Mem: {memory_used}KB, Err: {error_output}")
+    print(f"Test 2 (Wrong): {result}, Time: {time_taken:.4f}s, Mem: {memory_used}KB, CPU: {cpu_user:.4f}+{cpu_sys:.4f}s, Err: {error_output}")
     assert result == "Wrong Answer"
 
     # Test Time Limit Exceeded
@@ -228,14 +487,14 @@ if __name__ == '__main__':
     with open(py_loop_path, 'w') as f:
         f.write("import time\nwhile True:\n  time.sleep(0.1)\n") # Loop forever
 
-    result, time_taken, memory_used, error_output = runner_stdin.run_code(
+    result, time_taken, memory_used, cpu_user, cpu_sys, error_output = runner_stdin.run_code(
         py_loop_path,
         'test_runner_testcases/input_sum1.txt',
         'test_runner_testcases/output_sum1.txt',
         'python',
         'py_loop'
     )
-    print(f"Test 3 (TLE): {result}, Time: {time_taken:.4f}s, Mem: {memory_used}KB, Err: {error_output}")
+    print(f"Test 3 (TLE): {result}, Time: {time_taken:.4f}s, Mem: {memory_used}KB, CPU: {cpu_user:.4f}+{cpu_sys:.4f}s, Err: {error_output}")
     assert result == "Time Limit Exceeded"
 
 
@@ -267,24 +526,24 @@ if __name__ == '__main__':
     compiled_c_path = compiler_obj.compile_code(c_sum_source_path, 'c_sum', 'c')
     if compiled_c_path:
         print(f"C code compiled to {compiled_c_path}")
-        result, time_taken, memory_used, error_output = runner_file.run_code(
+        result, time_taken, memory_used, cpu_user, cpu_sys, error_output = runner_file.run_code(
             compiled_c_path,
             'test_runner_testcases/input_sum1.txt',
             'test_runner_testcases/output_sum1.txt',
             'c',
             'c_sum' # program_name for temp output file
         )
-        print(f"Test 4 (C File Correct): {result}, Time: {time_taken:.4f}s, Mem: {memory_used}KB, Err: {error_output}")
+        print(f"Test 4 (C File Correct): {result}, Time: {time_taken:.4f}s, Mem: {memory_used}KB, CPU: {cpu_user:.4f}+{cpu_sys:.4f}s, Err: {error_output}")
         assert result == "Correct"
 
-        result, time_taken, memory_used, error_output = runner_file.run_code(
+        result, time_taken, memory_used, cpu_user, cpu_sys, error_output = runner_file.run_code(
             compiled_c_path,
             'test_runner_testcases/input_sum2.txt',
             'test_runner_testcases/output_sum2.txt',
             'c',
             'c_sum' # program_name for temp output file
         )
-        print(f"Test 5 (C File Wrong): {result}, Time: {time_taken:.4f}s, Mem: {memory_used}KB, Err: {error_output}")
+        print(f"Test 5 (C File Wrong): {result}, Time: {time_taken:.4f}s, Mem: {memory_used}KB, CPU: {cpu_user:.4f}+{cpu_sys:.4f}s, Err: {error_output}")
         assert result == "Wrong Answer"
     else:
         print("Skipping C file mode tests due to compilation failure.")
@@ -0,0 +1,88 @@
+# evaluator/scratch.py
+import atexit
+import os
+import shutil
+import tempfile
+
+# Tried in order by scratch_dir "auto": memory-backed file systems
+AUTO_SCRATCH_ROOTS = ['/dev/shm']
+
+def resolve_scratch_root(scratch_dir):
+    """The directory the run's scratch workspace goes into, or None to keep using exec_dir."""
+    if scratch_dir is None:
+        return None
+    if scratch_dir != 'auto':
+        os.makedirs(scratch_dir, exist_ok=True)
+        return scratch_dir
+    for root in AUTO_SCRATCH_ROOTS:
+        if os.path.isdir(root) and os.access(root, os.W_OK | os.X_OK):
+            return root
+    return None
+
+def prepare_scratch(config, test_cases):
+    """Creates the run's scratch workspace for file io_mode and stages the inputs in it.
+
+    Sets config.scratch_path to a fresh directory below scratch_dir (None when
+    there is none: temporary output files then stay in exec_dir) and
+    config.staged_inputs to input file -> the path programs are given instead.
+    Inputs are hardlinked when scratch_dir shares their file system. Otherwise
+    (always for a tmpfs such as /dev/shm) they are copied, once per run, if
+    they fit in half the free space.
+    Every worker writes its temporary output files into its own subdirectory
+    (see worker_scratch()). The workspace is removed once, by cleanup_scratch()
+    or at exit.
+    """
+    config.scratch_path = None
+    config.staged_inputs = {}
+    if config.io_mode != 'file' or config.scratch_dir is None:
+        return
+    try:
+        root = resolve_scratch_root(config.scratch_dir)
+        if root is None:
+            print("Warning: No memory-backed scratch directory found, temporary output files go to exec_dir.")
+            return
+        config.scratch_path = tempfile.mkdtemp(prefix="dsa-eval-", dir=root)
+    except OSError as e:
+        print(f"Warning: Could not create a scratch workspace in '{config.scratch_dir}': {e}")
+        return
+    atexit.register(shutil.rmtree, config.scratch_path, ignore_errors=True)
+
+    inputs_dir = os.path.join(config.scratch_path, "inputs")
+    os.makedirs(inputs_dir)
+    # Hardlinks can't cross file systems, so whether to link is decided once, not per file
+    link = os.stat(config.testcase_dir).st_dev == os.stat(inputs_dir).st_dev
+    if not link and sum(os.path.getsize(input_file) for input_file, _ in test_cases) \
+            > shutil.disk_usage(inputs_dir).free // 2:
+        print(f"Scratch workspace: {config.scratch_path} (inputs are read from testcase_dir: "
+              f"they don't fit comfortably)")
+        return
+    for input_file, _ in test_cases:
+        staged = os.path.join(inputs_dir, os.path.basename(input_file))
+        try:
+            if link:
+                os.link(input_file, staged)
+            else:
+                shutil.copyfile(input_file, staged)
+        except OSError as e:
+            print(f"Warning: Could not stage {input_file} in the scratch workspace: {e}")
+            continue
+        config.staged_inputs[input_file] = staged
+    unstaged = len(test_cases) - len(config.staged_inputs)
+    print(f"Scratch workspace: {config.scratch_path} ({len(config.staged_inputs)} inputs "
+          f"{'linked' if link else 'copied for this run'}{f', {unstaged} read in place' if unstaged else ''})")
+
+def worker_scratch(config, name):
+    """A private subdirectory of the scratch workspace for one worker, or None without a workspace."""
+    scratch_path = getattr(config, 'scratch_path', None)
+    if not scratch_path:
+        return None
+    path = os.path.join(scratch_path, name)
+    os.makedirs(path, exist_ok=True)
+    return path
+
+def cleanup_scratch(config):
+    """Wipes the scratch workspace with everything in it."""
+    scratch_path = getattr(config, 'scratch_path', None)
+    if scratch_path and os.path.exists(scratch_path):
+        shutil.rmtree(scratch_path, ignore_errors=True)
+        print(f"  Removed scratch workspace: {scratch_path}")
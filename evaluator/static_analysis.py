@@ -1,43 +1,81 @@
-import subprocess
+# evaluator/static_analysis.py
+import os
+import re
+
+# Headers a submission may not include. An entry also bans the headers below
+# it, e.g. "bits" bans <bits/stdc++.h>.
+DEFAULT_BANNED_HEADERS = [
+    "vector", "string", "map", "set", "list", "deque", "queue", "stack",
+    "unordered_map", "unordered_set", "algorithm", "iterator",
+    "bitset", "tuple", "utility", "numeric",
+    "functional", "memory", "optional", "variant", "any", "execution",
+    "thread", "mutex", "future", "condition_variable", "bits",
+]
+
+# One pass over the source. Comments and string/char literals are matched as
+# whole tokens and skipped, so an #include inside them never counts.
+_TOKENS = re.compile(r'''
+    (?P<include>^[ \t]*\#[ \t]*include[ \t]*(?:<(?P<angled>[^>\n]*)>|"(?P<quoted>[^"\n]*)"))
+  | //[^\n]*
+  | /\*.*?(?:\*/|\Z)
+  | R"(?P<delim>[^()\\\s]{0,16})\(.*?\)(?P=delim)"
+  | "(?:\\.|[^"\\\n])*"
+  | '(?:\\.|[^'\\\n])*'
+''', re.MULTILINE | re.DOTALL | re.VERBOSE)
+
+SOURCE_EXTENSIONS = ('.c', '.cpp', '.cc', '.cxx', '.h', '.hpp')
 
 class StaticAnalysis:
-    def __init__(self):
-        return
-    
-    def uses_stl_headers(self, path: str) -> bool:
-        """
-        Scans C++ source files at the given path (file or folder)
-        and returns True if STL headers are used, False otherwise.
-        """
-        include_cmd = [
-            "grep", "-RE", r'#include\s*<[^>]+>', path
-        ]
-        stl_headers = (
-            "vector|string|map|set|list|deque|queue|stack|"
-            "unordered_map|unordered_set|algorithm|iterator|"
-            "bitset|tuple|utility|numeric|"
-            "functional|memory|optional|variant|any|execution|"
-            "thread|mutex|future|condition_variable|bits"
-        )
-        filter_cmd = ["grep", "-E", stl_headers]
-
-        try:
-            # Run the first grep command
-            include_proc = subprocess.Popen(
-                include_cmd, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL
-            )
-            # Pipe output to the second grep
-            filter_proc = subprocess.Popen(
-                filter_cmd,
-                stdin=include_proc.stdout,
-                stdout=subprocess.PIPE,
-                stderr=subprocess.DEVNULL
-            )
-            include_proc.stdout.close()  # Allow include_proc to receive SIGPIPE if filter_proc exits
-            output, _ = filter_proc.communicate()
-
-            return output.strip()
-        except FileNotFoundError:
-            raise RuntimeError("grep not found. Make sure it's installed and available in PATH.")
-        except Exception as e:
-            raise RuntimeError(f"Error while checking STL headers: {e}")
\ No newline at end of file
+    def __init__(self, banned_headers=None):
+        banned = DEFAULT_BANNED_HEADERS if banned_headers is None else banned_headers
+        self.banned_headers = set(banned)
+        self._banned_dirs = tuple(header.rstrip('/') + '/' for header in banned)
+
+    def includes(self, source):
+        """Headers #included by C/C++ source text, ignoring comments and string literals."""
+        headers = []
+        for token in _TOKENS.finditer(source):
+            if token.group('include'):
+                headers.append((token.group('angled') or token.group('quoted') or "").strip())
+        return headers
+
+    def banned_includes(self, path):
+        """Banned headers included by a C/C++ file, or by the files of a folder, in order of appearance."""
+        found = []
+        for file_path in self._source_files(path):
+            with open(file_path, 'r', errors='replace') as f:
+                for header in self.includes(f.read()):
+                    if self.is_banned(header) and header not in found:
+                        found.append(header)
+        return found
+
+    def is_banned(self, header):
+        return header in self.banned_headers or header.startswith(self._banned_dirs)
+
+    @staticmethod
+    def _source_files(path):
+        if not os.path.isdir(path):
+            return [path]
+        return sorted(os.path.join(root, name)
+                      for root, _, names in os.walk(path)
+                      for name in names if name.lower().endswith(SOURCE_EXTENSIONS))
+
+if __name__ == '__main__':
+    analysis = StaticAnalysis()
+    source = (
+        '#include <stdio.h>\n'
+        '#include<string.h>\n'
+        '  #  include <vector>\n'
+        '#include "map"\n'
+        '// #include <set>\n'
+        '/* #include <queue>\n'
+        '   #include <stack> */\n'
+        'const char *s = "#include <list>";\n'
+        'const char *r = R"x(\n#include <deque>\n)x";\n'
+        'char q = \'"\';\n'
+        '#include <bits/stdc++.h>\n'
+    )
+    assert analysis.includes(source) == ['stdio.h', 'string.h', 'vector', 'map', 'bits/stdc++.h'], analysis.includes(source)
+    assert [h for h in analysis.includes(source) if analysis.is_banned(h)] == ['vector', 'map', 'bits/stdc++.h']
+    assert not StaticAnalysis(['vector']).is_banned('vectorx')
+    print("Header scanning test successful.")
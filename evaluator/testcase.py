@@ -1,23 +1,180 @@
 # evaluator/testcase.py
+import json
 import os
 import re
 
-class TestCaseFinder:
+from evaluator.compare import file_digest
+
+# Result column of the score rows that follow a submission's test rows when there
+# are groups: one per group, then the "Total" row (see SubmissionEvaluator._score_rows)
+SCORE_RESULTS = ("Group Passed", "Group Failed", "Group Skipped", "Score")
+
+class TestGroup:
+    """A weighted subtask. It scores its weight only if every one of its test cases
+    is Correct, may override the time and memory limits, and is skipped unless
+    the groups it depends on passed."""
+
+    def __init__(self, name, weight, cases, time_limit_seconds=None, memory_limit_mb=None, depends_on=()):
+        self.name = name
+        self.weight = weight
+        self.cases = cases # Input file names, e.g. 'input3.txt'
+        self.time_limit_seconds = time_limit_seconds
+        self.memory_limit_mb = memory_limit_mb
+        self.depends_on = list(depends_on)
+
+class TestCaseManifest:
+    """Index of a testcase directory: the input/output pairs with their sizes, mtimes and sha256.
+
+    Kept in <testcase_dir>/manifest.json. refresh() rescans the directory only
+    when its file list changed or a listed file's size or mtime did, and then
+    rehashes just the changed files. Every process loads the manifest once
+    (for_dir) and takes the digests of unchanged files from it.
+
+    Keys the evaluator doesn't maintain are kept, so subtask groups can be
+    added by hand (see groups()) and calibrate.py can store per-case time
+    limits (see limits()).
+    """
+    FILE_NAME = 'manifest.json'
+    VERSION = 1
+    _loaded = {} # abspath of testcase_dir -> manifest, per process
+
     def __init__(self, testcase_dir):
         self.testcase_dir = testcase_dir
+        self.path = os.path.join(testcase_dir, self.FILE_NAME)
+        self.data = {}
+        self._files = None # name -> file entry
 
-    def find_test_cases(self):
-        test_cases = []
-        input_files = {}
-        output_files = {}
+    @classmethod
+    def for_dir(cls, testcase_dir):
+        key = os.path.abspath(testcase_dir)
+        if key not in cls._loaded:
+            manifest = cls(testcase_dir)
+            manifest.read()
+            cls._loaded[key] = manifest
+        return cls._loaded[key]
 
-        if not os.path.isdir(self.testcase_dir):
-            print(f"Error: Testcase directory '{self.testcase_dir}' not found.")
-            return []
+    def read(self):
+        try:
+            with open(self.path, 'r') as f:
+                self.data = json.load(f)
+        except (OSError, ValueError):
+            self.data = {}
+        if self.data.get('version') != self.VERSION:
+            self.data.pop('cases', None)
+        self._files = None
+
+    def write(self):
+        tmp_path = self.path + ".tmp"
+        try:
+            with open(tmp_path, 'w') as f:
+                json.dump(self.data, f, indent=2)
+            os.replace(tmp_path, self.path)
+        except OSError as e:
+            print(f"Warning: Could not write testcase manifest {self.path}: {e}")
+
+    @property
+    def cases(self):
+        return self.data.get('cases', [])
+
+    def test_cases(self):
+        """(input path, output path) pairs in index order."""
+        return [(os.path.join(self.testcase_dir, case['input']['name']),
+                 os.path.join(self.testcase_dir, case['output']['name'])) for case in self.cases]
+
+    def groups(self):
+        """The manifest's "groups" as TestGroups, in the order they run. Raises ValueError if they're invalid.
+
+            "groups": [
+              {"name": "small", "weight": 40, "cases": [1, 2]},
+              {"name": "large", "weight": 60, "cases": [3, 4], "time_limit_seconds": 5,
+               "memory_limit_mb": 256, "depends_on": ["small"]}
+            ]
+
+        "cases" are test case indices (N of inputN.txt). A group may only depend
+        on groups listed before it.
+        """
+        input_names = {case['index']: case['input']['name'] for case in self.cases}
+        groups = []
+        for spec in self.data.get('groups', []):
+            name = spec.get('name') if isinstance(spec, dict) else None
+            if not isinstance(name, str) or not name:
+                raise ValueError(f"Every group in {self.path} needs a \"name\".")
+            if name in (group.name for group in groups):
+                raise ValueError(f"Group '{name}' is defined twice in {self.path}.")
+            weight = spec.get('weight', 0)
+            if not isinstance(weight, (int, float)) or weight < 0:
+                raise ValueError(f"Group '{name}': weight '{weight}' must be a non-negative number.")
+            unknown = [index for index in spec.get('cases', []) if index not in input_names]
+            if unknown:
+                raise ValueError(f"Group '{name}': no test cases with index {unknown} in {self.testcase_dir}.")
+            for key in ('time_limit_seconds', 'memory_limit_mb'):
+                if spec.get(key) is not None and (not isinstance(spec[key], (int, float)) or spec[key] <= 0):
+                    raise ValueError(f"Group '{name}': {key} '{spec[key]}' must be a positive number.")
+            for dependency in spec.get('depends_on', []):
+                if dependency not in (group.name for group in groups):
+                    raise ValueError(f"Group '{name}' depends on '{dependency}', which must be defined before it.")
+            groups.append(TestGroup(name, weight, [input_names[index] for index in spec.get('cases', [])],
+                                    spec.get('time_limit_seconds'), spec.get('memory_limit_mb'),
+                                    spec.get('depends_on', [])))
+        return groups
+
+    def limits(self, config, calibrated=True):
+        """Test case (input file) name -> (time_limit_seconds, memory_limit_mb) it runs under.
+
+        A calibrated time limit ("time_limits", written by calibrate.py) wins over
+        the group's, which wins over the config's. Calibrated limits only count
+        while the test case's input and output are unchanged.
+        """
+        limits = {case['input']['name']: (config.time_limit_seconds, config.memory_limit_mb) for case in self.cases}
+        for group in self.groups():
+            for name in group.cases:
+                limits[name] = (group.time_limit_seconds or config.time_limit_seconds,
+                                group.memory_limit_mb or config.memory_limit_mb)
+        if calibrated:
+            for case in self.cases:
+                seconds = self.calibrated_time_limit(case)
+                if seconds is not None:
+                    name = case['input']['name']
+                    limits[name] = (seconds, limits[name][1])
+        return limits
 
-        for filename in os.listdir(self.testcase_dir):
-            path = os.path.join(self.testcase_dir, filename)
-            if not os.path.isfile(path):
+    def calibrated_time_limit(self, case):
+        """The calibrated time limit of a manifest case, None if it has none or it is out of date."""
+        entry = self.data.get('time_limits', {}).get(case['input']['name'])
+        if not entry or entry.get('input_sha256') != case['input']['sha256'] \
+                or entry.get('output_sha256') != case['output']['sha256']:
+            return None
+        return entry['seconds']
+
+    def stale_time_limits(self):
+        """Names of the test cases whose calibrated time limit no longer matches their files."""
+        return [case['input']['name'] for case in self.cases
+                if case['input']['name'] in self.data.get('time_limits', {}) and self.calibrated_time_limit(case) is None]
+
+    def file_entry(self, name):
+        if self._files is None:
+            self._files = {entry['name']: entry for case in self.cases for entry in (case['input'], case['output'])}
+        return self._files.get(name)
+
+    def is_current(self, entry, st=None):
+        if st is None:
+            try:
+                st = os.stat(os.path.join(self.testcase_dir, entry['name']))
+            except OSError:
+                return False
+        return st.st_size == entry['size'] and st.st_mtime_ns == entry['mtime_ns']
+
+    def refresh(self):
+        """Brings the manifest in line with the directory. Returns True if it had to rescan."""
+        names = sorted(name for name in os.listdir(self.testcase_dir) if name != self.FILE_NAME)
+        if 'cases' in self.data and self.data.get('files') == names and all(
+                self.is_current(case[kind]) for case in self.cases for kind in ('input', 'output')):
+            return False
+
+        input_files = {}
+        output_files = {}
+        for filename in names:
+            if not os.path.isfile(os.path.join(self.testcase_dir, filename)):
                 continue
 
             # Regex to match inputN.txt or outputN.txt
@@ -25,17 +182,65 @@ class TestCaseFinder:
             match_output = re.match(r'output(\d+)\.txt', filename)
 
             if match_input:
-                index = int(match_input.group(1))
-                input_files[index] = path
+                input_files[int(match_input.group(1))] = filename
             elif match_output:
-                index = int(match_output.group(1))
-                output_files[index] = path
+                output_files[int(match_output.group(1))] = filename
 
         # Pair them up by index
-        sorted_indices = sorted(set(input_files.keys()) & set(output_files.keys()))
+        self.data['cases'] = [{'index': index,
+                               'input': self._describe(input_files[index]),
+                               'output': self._describe(output_files[index])}
+                              for index in sorted(set(input_files) & set(output_files))]
+        self.data['version'] = self.VERSION
+        self.data['files'] = names
+        self._files = None
+        self.write()
+        return True
+
+    def _describe(self, name):
+        """File entry for name, reusing the old digest if the file didn't change."""
+        path = os.path.join(self.testcase_dir, name)
+        st = os.stat(path)
+        entry = self.file_entry(name)
+        if entry and self.is_current(entry, st):
+            return entry
+        return {'name': name, 'size': st.st_size, 'mtime_ns': st.st_mtime_ns, 'sha256': file_digest(path)}
+
+def manifest_digest(path, st):
+    """For ExpectedOutput.load(): the sha256 of path from its directory's manifest, if still current."""
+    manifest = TestCaseManifest.for_dir(os.path.dirname(path))
+    entry = manifest.file_entry(os.path.basename(path))
+    if entry and manifest.is_current(entry, st):
+        return entry['sha256']
+    return None
+
+class TestCaseFinder:
+    def __init__(self, testcase_dir):
+        self.testcase_dir = testcase_dir
+        self.manifest = None
 
-        for index in sorted_indices:
-            test_cases.append((input_files[index], output_files[index]))
+    def find_test_cases(self):
+        if not os.path.isdir(self.testcase_dir):
+            print(f"Error: Testcase directory '{self.testcase_dir}' not found.")
+            return []
+
+        self.manifest = TestCaseManifest.for_dir(self.testcase_dir)
+        if self.manifest.refresh():
+            print(f"Indexed test cases into {self.manifest.path}")
+        test_cases = self.manifest.test_cases()
+
+        try:
+            groups = self.manifest.groups()
+        except ValueError as e:
+            print(f"Error: Invalid test groups: {e}")
+            return []
+        grouped = {name for group in groups for name in group.cases}
+        ungrouped = [os.path.basename(input_file) for input_file, _ in test_cases if os.path.basename(input_file) not in grouped]
+        if groups and ungrouped:
+            print(f"Warning: Test cases in no group run last and don't score: {', '.join(ungrouped)}")
+        stale = self.manifest.stale_time_limits()
+        if stale:
+            print(f"Warning: Calibrated time limits of changed test cases are ignored, rerun calibrate.py: {', '.join(stale)}")
 
         if not test_cases:
             print(f"Warning: No matching input/output test case pairs found in '{self.testcase_dir}'.")
@@ -67,6 +272,33 @@ if __name__ == '__main__':
     assert os.path.basename(found_cases[1][0]) == 'input2.txt'
     print("Test case finding successful.")
 
+    # The manifest is reused until a file changes
+    manifest = TestCaseManifest(test_dir)
+    manifest.read()
+    assert manifest.cases and not manifest.refresh()
+    with open(os.path.join(test_dir, 'output2.txt'), 'w') as f: f.write('12')
+    assert manifest.refresh()
+    assert manifest.file_entry('output2.txt')['size'] == 2
+    print("Test case manifest successful.")
+
+    # Hand-written groups survive a rescan
+    manifest.data['groups'] = [{'name': 'small', 'weight': 40, 'cases': [1]},
+                               {'name': 'large', 'weight': 60, 'cases': [2], 'time_limit_seconds': 3, 'depends_on': ['small']}]
+    manifest.write()
+    with open(os.path.join(test_dir, 'output1.txt'), 'w') as f: f.write('4')
+    manifest.read()
+    assert manifest.refresh()
+    groups = manifest.groups()
+    assert [g.name for g in groups] == ['small', 'large'] and groups[1].cases == ['input2.txt']
+    assert groups[1].time_limit_seconds == 3 and groups[1].depends_on == ['small']
+    manifest.data['groups'][0]['depends_on'] = ['large']
+    try:
+        manifest.groups()
+        assert False, "forward dependency accepted"
+    except ValueError:
+        pass
+    print("Test groups successful.")
+
     # Clean up
     for f in os.listdir(test_dir):
         os.remove(os.path.join(test_dir, f))
@@ -0,0 +1,171 @@
+# evaluator/tracing.py
+import asyncio
+import itertools
+import json
+import os
+import threading
+import time
+import weakref
+
+class _NullSpan:
+    """What span() hands out while tracing is off: entering and leaving it does nothing."""
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return False
+
+    def set(self, **args):
+        pass
+
+_NULL_SPAN = _NullSpan()
+
+class _Span:
+    __slots__ = ('tracer', 'name', 'args', 'start')
+
+    def __init__(self, tracer, name, args):
+        self.tracer = tracer
+        self.name = name
+        self.args = args
+
+    def __enter__(self):
+        self.start = time.monotonic_ns()
+        return self
+
+    def __exit__(self, exc_type, exc, traceback):
+        end = time.monotonic_ns()
+        if exc_type is not None:
+            self.args['error'] = exc_type.__name__
+        self.tracer.record(self.name, self.start, end, self.args)
+        return False
+
+    def set(self, **args):
+        """Adds arguments known only once the span is running, e.g. the verdict."""
+        self.args.update(args)
+
+class Tracer:
+    """Collects timed spans of the evaluation phases in this process.
+
+    Off by default, and then span() returns a shared no-op object, so the
+    instrumented code pays one attribute check per phase. Timestamps come from
+    the system-wide monotonic clock, so spans recorded by pool workers (handed
+    back with drain()/collect()) line up with the main process' spans.
+    write() produces Chrome trace event JSON, which chrome://tracing and
+    https://ui.perfetto.dev open; summary() aggregates the spans per phase.
+    """
+
+    def __init__(self):
+        self.enabled = False
+        self.events = [] # Chrome trace events; list.append is atomic, so threads share it
+        self._named = set() # (pid, tid) whose name has been recorded
+        # asyncio task -> its own track, so concurrent test runs don't overlap on one row
+        self._tasks = weakref.WeakKeyDictionary()
+        self._task_tracks = itertools.count(1)
+
+    def enable(self, process_name):
+        self.enabled = True
+        self.events.append({'name': 'process_name', 'ph': 'M', 'pid': os.getpid(), 'tid': 0,
+                            'args': {'name': f"{process_name} ({os.getpid()})"}})
+
+    def span(self, name, **args):
+        """Context manager timing one phase; args end up in the trace event."""
+        if not self.enabled:
+            return _NULL_SPAN
+        return _Span(self, name, args)
+
+    def record(self, name, start_ns, end_ns, args):
+        pid, tid = os.getpid(), self._track()
+        if (pid, tid) not in self._named:
+            self._named.add((pid, tid))
+            self.events.append({'name': 'thread_name', 'ph': 'M', 'pid': pid, 'tid': tid,
+                                'args': {'name': self._track_name(tid)}})
+        self.events.append({'name': name, 'ph': 'X', 'pid': pid, 'tid': tid,
+                            'ts': start_ns / 1000, 'dur': (end_ns - start_ns) / 1000, 'args': args})
+
+    def _track(self):
+        try:
+            task = asyncio.current_task()
+        except RuntimeError: # No event loop running in this thread
+            task = None
+        if task is None:
+            return threading.get_native_id()
+        if task not in self._tasks:
+            self._tasks[task] = -next(self._task_tracks) # Negative, so never a real thread id
+        return self._tasks[task]
+
+    @staticmethod
+    def _track_name(tid):
+        if tid < 0:
+            return f"async task {-tid}"
+        return threading.current_thread().name
+
+    def drain(self):
+        """Takes the events recorded so far, e.g. to send them from a pool worker to the main process."""
+        events, self.events = self.events, []
+        return events
+
+    def collect(self, events):
+        self.events.extend(events)
+
+    def summary(self):
+        """[(phase, count, total s, mean s, max s)], largest total first. Nested spans are counted
+        in their own phase and again in the enclosing one, so totals don't add up to the run time."""
+        phases = {}
+        for event in self.events:
+            if event['ph'] != 'X':
+                continue
+            count, total, longest = phases.get(event['name'], (0, 0.0, 0.0))
+            seconds = event['dur'] / 1e6
+            phases[event['name']] = (count + 1, total + seconds, max(longest, seconds))
+        rows = [(name, count, total, total / count, longest) for name, (count, total, longest) in phases.items()]
+        return sorted(rows, key=lambda row: row[2], reverse=True)
+
+    def format_summary(self):
+        lines = [f"{'Phase':<22}{'Count':>8}{'Total (s)':>12}{'Mean (ms)':>12}{'Max (ms)':>12}"]
+        for name, count, total, mean, longest in self.summary():
+            lines.append(f"{name:<22}{count:>8}{total:>12.3f}{mean * 1000:>12.3f}{longest * 1000:>12.3f}")
+        return "\n".join(lines)
+
+    def write(self, path):
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, 'w') as f:
+            json.dump({'traceEvents': self.events, 'displayTimeUnit': 'ms'}, f)
+
+# The tracer of this process. Enabled by main.py (and in pool workers) when 'trace_file' is set.
+tracer = Tracer()
+span = tracer.span
+
+if __name__ == '__main__':
+    assert span("off") is _NULL_SPAN and not tracer.events
+    tracer.enable("self-test")
+    with span("outer", case="input1.txt"):
+        with span("inner") as inner:
+            inner.set(result="Correct")
+    try:
+        with span("failing"):
+            raise KeyError("x")
+    except KeyError:
+        pass
+    names = [event['name'] for event in tracer.events if event['ph'] == 'X']
+    assert names == ['inner', 'outer', 'failing'], names
+    spans = {event['name']: event for event in tracer.events if event['ph'] == 'X'}
+    assert spans['inner']['args'] == {'result': 'Correct'} and spans['failing']['args'] == {'error': 'KeyError'}
+    assert spans['outer']['ts'] <= spans['inner']['ts'] and spans['outer']['dur'] >= spans['inner']['dur']
+
+    async def two_tasks():
+        async def test(name):
+            with span(name):
+                await asyncio.sleep(0.01)
+        await asyncio.gather(test("a"), test("b"))
+    asyncio.run(two_tasks())
+    tracks = {event['tid'] for event in tracer.events if event['name'] in ('a', 'b')}
+    assert len(tracks) == 2, tracks # Concurrent tasks get their own rows
+
+    other = Tracer()
+    other.collect(tracer.drain())
+    assert not tracer.events and {row[0] for row in other.summary()} == {'outer', 'inner', 'failing', 'a', 'b'}
+    print(other.format_summary())
+    print("Tracing test successful.")
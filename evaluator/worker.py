@@ -0,0 +1,579 @@
+# evaluator/worker.py
+import asyncio
+import collections
+import copy
+import multiprocessing
+import os
+import queue
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, ThreadPoolExecutor, wait
+
+from evaluator.async_runner import AsyncRunner
+from evaluator.compare import file_digest
+from evaluator.compiler import Compiler
+from evaluator.results_store import VerdictCache
+from evaluator.runner import Runner
+from evaluator.scratch import worker_scratch
+from evaluator.static_analysis import StaticAnalysis
+from evaluator.testcase import TestCaseManifest
+from evaluator.tracing import span, tracer
+
+# Result of the test cases that weren't run (fail_fast, a failed group or a failed prerequisite group)
+SKIPPED = "Skipped"
+
+class SubmissionResult:
+    """Everything evaluating one submission hands back to the main process."""
+
+    def __init__(self, source_file):
+        self.source_file = source_file
+        self.program_name = None
+        self.language = None
+        self.executable_path = None # Set once the submission is ready to run
+        self.rows = [] # Logger.log_result arguments, in the order the test cases ran
+        self.cache_hit = None # True/False when the compile cache was consulted
+        self.source_sha256 = None # Set by incremental runs
+        self.known_verdicts = {} # Test case name -> verdict of an earlier run (incremental runs)
+        self.reused = 0 # Rows taken from known_verdicts instead of running the test
+        self.score = None # Sum of the weights of the passed test groups, when there are groups
+        self.trace_events = [] # Spans recorded for it in a pool worker, merged by the main process
+        self.compile_seconds = None # Wall-clock time of compile_code, when it was called
+        self.busy_seconds = 0.0 # Time a worker (async engine: test slots) spent on it, for the metrics
+
+class SubmissionEvaluator:
+    """Evaluates one submission at a time: static analysis, compile, then every test case."""
+
+    def __init__(self, config, test_cases, findings=None):
+        self.config = config
+        self.test_cases = test_cases
+        self.findings = findings or {} # scan_sources() result, source file -> banned headers
+        self.compiler = Compiler(config)
+        if config.engine == 'async':
+            self.runner = AsyncRunner(config) # Create inside the event loop's thread
+        else:
+            self.runner = Runner(config)
+        self.analysier = StaticAnalysis(config.banned_headers)
+        self.verdicts = VerdictCache(config.results_db, config, test_cases) if config.incremental else None
+        manifest = TestCaseManifest.for_dir(config.testcase_dir)
+        self.groups = manifest.groups()
+        self.limits = manifest.limits(config) # Test case name -> (time limit, memory limit)
+        self.plan = self._plan()
+        self._limit_runners = {} # (time limit, memory limit) -> runner enforcing them
+        self._numbers = {os.path.basename(input_file): i + 1 for i, (input_file, _) in enumerate(test_cases)}
+
+    def evaluate(self, source_file):
+        """Returns a SubmissionResult whose rows hold the Logger.log_result arguments.
+
+        Nothing is logged here, so the caller decides when (and in which order)
+        the rows reach the log.
+        """
+        started = time.perf_counter()
+        submission = self.run_tests(self.prepare(source_file))
+        submission.busy_seconds = time.perf_counter() - started
+        return submission
+
+    def prepare(self, source_file):
+        """Static analysis and compilation. Returns a SubmissionResult that is
+        ready for run_tests(), or that already carries its failure row."""
+        config = self.config
+        submission = SubmissionResult(source_file)
+        rows = submission.rows
+        full_source_path = os.path.join(config.source_dir, source_file)
+        program_name = os.path.splitext(source_file)[0] # e.g., 'add' from 'add.c'
+        submission.program_name = program_name
+
+        print(f"\n--- Evaluating {source_file} ---")
+
+        if config.language == "auto":
+            lang = self.compiler.detect_language(source_file)
+        else:
+            lang = config.language
+        submission.language = lang
+
+        # Analysis the code (normally done for every submission up front by scan_sources())
+        if lang in ['c', 'cpp']:
+            banned = self.findings.get(source_file)
+            if banned is None:
+                with span("static_analysis", source=source_file):
+                    banned = self.analysier.banned_includes(full_source_path)
+            if banned:
+                headers = ", ".join(f"<{header}>" for header in banned)
+                rows.append((program_name, "N/A", "Static Analysis Error", 0, 0, f"Error: STL code found inside the code! ({headers})"))
+                return submission
+
+        # Incremental runs only execute the test cases this exact source hasn't been judged on yet
+        if self.verdicts:
+            with span("verdict_lookup", source=source_file):
+                submission.source_sha256 = file_digest(full_source_path)
+                submission.known_verdicts = self.verdicts.lookup(submission.source_sha256, lang)
+            known = sum(os.path.basename(input_file) in submission.known_verdicts for input_file, _ in self.test_cases)
+            if known:
+                print(f"Reusing {known} of {len(self.test_cases)} verdicts from earlier runs.")
+            if self._settle_from_known(submission):
+                return submission # Nothing left to run, so no need to compile
+
+        # compile the code (Python is byte-compiled, which catches syntax errors once)
+        if lang in ['c', 'cpp', 'python']:
+            # Named after the whole file name: add.c and add.cpp share a program
+            # name but may be compiled at the same time by the pipeline.
+            build_name = source_file.replace('.', '_')
+            try:
+                started = time.perf_counter()
+                with span("compile", source=source_file, language=lang) as compile_span:
+                    executable_path = self.compiler.compile_code(full_source_path, build_name, lang)
+                    compile_span.set(ok=bool(executable_path), cache_hit=self.compiler.last_cache_hit)
+                submission.compile_seconds = time.perf_counter() - started
+                submission.cache_hit = self.compiler.last_cache_hit
+                if not executable_path:
+                    print(f"Compilation failed for {source_file}. Skipping.")
+                    rows.append((program_name, "N/A", "Compilation Error", 0, 0, f"Error: {self.compiler.last_error or 'compiler error'}"))
+                    return submission
+            except Exception as e:
+                print(f"Error during compilation of {source_file}: {e}. Skipping.")
+                rows.append((program_name, "N/A", "Compilation Error", 0, 0, f"Error: {e}"))
+                return submission
+        else:
+            print(f"Unsupported language '{lang}' for {source_file}. Skipping.")
+            rows.append((program_name, "N/A", "Unsupported Language", 0, 0, f"Language: {lang}"))
+            return submission
+
+        submission.executable_path = executable_path
+        return submission
+
+    def run_tests(self, submission):
+        """Runs the test cases of a prepared submission and collects the rows."""
+        if not submission.executable_path:
+            return self._finish_unrun(submission) # Failed before it could run
+
+        schedule = self._schedule(submission)
+        started = time.perf_counter()
+        with span("run_tests", source=submission.source_file):
+            try:
+                job = next(schedule)
+                while True:
+                    test_case_name, input_file, output_file, runner = job
+                    print(f"  Running Test Case {self._numbers[test_case_name]}: {test_case_name} ({submission.source_file})")
+                    try:
+                        outcome = runner.run_code(
+                            submission.executable_path,
+                            input_file,
+                            output_file,
+                            submission.language,
+                            submission.program_name # Pass program_name for runner to identify Python scripts
+                        )
+                    except Exception as e:
+                        outcome = e
+                    job = schedule.send(self._outcome_row(submission.program_name, test_case_name, outcome))
+            except StopIteration as done:
+                self._add_rows(submission, *done.value)
+        submission.busy_seconds = time.perf_counter() - started
+        return submission
+
+    async def run_tests_async(self, submission):
+        """run_tests() for the async engine: the submission's test cases run concurrently,
+        bounded by the AsyncRunner's semaphore, and rows keep test case order.
+        With fail_fast or test groups they run one after another, so a failure can
+        stop the test cases after it."""
+        if not submission.executable_path:
+            return self._finish_unrun(submission) # Failed before it could run
+
+        with span("run_tests", source=submission.source_file):
+            return await self._run_tests_async(submission)
+
+    async def _run_tests_async(self, submission):
+        program_name = submission.program_name
+        # add.c, add.cpp and add.py may all be running at once here; keep their
+        # temporary output files apart.
+        run_name = submission.source_file.replace('.', '_')
+        to_run = [(input_file, output_file) for input_file, output_file in self.test_cases
+                  if os.path.basename(input_file) not in submission.known_verdicts]
+        outcomes = {}
+        if self.config.fail_fast or self.groups:
+            print(f"  Running up to {len(to_run)} Test Cases, stopping at failures ({submission.source_file})")
+        else:
+            print(f"  Running {len(to_run)} Test Cases ({submission.source_file})")
+            results = await asyncio.gather(
+                *(self.runner.run_code(submission.executable_path, input_file, output_file, submission.language, run_name)
+                  for input_file, output_file in to_run),
+                return_exceptions=True)
+            outcomes = {os.path.basename(input_file): outcome for (input_file, _), outcome in zip(to_run, results)}
+
+        schedule = self._schedule(submission)
+        try:
+            job = next(schedule)
+            while True:
+                test_case_name, input_file, output_file, runner = job
+                if test_case_name in outcomes:
+                    outcome = outcomes[test_case_name]
+                else:
+                    try:
+                        outcome = await runner.run_code(submission.executable_path, input_file, output_file,
+                                                        submission.language, run_name)
+                    except Exception as e:
+                        outcome = e
+                job = schedule.send(self._outcome_row(program_name, test_case_name, outcome))
+        except StopIteration as done:
+            self._add_rows(submission, *done.value)
+        # Its tests ran concurrently, so the test slots were busy for their summed time
+        submission.busy_seconds = sum(row[3] for row in submission.rows if row[1] in self._numbers
+                                      and row[2] != SKIPPED and row[1] not in submission.known_verdicts)
+        return submission
+
+    def _plan(self):
+        """[(TestGroup or None, test cases)] in the order they run. Without groups one
+        ungrouped entry holds every test case; with groups the test cases in no group run last."""
+        if not self.groups:
+            return [(None, self.test_cases)]
+        plan = []
+        grouped = set()
+        for group in self.groups:
+            cases = [case for case in self.test_cases if os.path.basename(case[0]) in group.cases]
+            plan.append((group, cases))
+            grouped.update(group.cases)
+        rest = [case for case in self.test_cases if os.path.basename(case[0]) not in grouped]
+        if rest:
+            plan.append((None, rest))
+        return plan
+
+    def _runner_for(self, test_case_name):
+        """The runner enforcing the test case's own (group or calibrated) limits."""
+        limits = self.limits.get(test_case_name)
+        if limits is None or limits == (self.config.time_limit_seconds, self.config.memory_limit_mb):
+            return self.runner
+        if limits not in self._limit_runners:
+            self._limit_runners[limits] = self.runner.with_limits(*limits)
+        return self._limit_runners[limits]
+
+    def _schedule(self, submission):
+        """Decides the row of every test case, following self.plan.
+
+        A generator: for each test that actually has to run it yields
+        (test case name, input file, output file, runner) and takes the row back
+        through send(). Earlier verdicts are reused, and a test case is skipped
+        after a failure in its group, when a group it depends on failed, or
+        (fail_fast) after any failure. Returns (rows, reused rows, score); with
+        groups the rows end with the group and total score rows.
+        """
+        program_name = submission.program_name
+        rows = []
+        reused = 0
+        passed = {} # Group name -> whether all its test cases were Correct
+        failed = None # fail_fast: the row that stopped the submission
+        for group, cases in self.plan:
+            blocked = [name for name in group.depends_on if not passed[name]] if group else []
+            group_failed = None
+            group_rows = []
+            for input_file, output_file in cases:
+                test_case_name = os.path.basename(input_file)
+                if failed:
+                    row = self._skipped_row(program_name, test_case_name, f"{failed[1]} gave {failed[2]}")
+                elif blocked:
+                    row = self._skipped_row(program_name, test_case_name, f"group {blocked[0]} failed")
+                elif group_failed:
+                    row = self._skipped_row(program_name, test_case_name, f"{group_failed[1]} gave {group_failed[2]}")
+                elif test_case_name in submission.known_verdicts:
+                    row = self._reused_row(submission, test_case_name)
+                    reused += 1
+                else:
+                    row = yield test_case_name, input_file, output_file, self._runner_for(test_case_name)
+                group_rows.append(row)
+                if row[2] != "Correct" and row[2] != SKIPPED:
+                    group_failed = group_failed or (row if group else None)
+                    failed = failed or (row if self.config.fail_fast else None)
+            if group:
+                passed[group.name] = all(row[2] == "Correct" for row in group_rows)
+            rows.extend(group_rows)
+        score = None
+        if self.groups:
+            score_rows, score = self._score_rows(program_name, rows)
+            rows.extend(score_rows)
+        return rows, reused, score
+
+    def _score_rows(self, program_name, rows):
+        """A row per group plus a total row, all-or-nothing per group. Returns (rows, total score)."""
+        by_name = {row[1]: row for row in rows}
+        score_rows = []
+        total = 0
+        for group, cases in self.plan:
+            if group is None:
+                continue
+            group_rows = [by_name[os.path.basename(input_file)] for input_file, _ in cases
+                          if os.path.basename(input_file) in by_name]
+            if group_rows and len(group_rows) == len(cases) and all(row[2] == "Correct" for row in group_rows):
+                result, score = "Group Passed", group.weight
+            elif group_rows and all(row[2] == SKIPPED for row in group_rows):
+                result, score = "Group Skipped", 0
+            else:
+                result, score = "Group Failed", 0
+            total += score
+            score_rows.append((program_name, f"Group {group.name}", result, sum(row[3] for row in group_rows),
+                               max((row[4] for row in group_rows), default=0), f"Score: {score}/{group.weight}"))
+        score_rows.append((program_name, "Total", "Score", sum(row[3] for row in rows),
+                           max((row[4] for row in rows), default=0),
+                           f"Score: {total}/{sum(group.weight for group in self.groups)}"))
+        return score_rows, total
+
+    def _settle_from_known(self, submission):
+        """Fills in every row from earlier verdicts (and the skips they cause) when they decide
+        all test cases without running one. Returns False, adding nothing, if something must run."""
+        schedule = self._schedule(submission)
+        try:
+            next(schedule)
+        except StopIteration as done:
+            self._add_rows(submission, *done.value)
+            return True
+        schedule.close()
+        return False
+
+    def _finish_unrun(self, submission):
+        """A submission that failed before running scores nothing in any group."""
+        if self.groups and submission.score is None:
+            score_rows, submission.score = self._score_rows(submission.program_name, [])
+            submission.rows.extend(score_rows)
+        return submission
+
+    @staticmethod
+    def _add_rows(submission, rows, reused, score):
+        submission.rows.extend(rows)
+        submission.reused = reused
+        submission.score = score
+
+    @staticmethod
+    def _outcome_row(program_name, test_case_name, outcome):
+        if isinstance(outcome, Exception):
+            print(f"    Error running test case {test_case_name}: {outcome}")
+            return (program_name, test_case_name, "Runner Error", 0, 0, f"Error: {outcome}")
+        result, time_taken, memory_used, cpu_user, cpu_sys, error_output = outcome
+        return (program_name, test_case_name, result, time_taken, memory_used, error_output, cpu_user, cpu_sys)
+
+    @staticmethod
+    def _reused_row(submission, test_case_name):
+        result, time_taken, memory_used, error_output, cpu_user, cpu_sys = submission.known_verdicts[test_case_name]
+        return (submission.program_name, test_case_name, result, time_taken, memory_used, error_output, cpu_user, cpu_sys)
+
+    @staticmethod
+    def _skipped_row(program_name, test_case_name, reason):
+        return (program_name, test_case_name, SKIPPED, 0, 0, f"Not run: {reason}")
+
+# The evaluator owned by the current pool process, created by _init_worker().
+_worker_evaluator = None
+
+def worker_config(config, worker_id):
+    """Returns a copy of config whose exec_dir is a private slice for worker_id.
+
+    Compiled binaries and temporary output files are named after the program,
+    so two workers sharing one exec_dir would overwrite each other's files.
+    The same goes for the scratch workspace, if there is one.
+    """
+    cfg = copy.copy(config)
+    cfg.exec_dir = os.path.join(config.exec_dir, f"worker{worker_id}")
+    os.makedirs(cfg.exec_dir, exist_ok=True)
+    cfg.scratch_path = worker_scratch(config, f"worker{worker_id}")
+    return cfg
+
+def _pin_to_cpu(worker_id):
+    """Pins the calling process to one CPU so timings don't drift as the scheduler migrates it."""
+    if not hasattr(os, 'sched_setaffinity'):
+        return
+    try:
+        cpus = sorted(os.sched_getaffinity(0))
+        os.sched_setaffinity(0, {cpus[worker_id % len(cpus)]})
+    except OSError as e:
+        print(f"Warning: Could not pin worker {worker_id} to a CPU: {e}")
+
+def _init_worker(config, test_cases, findings, worker_ids):
+    global _worker_evaluator
+    worker_id = worker_ids.get()
+    if config.pin_workers:
+        _pin_to_cpu(worker_id)
+    if config.trace_file:
+        tracer.enable(f"worker {worker_id}")
+    _worker_evaluator = SubmissionEvaluator(worker_config(config, worker_id), test_cases, findings)
+
+def _evaluate_in_worker(source_file):
+    return _traced(_worker_evaluator.evaluate(source_file))
+
+def _run_tests_in_worker(submission):
+    return _traced(_worker_evaluator.run_tests(submission))
+
+def _traced(submission):
+    """Sends the spans this worker recorded along with the submission's result."""
+    if tracer.enabled:
+        submission.trace_events = tracer.drain()
+    return submission
+
+def _start_pool(config, test_cases, findings):
+    # Workers are started on demand, possibly while compile threads have gcc
+    # pipes open; plain fork() would leak those pipes into the worker and the
+    # compile would never see EOF. A forkserver starts them from a clean process.
+    if 'forkserver' in multiprocessing.get_all_start_methods():
+        context = multiprocessing.get_context('forkserver')
+    else:
+        context = multiprocessing.get_context('spawn')
+    worker_ids = context.Queue()
+    for worker_id in range(config.workers):
+        worker_ids.put(worker_id)
+    return ProcessPoolExecutor(max_workers=config.workers,
+                               mp_context=context,
+                               initializer=_init_worker,
+                               initargs=(config, test_cases, findings, worker_ids))
+
+def evaluate_all(config, source_files, test_cases, metrics=None):
+    """Yields a SubmissionResult for every submission, in source_files order.
+
+    With more than one worker the submissions are spread over a process pool;
+    results are still yielded in source_files order so the log is deterministic.
+    With compile_workers set, compiling is split off into its own pipeline stage;
+    the async engine replaces both with one event loop, and the distributed engine
+    hands the submissions to worker nodes (see evaluator/distributed.py). With test_order
+    'adaptive' the test cases run, and are logged, in the order given by
+    VerdictCache.order_test_cases(). metrics (a Metrics) is told the run queue
+    depth of the pipelined engine.
+    """
+    with span("static_analysis", sources=len(source_files)):
+        findings = scan_sources(config, source_files)
+    if config.test_order == 'adaptive':
+        with span("test_order"):
+            test_cases = VerdictCache(config.results_db, config, test_cases).order_test_cases()
+        print(f"Adaptive test case order: {', '.join(os.path.basename(input_file) for input_file, _ in test_cases)}")
+
+    if config.engine == 'async' and config.launcher == 'preexec':
+        # Its loop spawns tests while a helper thread compiles; preexec_fn can't fork safely then
+        print("Warning: The async engine needs the shim or prlimit launcher; using the process engine.")
+        config.engine = 'process'
+    if config.engine == 'async':
+        yield from _evaluate_async(config, source_files, test_cases, findings)
+        return
+
+    if config.engine == 'distributed':
+        # Imported here: the distributed module builds on this one
+        from evaluator.distributed import evaluate_distributed
+        yield from evaluate_distributed(config, source_files, test_cases)
+        return
+
+    if config.compile_workers > 0:
+        yield from _evaluate_pipelined(config, source_files, test_cases, findings, metrics)
+        return
+
+    if config.workers <= 1:
+        evaluator = SubmissionEvaluator(config, test_cases, findings)
+        for source_file in source_files:
+            yield evaluator.evaluate(source_file)
+        return
+
+    with _start_pool(config, test_cases, findings) as pool:
+        # map() hands results back in submission order, whatever order they finish in
+        yield from pool.map(_evaluate_in_worker, source_files)
+
+def scan_sources(config, source_files):
+    """Static analysis of every C/C++ submission in one in-process batch, before anything is compiled.
+
+    Returns source file -> the banned headers it includes (empty when clean).
+    """
+    analysis = StaticAnalysis(config.banned_headers)
+    findings = {}
+    for source_file in source_files:
+        lang = config.language if config.language != "auto" else Compiler.detect_language(source_file)
+        if lang in ['c', 'cpp']:
+            findings[source_file] = analysis.banned_includes(os.path.join(config.source_dir, source_file))
+    flagged = sum(1 for banned in findings.values() if banned)
+    if flagged:
+        print(f"Static analysis: {flagged} of {len(findings)} C/C++ submissions include banned headers.")
+    return findings
+
+def _evaluate_pipelined(config, source_files, test_cases, findings, metrics=None):
+    """Compile stage feeding a bounded run queue feeding the run stage.
+
+    compile_workers threads prepare upcoming submissions while the run stage
+    (workers processes, or this thread when workers is 1) tests the current
+    ones. At most run_queue_size submissions wait between the two stages, so
+    compiling never runs arbitrarily far ahead of testing. The preexec launcher
+    forks with preexec_fn, which isn't safe while the compile threads run, so
+    with it the run stage is always a process pool, of one process if need be.
+    """
+    build_config = copy.copy(config)
+    build_config.exec_dir = os.path.join(config.exec_dir, "build")
+    os.makedirs(build_config.exec_dir, exist_ok=True)
+    compile_local = threading.local() # Compiler keeps per-call state, one per thread
+
+    def prepare(source_file):
+        if not hasattr(compile_local, 'evaluator'):
+            compile_local.evaluator = SubmissionEvaluator(build_config, test_cases, findings)
+        return compile_local.evaluator.prepare(source_file)
+
+    run_queue = queue.Queue(maxsize=config.run_queue_size)
+
+    def take():
+        prepared = run_queue.get()
+        if metrics:
+            metrics.set_run_queue_depth(run_queue.qsize())
+        return prepared
+
+    def feed():
+        for source_file in source_files:
+            run_queue.put(compile_pool.submit(prepare, source_file)) # Blocks while the queue is full
+        run_queue.put(None)
+
+    with ThreadPoolExecutor(max_workers=config.compile_workers) as compile_pool:
+        threading.Thread(target=feed, name="compile-feeder", daemon=True).start()
+
+        if config.workers <= 1 and config.launcher != 'preexec':
+            evaluator = SubmissionEvaluator(config, test_cases, findings)
+            while (prepared := take()) is not None:
+                yield evaluator.run_tests(prepared.result())
+            return
+
+        with _start_pool(config, test_cases, findings) as run_pool:
+            pending = collections.deque() # Run futures in submission order
+            while (prepared := take()) is not None:
+                pending.append(run_pool.submit(_run_tests_in_worker, prepared.result()))
+                # Hand back finished results in order, and stop taking from the
+                # queue while every run worker is busy.
+                while True:
+                    while pending and pending[0].done():
+                        yield pending.popleft().result()
+                    running = [f for f in pending if not f.done()]
+                    if len(running) < config.workers:
+                        break
+                    wait(running, return_when=FIRST_COMPLETED)
+            while pending:
+                yield pending.popleft().result()
+
+def _evaluate_async(config, source_files, test_cases, findings):
+    """The async engine: one event loop supervises the test runs of every submission.
+
+    Submissions are prepared one after another on a helper thread, so compiling
+    overlaps with running tests, and each prepared submission's test cases go to
+    a shared AsyncRunner whose semaphore bounds the number of live processes.
+    The loop runs on its own thread and hands results back in source_files order.
+    """
+    results = queue.Queue()
+    done = object()
+
+    async def deliver(tasks):
+        while (task := await tasks.get()) is not None:
+            results.put(await task)
+
+    async def drive():
+        evaluator = SubmissionEvaluator(config, test_cases, findings)
+        loop = asyncio.get_running_loop()
+        tasks = asyncio.Queue()
+        delivery = asyncio.ensure_future(deliver(tasks))
+        for source_file in source_files:
+            prepared = await loop.run_in_executor(None, evaluator.prepare, source_file)
+            await tasks.put(asyncio.ensure_future(evaluator.run_tests_async(prepared)))
+        await tasks.put(None)
+        await delivery
+
+    def run_loop():
+        try:
+            asyncio.run(drive())
+            results.put(done)
+        except BaseException as e:
+            results.put(e)
+
+    threading.Thread(target=run_loop, name="async-engine", daemon=True).start()
+    while (item := results.get()) is not done:
+        if isinstance(item, BaseException):
+            raise item
+        yield item
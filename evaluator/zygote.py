@@ -0,0 +1,256 @@
+# evaluator/zygote.py
+# Forkserver ("zygote") for Python submissions. Run as a script by Zygote.start():
+# one interpreter boots once, pre-imports the modules submissions commonly use,
+# then forks a child per test run that execs nothing, it just runs the
+# submission. Only the standard library may be imported at module level, the
+# server runs without the evaluator package on sys.path.
+import gc
+import importlib
+import json
+import os
+import resource
+import selectors
+import signal
+import socket
+import subprocess
+import sys
+import traceback
+
+PREWARM_MODULES = ['array', 'bisect', 'collections', 'copy', 'functools', 'heapq', 'io', 'itertools',
+                   'math', 'operator', 'random', 're', 'runpy', 'string', 'typing']
+
+# --- server side (runs in the zygote process) ---
+
+def serve(control):
+    """Forks a child for every request on the control socket until it is closed.
+
+    A request is a JSON message with four fds attached: the reply socket, stdin,
+    stdout and stderr of the test run. The child's pid and later its wait4()
+    status and rusage are sent back on the reply socket.
+    """
+    signal.signal(signal.SIGINT, signal.SIG_IGN) # Ctrl-C is the evaluator's to handle; EOF stops us
+    for name in PREWARM_MODULES:
+        importlib.import_module(name)
+    # Keep the warm heap out of the collector, so children don't copy its pages on write
+    gc.collect()
+    gc.freeze()
+
+    selector = selectors.DefaultSelector()
+    selector.register(control, selectors.EVENT_READ)
+    control.send(b"ready")
+    while True:
+        for key, _ in selector.select():
+            if key.fileobj is control:
+                message, fds, _, _ = socket.recv_fds(control, 64 * 1024, 4)
+                if not message:
+                    return # The Runner closed its end
+                pid, reply = _fork_child(json.loads(message), fds)
+                selector.register(os.pidfd_open(pid), selectors.EVENT_READ, (pid, reply))
+            else:
+                pid, reply = key.data
+                selector.unregister(key.fd)
+                os.close(key.fd)
+                _, status, usage = os.wait4(pid, 0)
+                _send_json(reply, {'status': status, 'maxrss': usage.ru_maxrss,
+                                   'utime': usage.ru_utime, 'stime': usage.ru_stime})
+                reply.close()
+
+def _send_json(sock, data):
+    try:
+        sock.send(json.dumps(data).encode())
+    except OSError:
+        pass # The Runner gave up on this run
+
+def _fork_child(request, fds):
+    reply = socket.socket(fileno=fds[0])
+    pid = os.fork()
+    if pid == 0:
+        try:
+            _run_child(request, fds[1:])
+        finally:
+            os._exit(1)
+    # Its own process group, so the evaluator can kill everything it starts. Set on
+    # both sides of the fork: the group exists before the pid is sent back.
+    try:
+        os.setpgid(pid, pid)
+    except OSError:
+        pass # The child got there first, or already exited
+    for fd in fds[1:]:
+        os.close(fd)
+    _send_json(reply, {'pid': pid})
+    return pid, reply
+
+def _run_child(request, stdio_fds):
+    os.setpgid(0, 0)
+    for target, fd in enumerate(stdio_fds):
+        os.dup2(fd, target)
+    # Drop every zygote fd (control socket, other runs' reply sockets and pidfds)
+    os.closerange(3, resource.getrlimit(resource.RLIMIT_NOFILE)[0])
+    signal.signal(signal.SIGINT, signal.default_int_handler)
+
+    # Same limits limit_exec would apply, counted from the fork
+    if request['as_bytes']:
+        resource.setrlimit(resource.RLIMIT_AS, (request['as_bytes'], request['as_bytes']))
+    if request['cpu_soft']:
+        resource.setrlimit(resource.RLIMIT_CPU, (request['cpu_soft'], request['cpu_hard']))
+
+    import random
+    random.seed() # Children would otherwise share the zygote's random state
+    program_path = request['argv'][0]
+    sys.argv = list(request['argv'])
+    sys.path[0] = os.path.dirname(os.path.abspath(program_path))
+    os._exit(_run_submission(program_path))
+
+def _run_submission(program_path):
+    """Runs the program as __main__ and returns the exit code python3 would have used."""
+    import runpy
+    try:
+        runpy.run_path(program_path, run_name='__main__')
+        code = 0
+    except SystemExit as e:
+        if e.code is None or isinstance(e.code, int):
+            code = e.code or 0
+        else:
+            print(e.code, file=sys.stderr)
+            code = 1
+    except BaseException as e:
+        # Hide the zygote's and runpy's frames from the traceback
+        tb = e.__traceback__
+        while tb and (tb.tb_frame.f_globals is globals() or tb.tb_frame.f_globals.get('__name__') == 'runpy'):
+            tb = tb.tb_next
+        traceback.print_exception(type(e), e, tb or e.__traceback__)
+        code = 1
+    try:
+        sys.stdout.flush()
+        sys.stderr.flush()
+    except Exception:
+        code = 120 # What the interpreter exits with when flushing stdout fails
+    return code
+
+# --- client side (runs in the evaluator) ---
+
+class _Usage:
+    def __init__(self, maxrss, utime, stime):
+        self.ru_maxrss = maxrss
+        self.ru_utime = utime
+        self.ru_stime = stime
+
+class ZygoteProcess:
+    """The part of the Popen interface Runner uses, for a run forked by the zygote.
+
+    The zygote is the child's parent, so it reaps it and sends the status and
+    rusage over the reply socket; wait() and poll() read that message.
+    """
+
+    def __init__(self, args, reply, stdout, stderr):
+        self.args = args
+        self.returncode = None
+        self.rusage = None
+        self.stdout = stdout
+        self.stderr = stderr
+        self._reply = reply
+        self.pid = self._receive()['pid']
+
+    def _receive(self):
+        message = self._reply.recv(4096)
+        if not message:
+            raise OSError("Python zygote exited during the run.")
+        return json.loads(message)
+
+    def _finish(self, result):
+        self._reply.close()
+        self.returncode = os.waitstatus_to_exitcode(result['status'])
+        self.rusage = _Usage(result['maxrss'], result['utime'], result['stime'])
+
+    def wait(self, timeout=None):
+        if self.returncode is None:
+            self._reply.settimeout(timeout)
+            try:
+                self._finish(self._receive())
+            except (TimeoutError, BlockingIOError): # timeout=0 makes the socket non-blocking
+                raise subprocess.TimeoutExpired(self.args, timeout)
+        return self.returncode
+
+    def poll(self):
+        try:
+            return self.wait(timeout=0)
+        except subprocess.TimeoutExpired:
+            return None
+
+    def kill(self):
+        if self.returncode is None:
+            try:
+                os.kill(self.pid, signal.SIGKILL)
+            except ProcessLookupError:
+                pass # Already exited, the zygote is reaping it
+
+class Zygote:
+    """Starts the zygote process and asks it for test runs."""
+    START_TIMEOUT = 10
+
+    def __init__(self):
+        self._server = None
+        self._control = None
+
+    def start(self):
+        """Starts the zygote unless it is running; returns whether it is usable."""
+        if self._server and self._server.poll() is None:
+            return True
+        self.close()
+        parent_end, child_end = socket.socketpair(socket.AF_UNIX, socket.SOCK_SEQPACKET)
+        try:
+            self._server = subprocess.Popen(['python3', os.path.abspath(__file__), str(child_end.fileno())],
+                                            pass_fds=[child_end.fileno()], stdin=subprocess.DEVNULL,
+                                            stdout=subprocess.DEVNULL)
+            parent_end.settimeout(self.START_TIMEOUT)
+            if parent_end.recv(16) != b"ready":
+                raise OSError("no ready message")
+            parent_end.settimeout(None)
+        except OSError as e:
+            print(f"Warning: Could not start the Python zygote: {e}")
+            parent_end.close()
+            self.close()
+            return False
+        finally:
+            child_end.close()
+        self._control = parent_end
+        return True
+
+    def spawn(self, argv, as_bytes, cpu_soft, cpu_hard, stdin=None, stdout=None, stderr=None):
+        """Runs `python3 *argv` in a forked child; stdout and stderr are always pipes."""
+        reply, reply_child_end = socket.socketpair(socket.AF_UNIX, socket.SOCK_SEQPACKET)
+        stdout_read, stdout_write = os.pipe()
+        stderr_read, stderr_write = os.pipe()
+        stdin_fd = stdin.fileno() if stdin is not None else os.open(os.devnull, os.O_RDONLY)
+        request = {'argv': argv, 'as_bytes': as_bytes, 'cpu_soft': cpu_soft, 'cpu_hard': cpu_hard}
+        try:
+            socket.send_fds(self._control, [json.dumps(request).encode()],
+                            [reply_child_end.fileno(), stdin_fd, stdout_write, stderr_write])
+        except OSError:
+            for fd in (stdout_read, stderr_read):
+                os.close(fd)
+            reply.close()
+            raise
+        finally:
+            reply_child_end.close()
+            os.close(stdout_write)
+            os.close(stderr_write)
+            if stdin is None:
+                os.close(stdin_fd)
+        return ZygoteProcess(['python3'] + argv, reply, open(stdout_read, 'rb', buffering=0),
+                             open(stderr_read, 'rb', buffering=0))
+
+    def close(self):
+        if self._control:
+            self._control.close() # The zygote exits when it sees EOF
+            self._control = None
+        if self._server:
+            try:
+                self._server.wait(timeout=self.START_TIMEOUT)
+            except subprocess.TimeoutExpired:
+                self._server.kill()
+                self._server.wait()
+            self._server = None
+
+if __name__ == '__main__':
+    serve(socket.socket(fileno=int(sys.argv[1])))
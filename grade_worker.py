@@ -0,0 +1,31 @@
+# grade_worker.py
+import argparse
+import os
+import sys
+
+from evaluator.distributed import TOKEN_ENV, WorkerNode
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Worker node of the distributed engine: takes submissions from "
+                                                 "a coordinator (main.py --engine distributed) and grades them here.")
+    parser.add_argument('--connect', required=True, help="Coordinator address, \"host:port\" or \"unix:/path\"")
+    parser.add_argument('--workers', '-w', type=int, default=0, help="Submissions evaluated in parallel on this node (0 = one per CPU)")
+    parser.add_argument('--cache-dir', default='.worker_cache', help="Where test case files and compiled binaries are cached between runs")
+    parser.add_argument('--token', default=os.environ.get(TOKEN_ENV), help=f"The coordinator's coordinator_token (default: ${TOKEN_ENV})")
+    parser.add_argument('--name', help="Name shown in the coordinator's output (default: the host name)")
+    args = parser.parse_args()
+    if args.workers < 0:
+        parser.error("--workers must be non-negative")
+    return args
+
+def main():
+    args = parse_args()
+    node = WorkerNode(args.connect, args.workers, args.cache_dir, args.token, args.name)
+    try:
+        node.run()
+    except (OSError, ValueError) as e:
+        sys.exit(f"Error: Worker node stopped: {e}")
+    print("Coordinator done, worker node exiting.")
+
+if __name__ == '__main__':
+    main()
@@ -1,16 +1,35 @@
 # main.py
+import argparse
 import os
 import sys
 import shutil # Import shutil for rmtree
 
 from evaluator.config import Config
-from evaluator.compiler import Compiler
 from evaluator.testcase import TestCaseFinder
-from evaluator.runner import Runner
 from evaluator.logger import Logger
-from evaluator.static_analysis import StaticAnalysis
+from evaluator.metrics import Metrics, MetricsPublisher
+from evaluator.results_store import ResultsStore
+from evaluator.launcher import prepare_launcher
+from evaluator.scratch import cleanup_scratch, prepare_scratch
+from evaluator.tracing import span, tracer
+from evaluator.worker import evaluate_all
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Compile, run and grade submissions against input/output test cases.")
+    parser.add_argument('--config', '-c', default='config.json', help="Path to the configuration file")
+    parser.add_argument('--workers', '-w', type=int, help="Number of submissions evaluated in parallel (overrides 'workers', 0 = one per CPU)")
+    parser.add_argument('--compile-workers', type=int, help="Compile upcoming submissions on N threads while tests run (overrides 'compile_workers')")
+    parser.add_argument('--incremental', action='store_true', help="Only run source/test case pairs without a verdict in 'results_db' (overrides 'incremental')")
+    parser.add_argument('--fail-fast', action='store_true', help="Skip a submission's remaining test cases after its first failure (overrides 'fail_fast')")
+    parser.add_argument('--engine', choices=['process', 'async', 'distributed'], help="Execution engine (overrides 'engine')")
+    parser.add_argument('--metrics-port', type=int, help="Serve live metrics on http://127.0.0.1:PORT/metrics (overrides 'metrics_port')")
+    parser.add_argument('--metrics-file', help="Rewrite live metrics into this JSON file (overrides 'metrics_file')")
+    parser.add_argument('--trace', metavar='FILE', help="Record the run's phases as a Chrome trace in FILE and print a per-phase summary (overrides 'trace_file')")
+    return parser.parse_args()
 
 def main():
+    args = parse_args()
+
     # Ensure necessary directories exist
     os.makedirs('executables', exist_ok=True)
     os.makedirs('results', exist_ok=True)
@@ -20,19 +39,36 @@ def main():
 
     config = None # Initialize config to None
     try:
-        config = Config('config.json')
+        config = Config(args.config)
+        if args.workers is not None:
+            config.set_workers(args.workers)
+        if args.compile_workers is not None:
+            config.set_compile_workers(args.compile_workers)
+        if args.engine:
+            config.set_engine(args.engine)
+        if args.fail_fast:
+            config.fail_fast = True
+        if args.incremental:
+            config.set_incremental(True)
+        if args.trace:
+            config.trace_file = args.trace
+        if args.metrics_port is not None:
+            config.metrics_port = args.metrics_port
+        if args.metrics_file:
+            config.metrics_file = args.metrics_file
     except FileNotFoundError:
-        print("Error: config.json not found. Please create it.")
+        print(f"Error: {args.config} not found. Please create it.")
         sys.exit(1)
     except Exception as e:
-        print(f"Error loading config.json: {e}")
+        print(f"Error loading {args.config}: {e}")
         sys.exit(1)
 
-    compiler = Compiler(config)
+    if config.trace_file:
+        tracer.enable("main.py")
+
     testcase_finder = TestCaseFinder(config.testcase_dir)
-    runner = Runner(config)
-    logger = Logger(config.result_log, config.csv_file)
-    analysier = StaticAnalysis()
+    # With a results store the CSV is exported from it at the end of the run
+    logger = Logger(config.result_log, None if config.results_db else config.csv_file)
 
     source_files = [f for f in os.listdir(config.source_dir) if os.path.isfile(os.path.join(config.source_dir, f))]
     if not source_files:
@@ -42,79 +78,77 @@ def main():
             cleanup_executables(config.exec_dir)
         return
 
-    test_cases = testcase_finder.find_test_cases()
+    with span("find_test_cases"):
+        test_cases = testcase_finder.find_test_cases()
     if not test_cases:
         print(f"No test cases found in '{config.testcase_dir}'. Please add input/output pairs.")
         if config: # Only attempt cleanup if config was loaded
             cleanup_executables(config.exec_dir)
         return
 
+    prepare_launcher(config)
+    prepare_scratch(config, test_cases)
     logger.log_header()
-
-    for source_file in source_files:
-        full_source_path = os.path.join(config.source_dir, source_file)
-        program_name = os.path.splitext(source_file)[0] # e.g., 'add' from 'add.c'
-
-        print(f"\n--- Evaluating {source_file} ---")
-
-        executable_path = None
-        if config.language == "auto":
-            lang = compiler.detect_language(source_file)
-        else:
-            lang = config.language
-        
-        
-        # Analysis the code
-        if lang in ['c', 'cpp']:
-            analysis_result = analysier.uses_stl_headers(full_source_path)
-            if analysis_result:
-                logger.log_result(program_name, "N/A", "Static Analysis Error", 0, 0, f"Error: STL code found inside the code!")
-                continue
-                
-        # compile the code if needed
-        if lang in ['c', 'cpp']:
-            try:
-                executable_path = compiler.compile_code(full_source_path, program_name, lang)
-                if not executable_path:
-                    print(f"Compilation failed for {source_file}. Skipping.")
-                    logger.log_result(program_name, "N/A", "Compilation Error", 0, 0, f"Error: compiler error")
-                    continue
-            except Exception as e:
-                print(f"Error during compilation of {source_file}: {e}. Skipping.")
-                logger.log_result(program_name, "N/A", "Compilation Error", 0, 0, f"Error: {e}")
-                continue
-        elif lang == 'python':
-            executable_path = full_source_path # For Python, the source itself is the "executable"
-        else:
-            print(f"Unsupported language '{lang}' for {source_file}. Skipping.")
-            logger.log_result(program_name, "N/A", "Unsupported Language", 0, 0, f"Language: {lang}")
-            continue
-        
-        # running the code and log the output
-        for i, (input_file, output_file) in enumerate(test_cases):
-            test_case_name = os.path.basename(input_file)
-            print(f"  Running Test Case {i+1}: {test_case_name}")
-
-            try:
-                result, time_taken, memory_used, error_output = runner.run_code(
-                    executable_path,
-                    input_file,
-                    output_file,
-                    lang,
-                    program_name # Pass program_name for runner to identify Python scripts
-                )
-                logger.log_result(program_name, test_case_name, result, time_taken, memory_used, error_output)
-            except Exception as e:
-                print(f"    Error running test case {test_case_name}: {e}")
-                logger.log_result(program_name, test_case_name, "Runner Error", 0, 0, f"Error: {e}")
+    store = None
+    if config.results_db:
+        store = ResultsStore(config.results_db)
+        store.start_run(config, testcase_finder.manifest)
+
+    metrics = Metrics(config, len(source_files), test_cases)
+    publisher = None
+    if config.metrics_port is not None or config.metrics_file:
+        publisher = MetricsPublisher(metrics, config.metrics_port, config.metrics_file, config.metrics_interval)
+        publisher.start()
+
+    cache_hits = cache_misses = reused = 0
+    try:
+        with span("evaluate_all", submissions=len(source_files), test_cases=len(test_cases)):
+            for submission in evaluate_all(config, source_files, test_cases, metrics):
+                tracer.collect(submission.trace_events) # Spans from a pool worker
+                metrics.add_submission(submission)
+                print(metrics.progress_line())
+                for row in submission.rows:
+                    logger.log_result(*row)
+                if store:
+                    with span("store_add"):
+                        store.add_submission(submission, os.path.join(config.source_dir, submission.source_file))
+                reused += submission.reused
+                if submission.cache_hit is True:
+                    cache_hits += 1
+                elif submission.cache_hit is False:
+                    cache_misses += 1
+        if store:
+            store.finish_run()
+    finally:
+        with span("log_close"):
+            logger.close() # Writes every queued row, also on Ctrl-C
+        if store:
+            with span("store_flush"):
+                store.flush()
+            with span("export_csv"):
+                store.export_csv(store.run_id, config.csv_file)
+            store.close()
+        if publisher:
+            publisher.stop()
 
     print("\n--- Evaluation Complete ---")
     print(f"Results logged to: {config.result_log}")
     print(f"CSV summary in: {config.csv_file}")
+    if store:
+        print(f"Stored as run {store.run_id} in: {config.results_db} (query it with results.py)")
+    if config.incremental:
+        print(f"Incremental: {reused} verdicts reused from earlier runs")
+    if config.compile_cache_dir:
+        print(f"Compile cache: {cache_hits} hits, {cache_misses} misses ({config.compile_cache_dir})")
+    if tracer.enabled:
+        tracer.write(config.trace_file)
+        print(f"\n--- Time per phase (trace in {config.trace_file}, open it in https://ui.perfetto.dev) ---")
+        print(tracer.format_summary())
 
     # --- MODIFICATION START ---
     # Cleanup: Remove all compiled executables after evaluation
     cleanup_executables(config.exec_dir)
+    cleanup_scratch(config)
     # --- MODIFICATION END ---
 
 def cleanup_executables(exec_dir):
@@ -129,8 +163,10 @@ def cleanup_executables(exec_dir):
                 if os.path.isfile(item_path):
                     os.remove(item_path)
                     print(f"  Removed: {item_path}")
-                # If there were subdirectories, rmtree would handle them,
-                # but for executables, we expect files directly.
+                elif os.path.isdir(item_path):
+                    # Per-worker slices of exec_dir (see evaluator/worker.py)
+                    shutil.rmtree(item_path)
+                    print(f"  Removed: {item_path}")
             print(f"  Executables directory '{exec_dir}' cleaned.")
         else:
             print(f"  Executables directory '{exec_dir}' does not exist, no cleanup needed.")
@@ -0,0 +1,96 @@
+# results.py
+import argparse
+import json
+import os
+import sys
+
+from evaluator.results_store import ResultsStore
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Query the results database written by main.py (config key 'results_db').")
+    parser.add_argument('--config', '-c', default='config.json', help="Config file to take 'results_db' from")
+    parser.add_argument('--db', help="Path to the results database (overrides the config)")
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    commands.add_parser('runs', help="List the latest runs")
+
+    totals = commands.add_parser('totals', help="Per-program totals of a run")
+    totals.add_argument('--run', type=int, help="Run id (default: latest)")
+
+    slowest = commands.add_parser('slowest', help="Slowest test runs of a run")
+    slowest.add_argument('--run', type=int, help="Run id (default: latest)")
+    slowest.add_argument('--limit', '-n', type=int, default=10, help="Number of rows")
+
+    diff = commands.add_parser('diff', help="Results that changed between two runs")
+    diff.add_argument('old', type=int, nargs='?', help="Older run id (default: the run before the newer one)")
+    diff.add_argument('new', type=int, nargs='?', help="Newer run id (default: latest)")
+
+    export = commands.add_parser('export', help="Write a run as eval_results.csv")
+    export.add_argument('--run', type=int, help="Run id (default: latest)")
+    export.add_argument('--csv', required=True, help="Output CSV path")
+    return parser.parse_args()
+
+def db_path(args):
+    if args.db:
+        return args.db
+    try:
+        with open(args.config, 'r') as f:
+            path = json.load(f).get('results_db')
+    except (OSError, ValueError) as e:
+        sys.exit(f"Error: Could not read {args.config}: {e}")
+    if not path:
+        sys.exit(f"Error: No 'results_db' in {args.config}; pass --db.")
+    return path
+
+def latest_run(store, run_id):
+    if run_id is not None:
+        return run_id
+    latest = store.latest_run_ids(1)
+    if not latest:
+        sys.exit("Error: The results database has no runs yet.")
+    return latest[0]
+
+def print_table(header, rows):
+    rows = [["" if value is None else f"{value:.4f}" if isinstance(value, float) else str(value) for value in row]
+            for row in rows]
+    widths = [max(len(str(cell)) for cell in column) for column in zip(header, *rows)]
+    for row in [header] + rows:
+        print("  ".join(str(cell).ljust(width) for cell, width in zip(row, widths)).rstrip())
+
+def main():
+    args = parse_args()
+    path = db_path(args)
+    if not os.path.exists(path):
+        sys.exit(f"Error: Results database {path} not found.")
+    store = ResultsStore(path)
+
+    if args.command == 'runs':
+        print_table(['Run', 'Started', 'Finished', 'Source Dir', 'Submissions', 'Correct'], store.runs())
+    elif args.command == 'totals':
+        run_id = latest_run(store, args.run)
+        print(f"Run {run_id}")
+        print_table(['Submission', 'Tests', 'Correct', 'Time (s)', 'CPU (s)', 'Peak Memory (KB)'],
+                    store.program_totals(run_id))
+    elif args.command == 'slowest':
+        run_id = latest_run(store, args.run)
+        print(f"Run {run_id}")
+        print_table(['Submission', 'TestCase Input', 'Result', 'Time (s)', 'CPU (s)', 'Memory (KB)'],
+                    store.slowest_tests(run_id, args.limit))
+    elif args.command == 'diff':
+        new = latest_run(store, args.new)
+        old = args.old
+        if old is None:
+            old = store.previous_run_id(new)
+            if old is None:
+                sys.exit(f"Error: No run before run {new} to compare with.")
+        changes = store.diff_runs(old, new)
+        print(f"Run {old} -> run {new}: {len(changes)} changed results")
+        print_table(['Submission', 'TestCase Input', f'Run {old}', f'Run {new}'], changes)
+    elif args.command == 'export':
+        run_id = latest_run(store, args.run)
+        store.export_csv(run_id, args.csv)
+        print(f"Run {run_id} written to {args.csv}")
+    store.close()
+
+if __name__ == "__main__":
+    main()